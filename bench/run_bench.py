@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+오프라인 벤치마크: 로컬 대역 서버(stand_in.py)에 합성 사이트 N개를 띄우고 WebsiteMonitor.run_once를 돌린다.
+사이트 수마다 별도 프로세스에서 실행해 최대 RSS를 따로 잰다. 실제 data/, Slack은 건드리지 않는다.
+
+  python bench/run_bench.py                                  # 10 / 100 / 1000 사이트, 사이클 5회
+  python bench/run_bench.py --sites 100 --cycles 10 --latency 0.05 --jitter 0.02 --error-rate 0.01
+  python bench/run_bench.py --parser lxml --state-backend sqlite --parse-workers 4 --json bench_output.json
+
+보고 항목: sites/sec, 사이클 p50/p99(첫 사이클 제외), 첫 사이클 시간, 최대 RSS, 공지 1개당 파싱 µs
+"""
+
+import argparse
+import json
+import logging
+import math
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+SRC_DIR = ROOT_DIR / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import stand_in  # noqa: E402
+
+
+def percentile(values, p):
+    """nearest-rank 백분위"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def _control(port, action, payload=None):
+    url = f"http://127.0.0.1:{port}/_control/{action}"
+    data = json.dumps(payload or {}).encode() if action != "stats" else None
+    with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as r:
+        return json.loads(r.read())
+
+
+def site_configs(n, port, parser):
+    corpus = stand_in.load_corpus()
+    sites = []
+    for i in range(n):
+        entry = corpus[i % len(corpus)]
+        sites.append({
+            "name": f"bench-{i:04d}",
+            "url": f"http://127.0.0.1:{port}/board/{i}",
+            **entry["site"],
+            "use_selenium": False,
+            "max_items": 20,
+            "parser": parser,
+        })
+    return sites
+
+
+# ---------- 사이클 벤치 (사이트 수 1개, 별도 프로세스) ----------
+def run_worker(args):
+    data_dir = Path(tempfile.mkdtemp(prefix="wm-bench-"))
+    config = {
+        "websites": site_configs(args.worker, args.port, args.parser),
+        "check_interval": 300,
+        "user_agent": "website-monitor-bench",
+        "slack_webhook_url": f"http://127.0.0.1:{args.port}/slack/hook",
+        "slack_rate_per_sec": 10000,
+        "slack_burst": 10000,
+        "data_dir": str(data_dir),
+        "state_backend": args.state_backend,
+        "fetch_concurrency": args.fetch_concurrency,
+        # 대역 서버는 호스트가 하나뿐이라 호스트별 제한을 전체 제한에 맞춘다
+        "per_host_concurrency": args.fetch_concurrency,
+        "parse_workers": args.parse_workers,
+    }
+    config_path = data_dir / "config.json"
+    config_path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+    import website_monitor
+    monitor = website_monitor.WebsiteMonitor(str(config_path))
+    logging.getLogger("website_monitor").setLevel(logging.WARNING)
+    try:
+        _control(args.port, "reset")
+        started = time.perf_counter()
+        monitor.run_once()      # 첫 사이클: 모든 공지가 새 공지
+        first = time.perf_counter() - started
+
+        cycles = []
+        for i in range(args.cycles):
+            _control(args.port, "advance", {"sites": args.worker, "fraction": args.change_rate, "seed": i})
+            started = time.perf_counter()
+            monitor.run_once()
+            cycles.append(time.perf_counter() - started)
+        flushed = monitor.outbox.flush(timeout=60)
+        server_stats = _control(args.port, "stats")
+    finally:
+        monitor.close_parse_pool()
+        monitor.outbox.close()
+        monitor.state.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    p50 = percentile(cycles, 50)
+    result = {
+        "sites": args.worker,
+        "first_cycle_s": round(first, 4),
+        "cycle_p50_s": round(p50, 4),
+        "cycle_p99_s": round(percentile(cycles, 99), 4),
+        "sites_per_sec": round(args.worker / p50, 1) if p50 else None,
+        # Linux ru_maxrss는 KB 단위
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_rss_children_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "slack_posts": server_stats.get("slack_posts", 0),
+        "slack_flushed": flushed,
+        "board_requests": server_stats.get("board_requests", 0),
+        "board_errors": server_stats.get("board_errors", 0),
+    }
+    print("RESULT " + json.dumps(result), flush=True)
+    return 0
+
+
+# ---------- 파싱 마이크로벤치 ----------
+def bench_parse(parsers, repeat):
+    import website_monitor
+    logging.getLogger("website_monitor").setLevel(logging.WARNING)
+    corpus = stand_in.load_corpus()
+    results = []
+    for i, entry in enumerate(corpus):
+        html = stand_in.render_board(corpus, i, 0)
+        for parser in parsers:
+            site = {"name": entry["file"], "url": f"http://bench/{entry['file']}", **entry["site"],
+                    "parser": parser, "max_items": 30}
+            # 파싱 워커와 같은 방식: 락/드라이버/상태 없이 파서만 준비
+            monitor = website_monitor.WebsiteMonitor.__new__(website_monitor.WebsiteMonitor)
+            monitor.config = {"websites": [site]}
+            monitor._compiled_sites = monitor._compile_site_parsers()
+            notices = monitor.parse_notices(html, site)
+            started = time.perf_counter()
+            for _ in range(repeat):
+                monitor.parse_notices(html, site)
+            elapsed = time.perf_counter() - started
+            results.append({
+                "fixture": entry["file"], "parser": parser, "notices": len(notices),
+                "us_per_notice": round(elapsed / (repeat * max(1, len(notices))) * 1e6, 1),
+                "us_per_page": round(elapsed / repeat * 1e6, 1),
+            })
+    return results
+
+
+# ---------- 드라이버 ----------
+def start_stand_in(args):
+    cmd = [sys.executable, str(BENCH_DIR / "stand_in.py"), "--port", "0",
+           "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate)]
+    if args.etag:
+        cmd.append("--etag")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("READY "):
+        proc.kill()
+        raise RuntimeError(f"대역 서버 시작 실패: {line!r}")
+    return proc, int(line.split()[1])
+
+
+def run_size(args, port, n):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", str(n), "--port", str(port),
+           "--cycles", str(args.cycles), "--change-rate", str(args.change_rate), "--parser", args.parser,
+           "--state-backend", args.state_backend, "--fetch-concurrency", str(args.fetch_concurrency),
+           "--parse-workers", str(args.parse_workers)]
+    out = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, check=False)
+    for line in out.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"{n}개 사이트 벤치 실패 (exit {out.returncode})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="WebsiteMonitor 오프라인 벤치마크")
+    ap.add_argument("--sites", type=int, nargs="+", default=[10, 100, 1000], help="사이트 수 (여러 개 가능)")
+    ap.add_argument("--cycles", type=int, default=5, help="첫 사이클 뒤에 잴 사이클 수")
+    ap.add_argument("--change-rate", type=float, default=0.2, help="사이클마다 새 공지가 생기는 사이트 비율")
+    ap.add_argument("--latency", type=float, default=0.02, help="게시판 응답 지연(초)")
+    ap.add_argument("--jitter", type=float, default=0.01, help="지연 ± 흔들림(초)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    ap.add_argument("--etag", action="store_true", help="대역 서버가 ETag/304를 지원")
+    ap.add_argument("--parser", choices=["bs4", "lxml"], default="bs4")
+    ap.add_argument("--state-backend", choices=["json", "sqlite"], default="json")
+    ap.add_argument("--fetch-concurrency", type=int, default=16)
+    ap.add_argument("--parse-workers", type=int, default=0)
+    ap.add_argument("--parse-repeat", type=int, default=200, help="파싱 마이크로벤치 반복 횟수 (0이면 생략)")
+    ap.add_argument("--json", help="결과를 JSON 파일로 저장")
+    # 내부용: 사이트 수 1개를 현재 프로세스에서 실행
+    ap.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        return run_worker(args)
+
+    report = {"args": {k: v for k, v in vars(args).items() if k not in ("worker", "port", "json")}}
+    if args.parse_repeat > 0:
+        report["parse"] = bench_parse(["bs4", "lxml"], args.parse_repeat)
+        print(f"{'fixture':<20} {'parser':<6} {'notices':>7} {'µs/notice':>10} {'µs/page':>10}")
+        for r in report["parse"]:
+            print(f"{r['fixture']:<20} {r['parser']:<6} {r['notices']:>7} {r['us_per_notice']:>10} {r['us_per_page']:>10}")
+        print()
+
+    proc, port = start_stand_in(args)
+    try:
+        report["cycles"] = []
+        print(f"{'sites':>6} {'sites/s':>9} {'p50(s)':>8} {'p99(s)':>8} {'first(s)':>9} {'RSS(MB)':>8} {'posts':>6} {'errors':>6}")
+        for n in args.sites:
+            r = run_size(args, port, n)
+            report["cycles"].append(r)
+            print(f"{r['sites']:>6} {r['sites_per_sec']:>9} {r['cycle_p50_s']:>8} {r['cycle_p99_s']:>8} "
+                  f"{r['first_cycle_s']:>9} {r['peak_rss_mb']:>8} {r['slack_posts']:>6} {r['board_errors']:>6}")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 로컬 대역 서버 (게시판 + Slack).
+- GET  /board/<n>           : fixtures/의 게시판 HTML로 사이트 n의 목록을 만든다 (버전이 오르면 새 공지가 위에 추가)
+                              ?page=k면 k번째 페이지 (고정 공지는 모든 페이지에 반복)
+- GET  (목록의 글 링크)       : 글 번호(no / wr_id / document_srl)로 만든 상세 페이지 (본문, 첨부파일, 마감일)
+- POST /slack/hook          : Slack 웹훅 대역
+- POST /slack/api/<method>  : Slack Web API 대역 (chat.postMessage, conversations.history)
+- POST /_control/advance    : {"sites": N, "fraction": 0.2, "seed": 1, "steps": 1} → 사이트 일부의 버전을 steps만큼 올린다
+- POST /_control/reset      : 버전/카운터 초기화
+- GET  /_control/stats      : 요청/응답/전송 횟수
+지연(latency ± jitter)과 오류율(503)은 게시판 요청에만 적용한다.
+
+단독 실행: python bench/stand_in.py --port 8765 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+ROWS_MARKER = "<!-- ROWS -->"
+
+CATEGORIES = ["입학", "장학", "학사", "BK비교과", "기타"]
+TITLES = [
+    "{year}학년도 {term}학기 {cate} 관련 안내",
+    "[{cate}] {year}-{term}학기 신청 일정 공지 (~{month}/{day})",
+    "[대학원행정팀] {cate} 담당 근로장학생 모집 공고",
+    "{year}학년도 {term}학기 학위청구논문 심사 일정 안내 ({no})",
+    "[BK21] {year}년 {month}월 연구윤리 교육 이수 안내",
+    "{cate} 신청서 제출 기한 연장 안내 <{no}번>",
+    "[필독] {year}-{term} 등록금 납부 및 {cate} 유의사항",
+]
+
+
+def load_corpus():
+    with open(FIXTURE_DIR / "corpus.json", "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    for entry in corpus:
+        entry["page"] = (FIXTURE_DIR / entry["file"]).read_text(encoding="utf-8")
+    return corpus
+
+
+def _row_fields(site, no):
+    rnd = random.Random(site * 100003 + no)
+    cate_no = rnd.randrange(len(CATEGORIES))
+    month, day = 1 + no % 12, 1 + no % 28
+    fields = {
+        "no": no, "cate": CATEGORIES[cate_no], "cate_no": cate_no,
+        "views": rnd.randrange(10, 3000),
+        "date": f"2025.{month:02d}.{day:02d}",
+    }
+    title = rnd.choice(TITLES).format(year=2025, term=1 + no % 2, month=month, day=day, **fields)
+    fields["title"] = f"{title} (site {site})".replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return fields
+
+
+def render_board(corpus, site, version, rows=20, pinned=2, page=1):
+    """사이트 site의 version번째 목록 HTML의 page쪽. 버전이 1 오를 때마다 맨 위에 새 공지가 하나 생긴다."""
+    entry = corpus[site % len(corpus)]
+    top = 1000 + version - (page - 1) * rows
+    lines = [entry["pinned_row"].format(**_row_fields(site, no)) for no in range(1, pinned + 1)]
+    lines += [entry["row"].format(**_row_fields(site, no)) for no in range(top, top - rows, -1)]
+    return entry["page"].replace(ROWS_MARKER, "\n".join(lines))
+
+
+def render_detail(no):
+    """글 번호 no의 상세 페이지 HTML"""
+    month, day = 1 + no % 12, 1 + no % 28
+    return (
+        "<html><body><div class=\"board_view\"><h3>공지 " + str(no) + "</h3>"
+        "<div class=\"file\"><a href=\"/download?f=" + str(no) + "\">신청서_" + str(no) + ".hwp</a>"
+        "<a href=\"/download?f=" + str(no) + "-2\">안내문.pdf</a></div>"
+        "<div class=\"content\"><p>대학원 행정팀에서 알려드립니다.</p>"
+        f"<p>신청 기간: 2025.{month:02d}.01 ~ 2025.{month:02d}.{day:02d} 18:00까지</p>"
+        "<p>자세한 내용은 첨부파일을 참고하시기 바랍니다.</p></div></div></body></html>"
+    )
+
+
+class StandIn:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, etag=False, rows=20):
+        self.corpus = load_corpus()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.etag = etag
+        self.rows = rows
+        self.versions = Counter()
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self._rng = random.Random(0)
+        self.render = lru_cache(maxsize=4096)(
+            lambda site, version, page=1: render_board(self.corpus, site, version, self.rows, page=page).encode("utf-8")
+        )
+
+    def advance(self, sites, fraction, seed, steps=1):
+        rnd = random.Random(seed)
+        chosen = rnd.sample(range(sites), max(0, min(sites, round(sites * fraction))))
+        with self.lock:
+            for n in chosen:
+                self.versions[n] += steps
+        return len(chosen)
+
+    def reset(self):
+        with self.lock:
+            self.versions.clear()
+            self.stats.clear()
+
+    def delay(self):
+        with self.lock:
+            d = self.latency + self._rng.uniform(-self.jitter, self.jitter) if self.jitter else self.latency
+            fail = self._rng.random() < self.error_rate
+        return max(0.0, d), fail
+
+
+def make_handler(stand_in: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body=b"", content_type="application/json", headers=None):
+            self.send_response(code)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def _json(self, obj, code=200):
+            self._send(code, json.dumps(obj).encode("utf-8"))
+
+        def _body(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(n) if n else b""
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            params = parse_qs(query)
+            for name in ("no", "wr_id", "document_srl"):
+                if name in params:
+                    with stand_in.lock:
+                        stand_in.stats["detail_requests"] += 1
+                    return self._send(200, render_detail(int(params[name][0])).encode("utf-8"), "text/html; charset=utf-8")
+            if path.startswith("/board/"):
+                page = int(params.get("page", ["1"])[0])
+                return self._board(int(path.rsplit("/", 1)[1]), max(1, page))
+            if path == "/_control/stats":
+                with stand_in.lock:
+                    return self._json(dict(stand_in.stats))
+            self._send(404)
+
+        def _board(self, site, page=1):
+            delay, fail = stand_in.delay()
+            if delay:
+                time.sleep(delay)
+            with stand_in.lock:
+                stand_in.stats["board_requests"] += 1
+                version = stand_in.versions[site]
+                if fail:
+                    stand_in.stats["board_errors"] += 1
+            if fail:
+                return self._send(503, b"busy", "text/plain")
+            headers = {}
+            if stand_in.etag:
+                etag = f'"{site}-{version}-{page}"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    with stand_in.lock:
+                        stand_in.stats["board_not_modified"] += 1
+                    return self._send(304, headers=headers)
+            body = stand_in.render(site, version, page)
+            with stand_in.lock:
+                stand_in.stats["board_bytes"] += len(body)
+            self._send(200, body, "text/html; charset=utf-8", headers)
+
+        def do_POST(self):
+            path = self.path.split("?")[0]
+            raw = self._body()
+            if path == "/slack/hook":
+                with stand_in.lock:
+                    stand_in.stats["slack_posts"] += 1
+                return self._send(200, b"ok", "text/plain")
+            if path.startswith("/slack/api/"):
+                method = path.rsplit("/", 1)[1]
+                with stand_in.lock:
+                    stand_in.stats[f"slack_{method}"] += 1
+                    if method == "chat.postMessage":
+                        stand_in.stats["slack_posts"] += 1
+                if method == "conversations.history":
+                    return self._json({"ok": True, "messages": []})
+                return self._json({"ok": True, "ts": f"{time.time():.6f}", "channel": "CBENCH"})
+            if path == "/_control/advance":
+                req = json.loads(raw or b"{}")
+                changed = stand_in.advance(int(req["sites"]), float(req.get("fraction", 0.1)), req.get("seed", 0),
+                                          int(req.get("steps", 1)))
+                return self._json({"changed": changed})
+            if path == "/_control/reset":
+                stand_in.reset()
+                return self._json({"ok": True})
+            self._send(404)
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024   # 사이트 1000개를 동시에 받아도 연결이 거부되지 않게
+
+
+def serve(stand_in: StandIn, port=0, host="127.0.0.1"):
+    return _Server((host, port), make_handler(stand_in))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="벤치마크용 게시판/Slack 대역 서버")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="게시판 응답 지연(초)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="지연 ± 흔들림(초)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    ap.add_argument("--etag", action="store_true", help="ETag/304 지원")
+    ap.add_argument("--rows", type=int, default=20, help="페이지당 일반 공지 수")
+    args = ap.parse_args()
+
+    stand_in = StandIn(args.latency, args.jitter, args.error_rate, args.etag, args.rows)
+    server = serve(stand_in, args.port)
+    # run_bench.py가 이 줄로 포트를 읽는다
+    print(f"READY {server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
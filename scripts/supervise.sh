@@ -3,6 +3,7 @@
 # 프로세스 감시 및 자동 재시작 래퍼
 # - 크래시 시 자동 재시작 (최대 백오프 5분)
 # - 워크스페이스 시작 시 자동 실행용
+# - 샤드 모드: MONITOR_WORKER_ID=w2 scripts/supervise.sh 처럼 워커마다 따로 띄운다 (PID/락 파일도 워커별)
 
 set -uo pipefail
 
@@ -10,8 +11,6 @@ SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
 PIDDIR="${ROOT}/run"
 LOGDIR="${ROOT}/logs"
-PIDFILE="${PIDDIR}/supervise.pid"
-LOCKFILE="${PIDDIR}/supervise.lock"
 PYTHON_BIN="${PYTHON_BIN:-python3}"
 
 mkdir -p "${PIDDIR}" "${LOGDIR}"
@@ -24,6 +23,11 @@ if [[ -f "${ROOT}/.env" ]]; then
   set +a
 fi
 
+# 워커별 PID/락 파일 (.env의 MONITOR_WORKER_ID도 반영)
+WORKER_SUFFIX="${MONITOR_WORKER_ID:+-${MONITOR_WORKER_ID}}"
+PIDFILE="${PIDDIR}/supervise${WORKER_SUFFIX}.pid"
+LOCKFILE="${PIDDIR}/supervise${WORKER_SUFFIX}.lock"
+
 # 이미 실행 중인지 확인 (flock 기반)
 exec 200>"${LOCKFILE}"
 if ! flock -n 200; then
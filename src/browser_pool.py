@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Selenium 드라이버 풀.
+사이클이 끝나도 Chrome을 살려 두고(warm), 최대 size개의 드라이버로 여러 사이트를 동시에 렌더링한다.
+탭 대신 드라이버(프로세스) 단위로 나눠 WebDriver 세션을 스레드끼리 공유하지 않는다.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger("website_monitor.browser_pool")
+
+
+class BrowserWorker:
+    """풀에 속한 드라이버 1개와 사용 이력"""
+
+    def __init__(self, wid, driver, generation):
+        self.id = wid
+        self.driver = driver
+        self.generation = generation
+        self.created_at = time.monotonic()
+        self.pages = 0
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+class BrowserPool:
+    """
+    factory: 새 드라이버를 만들어 반환하는 함수 (실패 시 None)
+    size: 최대 드라이버 수
+    max_pages: 드라이버 1개가 렌더링할 최대 페이지 수 (0이면 무제한)
+    max_age: 드라이버 최대 수명(초) (0이면 무제한)
+    watchdog: ChromeWatchdog — 메모리 기준 재시작, 종료 후 남은 프로세스 정리 (None이면 생략)
+    metrics: MonitorMetrics — 드라이버 시작/종료 수를 셈 (None이면 기록 안 함)
+    """
+
+    def __init__(self, factory, size=2, max_pages=100, max_age=3600, watchdog=None, metrics=None):
+        self._factory = factory
+        self.size = max(1, int(size))
+        self.max_pages = int(max_pages)
+        self.max_age = float(max_age)
+        self.watchdog = watchdog
+        self.metrics = metrics
+        self._cond = threading.Condition()
+        self._idle = []
+        self._live = 0
+        self._generation = 0
+        self._next_id = 0
+        self.spawned = 0
+        self.retired = 0
+
+    # ---------- 대여/반납 ----------
+    def acquire(self, timeout=None):
+        """유휴 드라이버를 빌린다. 없으면 size까지 새로 띄우고, 꽉 차 있으면 반납을 기다린다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            worker, spawn = None, False
+            with self._cond:
+                while True:
+                    if self._idle:
+                        worker = self._idle.pop()      # 최근 반납된(가장 따뜻한) 것부터
+                        break
+                    if self._live < self.size:
+                        self._live += 1
+                        spawn = True
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+            if spawn:
+                return self._spawn()      # Chrome 기동은 느리므로 락 밖에서
+
+            if self._expired(worker):
+                self._retire(worker, "수명 초과")
+            elif not self._healthy(worker):
+                self._retire(worker, "헬스체크 실패")
+            else:
+                return worker
+
+    def release(self, worker, broken=False):
+        """렌더링이 끝난 드라이버 반납. broken이거나 재활용 조건에 걸리면 종료한다."""
+        worker.pages += 1
+        if broken:
+            self._retire(worker, "렌더링 오류")
+            return
+        reason = self._recycle_reason(worker)
+        if reason:
+            self._retire(worker, reason)
+            return
+        with self._cond:
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def close(self):
+        """유휴 드라이버를 모두 종료. 사용 중인 드라이버는 반납 시점에 종료된다."""
+        with self._cond:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            self._retire(worker, "풀 정리")
+
+    def sweep(self):
+        """
+        사이클 사이에 호출: 유휴 드라이버 중 메모리/수명 기준을 넘은 것을 종료하고 고아·좀비 프로세스를 정리한다.
+        렌더링 중인 드라이버는 건드리지 않는다 (반납 시점에 같은 기준으로 확인).
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+        keep = []
+        for worker in idle:
+            reason = self._recycle_reason(worker)
+            if reason:
+                self._retire(worker, reason)
+            else:
+                keep.append(worker)
+        with self._cond:
+            self._idle.extend(keep)
+            self._cond.notify_all()
+        if self.watchdog is not None:
+            self.watchdog.sweep()
+
+    def stats(self):
+        with self._cond:
+            stats = {
+                "live": self._live, "idle": len(self._idle), "size": self.size,
+                "spawned": self.spawned, "retired": self.retired,
+            }
+        if self.watchdog is not None and self.watchdog.enabled:
+            stats["rss_mb"] = round(self.watchdog.total_rss() / (1024 * 1024))
+        return stats
+
+    # ---------- 내부 ----------
+    def _spawn(self):
+        driver = None
+        try:
+            driver = self._factory()
+        except Exception as e:
+            logger.error(f"드라이버 생성 실패: {e}")
+        with self._cond:
+            if driver is None:
+                self._live -= 1
+                self._cond.notify()
+                return None
+            self._next_id += 1
+            self.spawned += 1
+            worker = BrowserWorker(self._next_id, driver, self._generation)
+        if self.metrics is not None:
+            self.metrics.drivers_started.inc()
+        if self.watchdog is not None:
+            self.watchdog.attach(worker)
+        logger.info(f"브라우저 #{worker.id} 시작 (live={self._live}/{self.size})")
+        return worker
+
+    def _retire(self, worker, reason):
+        rss = self.watchdog.rss.get(worker.id) if self.watchdog is not None else None
+        try:
+            worker.driver.quit()
+        except Exception as e:
+            logger.warning(f"브라우저 #{worker.id} 종료 중 오류: {e}")
+        if self.watchdog is not None:
+            self.watchdog.reap(worker)      # quit이 실패했거나 렌더러가 남았으면 여기서 kill
+        with self._cond:
+            self._live -= 1
+            self.retired += 1
+            self._cond.notify()
+        if self.metrics is not None:
+            self.metrics.drivers_retired.inc()
+        mem = f", rss={rss / (1024 * 1024):.0f}MB" if rss else ""
+        logger.info(f"브라우저 #{worker.id} 종료: {reason} (pages={worker.pages}, age={worker.age:.0f}s{mem})")
+
+    def _expired(self, worker):
+        return self.max_age > 0 and worker.age >= self.max_age
+
+    def _recycle_reason(self, worker):
+        if worker.generation != self._generation:
+            return "풀 정리"
+        if self.max_pages > 0 and worker.pages >= self.max_pages:
+            return f"페이지 {worker.pages}개 렌더링"
+        if self._expired(worker):
+            return "수명 초과"
+        if self.watchdog is not None:
+            return self.watchdog.recycle_reason(worker)
+        return None
+
+    def _healthy(self, worker):
+        try:
+            return worker.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome 메모리 감시.
+setup_selenium_driver가 띄운 chromedriver → Chrome → 렌더러 프로세스 트리의 RSS 합계를 재고,
+기준을 넘은 드라이버는 풀이 반납받는 시점(사이트 사이)에 재시작하게 한다.
+quit() 뒤에 남은 프로세스, 부모를 잃은 Chrome(고아), 회수되지 않은 chromedriver 좀비도 정리한다.
+좀비는 우리가 띄운 chromedriver의 Popen으로만 회수한다 (파싱 워커 등 다른 자식의 종료 상태를 가로채지 않게).
+
+RSS 합계는 공유 메모리를 중복으로 세므로 실제 사용량보다 크게 나온다 (기준값은 보수적으로 잡힌다).
+"""
+
+import logging
+import os
+import subprocess
+from collections import Counter
+
+try:
+    import psutil
+except ImportError:     # psutil 미설치 → 페이지 수/수명 기준으로만 재시작
+    psutil = None
+
+logger = logging.getLogger("website_monitor.chrome_watchdog")
+
+CHROME_NAMES = ("chrome", "chromium", "chromium-browser", "chromedriver", "headless_shell", "chrome_crashpad")
+MB = 1024 * 1024
+MAX_PROFILES = 256      # 기억해 둘 프로필 경로 수 (오래된 것부터 버린다)
+
+
+def _is_chrome(name):
+    name = (name or "").lower()
+    return any(name.startswith(n) for n in CHROME_NAMES)
+
+
+class ChromeWatchdog:
+    """
+    max_rss_mb: 드라이버 1개(프로세스 트리 전체)의 RSS 상한 (0이면 메모리 기준 없음)
+    kill_grace: quit() 뒤 남은 프로세스가 스스로 끝나길 기다릴 시간(초), 지나면 kill
+    metrics: MonitorMetrics — 정리한 프로세스 수를 셈 (None이면 기록 안 함)
+    """
+
+    def __init__(self, max_rss_mb=1024, kill_grace=3.0, metrics=None):
+        self.max_rss = int(float(max_rss_mb) * MB)
+        self.kill_grace = float(kill_grace)
+        self.metrics = metrics
+        self.enabled = psutil is not None
+        self.cleaned = Counter()        # leftover / orphan / zombie
+        self.rss = {}                   # 드라이버 id → 마지막으로 잰 RSS
+        self._profiles = {}             # 우리가 띄운 Chrome의 --user-data-dir (순서 유지용 dict)
+        self._drivers = {}              # chromedriver pid → Popen (끝난 뒤 sweep이 회수할 때까지)
+        if not self.enabled:
+            logger.warning("psutil이 없어 Chrome 메모리 감시를 끕니다 (페이지 수/수명 기준만 적용)")
+
+    # ---------- 드라이버별 ----------
+    def attach(self, worker):
+        """새 드라이버의 chromedriver pid를 기록"""
+        worker.procs = {}
+        popen = getattr(getattr(worker.driver, "service", None), "process", None)
+        if popen is not None:
+            self._drivers[popen.pid] = popen
+        if not self.enabled:
+            return
+        try:
+            root = psutil.Process(worker.driver.service.process.pid)
+        except (AttributeError, psutil.Error) as e:
+            logger.warning(f"브라우저 #{worker.id}: chromedriver 프로세스를 찾지 못함 ({e})")
+            return
+        worker.procs[root.pid] = root
+        self.measure(worker)
+
+    def measure(self, worker):
+        """프로세스 트리 RSS 합계(바이트). 새로 생긴 렌더러도 기억해 둔다."""
+        procs = getattr(worker, "procs", None)
+        if not procs:
+            return None
+        root = next(iter(procs.values()))
+        try:
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            tree = list(procs.values())
+        total = 0
+        for proc in tree:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+            if proc.pid not in procs:
+                procs[proc.pid] = proc
+                self._remember_profile(proc)
+        self.rss[worker.id] = total
+        return total
+
+    def recycle_reason(self, worker):
+        """메모리 기준을 넘었으면 사유 문자열, 아니면 None"""
+        if self.max_rss <= 0:
+            return None
+        rss = self.measure(worker)
+        if rss is not None and rss >= self.max_rss:
+            return f"메모리 {rss / MB:.0f}MB ≥ {self.max_rss / MB:.0f}MB"
+        return None
+
+    def reap(self, worker):
+        """quit() 뒤 호출: 트리에서 아직 살아 있는 프로세스를 kill_grace초 기다렸다가 종료. 종료한 수 반환"""
+        self.rss.pop(worker.id, None)
+        procs = list(getattr(worker, "procs", {}).values())
+        worker.procs = {}
+        if not procs:
+            return 0
+        alive = [p for p in procs if self._alive(p)]
+        if not alive:
+            return 0
+        # chromedriver는 Popen으로 기다린다 (psutil.wait이 먼저 회수하면 Popen이 종료 코드를 잃는다)
+        drivers = [p for p in alive if p.pid in self._drivers]
+        others = [p for p in alive if p.pid not in self._drivers]
+        _, alive = psutil.wait_procs(others, timeout=self.kill_grace)
+        for proc in drivers:
+            try:
+                self._drivers[proc.pid].wait(timeout=self.kill_grace)
+            except subprocess.TimeoutExpired:
+                alive.append(proc)
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+        if alive:
+            self._count(Counter(leftover=len(alive)))
+            logger.warning(f"브라우저 #{worker.id}: quit 뒤 남은 프로세스 {len(alive)}개 강제 종료")
+        return len(alive)
+
+    # ---------- 전체 ----------
+    def sweep(self):
+        """사이클 사이에 호출: 끝난 chromedriver 회수 + 고아 Chrome 종료. {'zombie': n, 'orphan': m} 반환"""
+        report = Counter()
+        for pid, popen in list(self._drivers.items()):
+            if popen.returncode is not None:      # quit()이 이미 회수
+                del self._drivers[pid]
+            elif popen.poll() is not None:        # 끝났는데 아무도 wait하지 않은 좀비
+                del self._drivers[pid]
+                report["zombie"] += 1
+        if self.enabled and self._profiles:
+            me = psutil.Process()
+            procs = list(psutil.process_iter(["name", "ppid", "cmdline"]))
+            names = {p.pid: p.info["name"] for p in procs}
+            orphans = []
+            for proc in procs:
+                info = proc.info
+                if not _is_chrome(info["name"]):
+                    continue
+                # 정상이면 부모가 chromedriver/Chrome이거나 우리 프로세스 → 아니면 init(또는 subreaper)로 넘어간 고아
+                if info["ppid"] == me.pid or _is_chrome(names.get(info["ppid"])):
+                    continue
+                cmdline = " ".join(info["cmdline"] or ())
+                if any(profile in cmdline for profile in self._profiles):
+                    orphans.append(proc)
+            for proc in orphans:
+                try:
+                    proc.kill()
+                    report["orphan"] += 1
+                except psutil.Error:
+                    pass
+        self._count(report)
+        if report:
+            logger.warning(f"Chrome 정리: 고아 {report['orphan']}개 종료, 좀비 {report['zombie']}개 회수")
+        return report
+
+    def _count(self, report):
+        self.cleaned.update(report)
+        if self.metrics:
+            for kind, n in report.items():
+                self.metrics.chrome_cleaned.inc(n, kind=kind)
+
+    def total_rss(self):
+        return sum(self.rss.values())
+
+    @staticmethod
+    def _alive(proc):
+        # is_running()은 pid 재사용까지 확인한다 (생성 시각 비교)
+        try:
+            return proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+
+    def _remember_profile(self, proc):
+        try:
+            if not _is_chrome(proc.name()):
+                return
+            for arg in proc.cmdline():
+                if arg.startswith("--user-data-dir="):
+                    self._profiles[os.path.normpath(arg.split("=", 1)[1])] = None
+                    if len(self._profiles) > MAX_PROFILES:
+                        del self._profiles[next(iter(self._profiles))]
+        except psutil.Error:
+            pass
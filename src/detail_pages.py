@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+새 공지의 상세 페이지 요약.
+- extract_detail: 상세 HTML에서 본문 앞부분, 첨부파일 이름, 마감일을 뽑는다
+- DetailCache: 링크 → 본문 digest → 요약의 내용 주소 캐시 (LRU, 바이트 상한, <data_dir>/detail_cache.json에 저장)
+
+같은 링크는 재시작·재알림(샤드 인계, 다이제스트 재전송 등) 뒤에도 다시 받지 않고,
+주소만 다른 같은 본문은 요약 하나를 같이 쓴다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger("website_monitor.detail_pages")
+
+DEFAULT_BODY_SELECTORS = (
+    ".view_content", ".board_view .content", ".bbs_view", ".view-con", ".fr-view",
+    "article", "#content", "main", "body",
+)
+DEFAULT_ATTACHMENT_SELECTOR = (
+    'a[href*="download"], a[href*="fileDown"], a[href*="attach"], a[download], .file a, .attach a, .attachment a'
+)
+_FILE_RE = re.compile(r"\.(pdf|hwpx?|docx?|xlsx?|pptx?|zip|jpe?g|png)\b", re.IGNORECASE)
+_DATE_RE = re.compile(r"(20\d{2})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})\s*일?(?:\s*\([^)]{1,3}\))?(?:\s*(\d{1,2}):(\d{2}))?")
+_DEADLINE_RE = re.compile(r"마감|기한|까지|접수\s*기간|신청\s*기간|모집\s*기간|제출|deadline|due", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _clean(text):
+    return _SPACE_RE.sub(" ", text or "").strip()
+
+
+def _deadlines(lines, limit=3):
+    """마감 관련 문구가 있는 줄에서 날짜를 찾는다. 기간(a ~ b)이면 끝 날짜만."""
+    found = []
+    for line in lines:
+        if not _DEADLINE_RE.search(line):
+            continue
+        dates = list(_DATE_RE.finditer(line))
+        if not dates:
+            continue
+        m = dates[-1]
+        value = f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
+        if m.group(4):
+            value += f" {int(m.group(4)):02d}:{m.group(5)}"
+        if value not in found:
+            found.append(value)
+        if len(found) >= limit:
+            break
+    return found
+
+
+def extract_detail(html, website_config):
+    """
+    {'snippet', 'attachments', 'deadlines'} 반환.
+    - detail_selector: 본문 요소 (없으면 흔한 게시판 본문 선택자 → body 순)
+    - detail_attachment_selector: 첨부파일 링크
+    - detail_snippet_chars: 본문 앞부분 길이 (기본 200)
+    """
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+
+    selectors = [website_config["detail_selector"]] if website_config.get("detail_selector") else DEFAULT_BODY_SELECTORS
+    body = None
+    for sel in selectors:
+        body = soup.select_one(sel)
+        if body is not None:
+            break
+
+    attachments = []
+    for a in soup.select(website_config.get("detail_attachment_selector") or DEFAULT_ATTACHMENT_SELECTOR):
+        name = _clean(a.get_text(" ")) or _clean(a.get("download") or a.get("title"))
+        if not name or name in attachments:
+            continue
+        # 기본 선택자는 '다운로드' 같은 버튼 글자도 잡으므로 파일 이름처럼 보이는 것만
+        if not website_config.get("detail_attachment_selector") and not _FILE_RE.search(name):
+            continue
+        attachments.append(name)
+
+    lines, snippet = [], ""
+    if body is not None:
+        lines = [_clean(s) for s in body.get_text("\n").split("\n")]
+        lines = [s for s in lines if s]
+        limit = int(website_config.get("detail_snippet_chars", 200))
+        snippet = " ".join(lines)
+        if len(snippet) > limit:
+            snippet = snippet[:limit].rstrip() + "…"
+    return {"snippet": snippet, "attachments": attachments[:10], "deadlines": _deadlines(lines)}
+
+
+class DetailCache:
+    """
+    links: 정규화한 링크 → 본문 digest (같은 링크는 다시 받지 않는다)
+    items: digest → 요약, 마지막으로 쓴 순서(LRU). 요약 JSON 크기 합이 max_bytes를 넘으면 오래된 것부터 버린다.
+    """
+
+    def __init__(self, path: Path, max_bytes=4 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.links = OrderedDict()
+        self.items = OrderedDict()      # digest → (요약, 크기)
+        self.size = 0
+        self.dirty = False
+        self._load()
+
+    @staticmethod
+    def digest(body):
+        return hashlib.blake2b(body.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+    def get(self, link):
+        digest = self.links.get(link)
+        if digest is None or digest not in self.items:
+            return None
+        self.links.move_to_end(link)
+        self.items.move_to_end(digest)
+        self.dirty = True
+        return self.items[digest][0]
+
+    def get_by_digest(self, digest):
+        """본문이 같은 상세 페이지를 이미 요약했으면 그 요약 (링크만 다른 같은 글)"""
+        entry = self.items.get(digest)
+        if entry is None:
+            return None
+        self.items.move_to_end(digest)
+        self.dirty = True
+        return entry[0]
+
+    def put(self, link, digest, detail):
+        if digest in self.items:
+            self.items.move_to_end(digest)
+        else:
+            size = len(json.dumps(detail, ensure_ascii=False).encode("utf-8"))
+            self.items[digest] = (detail, size)
+            self.size += size
+        self.links[link] = digest
+        self.links.move_to_end(link)
+        self.dirty = True
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self.items) > 1:
+            _, (_, size) = self.items.popitem(last=False)
+            self.size -= size
+        if len(self.links) > 4 * len(self.items) + 64:
+            # 요약이 밀려난 링크 정리
+            for link in [k for k, d in self.links.items() if d not in self.items]:
+                del self.links[link]
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = self.path.with_suffix(".json.tmp")
+        data = {
+            "links": list(self.links.items()),
+            "items": [[d, detail] for d, (detail, _) in self.items.items()],
+        }
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"상세 페이지 캐시 저장 실패: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"상세 페이지 캐시를 읽지 못함 → 비우고 시작: {e}")
+            return
+        for digest, detail in data.get("items", []):
+            size = len(json.dumps(detail, ensure_ascii=False).encode("utf-8"))
+            self.items[digest] = (detail, size)
+            self.size += size
+        self.links.update((k, d) for k, d in data.get("links", []) if d in self.items)
+        self._evict()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChromeDriver 경로 캐시.
+설치된 브라우저 버전별로 찾아 둔 chromedriver 경로를 <data_dir>/chromedriver.json에 저장해,
+다음 실행부터는 webdriver_manager(네트워크·캐시 조회)를 거치지 않는다. 브라우저가 업데이트되면 키가 바뀌어 다시 찾는다.
+offline=True면 네트워크를 쓰지 않고 chromedriver_path → 캐시 → PATH의 chromedriver 순으로만 찾는다.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger("website_monitor.driver_cache")
+
+_VERSION_RE = re.compile(r"(\d+)(?:\.\d+){1,3}")
+
+
+def find_browser():
+    """(브라우저 실행 파일, 'chromium' | 'google-chrome') — 못 찾으면 (None, 'google-chrome')"""
+    chromium = shutil.which("chromium") or shutil.which("chromium-browser")
+    if chromium and not shutil.which("google-chrome-stable"):
+        return chromium, "chromium"
+    return shutil.which("google-chrome-stable") or shutil.which("google-chrome"), "google-chrome"
+
+
+def program_version(path):
+    """`<path> --version`에서 버전 문자열 (실패하면 None)"""
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    m = _VERSION_RE.search(out or "")
+    return m.group(0) if m else None
+
+
+def _major(version):
+    return version.split(".", 1)[0] if version else None
+
+
+def _usable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+class DriverCache:
+    """
+    path: 캐시 파일 위치
+    offline: True면 webdriver_manager를 부르지 않는다
+    driver_path: 직접 지정한 chromedriver (있으면 그대로 사용)
+    """
+
+    def __init__(self, path: Path, offline=False, driver_path=None):
+        self.path = Path(path)
+        self.offline = bool(offline)
+        self.driver_path = driver_path
+        self.browser, self.chrome_type = None, None
+        self._resolved = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """chromedriver 경로. 찾지 못하면 RuntimeError (드라이버 풀이 여러 스레드에서 불러도 한 번만 찾는다)"""
+        with self._lock:
+            if self._resolved is None:
+                self._resolved = self._resolve()
+            return self._resolved
+
+    def _resolve(self):
+        self.browser, self.chrome_type = find_browser()
+        if self.driver_path:
+            if not _usable(self.driver_path):
+                raise RuntimeError(f"chromedriver_path를 실행할 수 없습니다: {self.driver_path}")
+            return self.driver_path
+
+        key = self._key()
+        entries = self._load()
+        cached = entries.get(key, {}).get("path")
+        if _usable(cached):
+            logger.info(f"ChromeDriver 캐시 사용: {cached} ({key})")
+            return cached
+
+        if self.offline:
+            path = self._find_local()
+        else:
+            logger.info("ChromeDriver 자동 설치 중...")
+            # 무거운 모듈이라 실제로 필요할 때만 불러온다
+            from webdriver_manager.chrome import ChromeDriverManager
+            from webdriver_manager.core.os_manager import ChromeType
+            if self.chrome_type == "chromium":
+                path = ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+            else:
+                path = ChromeDriverManager().install()
+
+        entries[key] = {"path": path, "resolved_at": int(time.time())}
+        self._save(entries)
+        return path
+
+    def _key(self):
+        """'<종류>:<브라우저 버전>' — 버전을 못 읽으면 실행 파일 수정 시각으로 대신한다"""
+        if not self.browser:
+            return f"{self.chrome_type}:unknown"
+        version = program_version(self.browser)
+        if version:
+            return f"{self.chrome_type}:{version}"
+        try:
+            return f"{self.chrome_type}:mtime-{int(os.stat(self.browser).st_mtime)}"
+        except OSError:
+            return f"{self.chrome_type}:unknown"
+
+    def _find_local(self):
+        """오프라인: PATH의 chromedriver 중 브라우저와 메이저 버전이 맞는 것"""
+        path = shutil.which("chromedriver")
+        if not path:
+            raise RuntimeError("오프라인 모드: 캐시된 chromedriver가 없고 PATH에도 없습니다 (chromedriver_path 설정 필요)")
+        want = _major(program_version(self.browser)) if self.browser else None
+        have = _major(program_version(path))
+        if want and have and want != have:
+            raise RuntimeError(f"오프라인 모드: {path} 버전({have})이 브라우저({want})와 다릅니다")
+        logger.info(f"오프라인 모드: PATH의 chromedriver 사용 ({path})")
+        return path
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"ChromeDriver 캐시를 읽지 못함 → 새로 찾음: {e}")
+            return {}
+
+    def _save(self, entries):
+        tmp = self.path.with_suffix(".json.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"ChromeDriver 캐시 저장 실패: {e}")
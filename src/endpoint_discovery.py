@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JS 게시판의 목록 XHR/JSON 엔드포인트 자동 탐지.
+Selenium 렌더링 때 잡은 JSON 응답 중 파싱된 공지 제목과 겹치는 리스트를 찾아
+필드 매핑(spec)을 만들고, 이후 사이클에는 그 spec으로 JSON만 받아 공지를 만든다.
+"""
+
+import re
+from collections import Counter
+
+# 브라우저 없이 다시 보낼 수 있는 요청만 대상으로 한다
+_REPLAYABLE_METHODS = {"GET", "POST"}
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def _norm(v) -> str:
+    return re.sub(r"\s+", " ", str(v)).strip()
+
+
+def collect_json_requests(events):
+    """
+    CDP performance 이벤트에서 JSON/XHR 응답을 골라 [(request_id, 요청 dict)] 반환.
+    요청 dict: url, method, post_data, content_type
+    """
+    requests_by_id, out = {}, []
+    for ev in events:
+        method = ev.get("method")
+        params = ev.get("params", {})
+        if method == "Network.requestWillBeSent":
+            req = params.get("request", {})
+            headers = {k.lower(): v for k, v in (req.get("headers") or {}).items()}
+            requests_by_id[params.get("requestId")] = {
+                "url": req.get("url", ""),
+                "method": req.get("method", "GET"),
+                "post_data": req.get("postData"),
+                "content_type": headers.get("content-type"),
+            }
+        elif method == "Network.responseReceived":
+            resp = params.get("response", {})
+            is_json = "json" in (resp.get("mimeType") or "")
+            if not (is_json or params.get("type") in ("XHR", "Fetch")):
+                continue
+            if resp.get("status") != 200:
+                continue
+            req = requests_by_id.get(params.get("requestId"))
+            if req and req["method"] in _REPLAYABLE_METHODS:
+                out.append((params.get("requestId"), req))
+    return out
+
+
+def iter_record_lists(data, path=()):
+    """JSON 안의 dict 리스트를 (경로, 리스트)로 순회"""
+    if isinstance(data, dict):
+        for k, v in data.items():
+            yield from iter_record_lists(v, path + (k,))
+    elif isinstance(data, list) and data and all(isinstance(x, dict) for x in data):
+        yield path, data
+
+
+def resolve_path(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def render_link(template, item):
+    return _PLACEHOLDER.sub(lambda m: str(item.get(m.group(1), "")), template)
+
+
+def _scalar_keys(item):
+    return [k for k, v in item.items() if isinstance(v, (str, int)) and not isinstance(v, bool)]
+
+
+def _infer_link_template(pairs):
+    """모든 쌍의 링크를 재현하는 템플릿 (예: https://x/view?no={seq})"""
+    item0, notice0 = pairs[0]
+    link0 = notice0.link
+    if all(n.link == link0 for _, n in pairs):
+        return None if "{" in link0 else link0
+    for key in _scalar_keys(item0):
+        value = str(item0[key])
+        if not value:
+            continue
+        # id는 대개 링크 뒤쪽에 있으므로 마지막 등장 위치부터 시도
+        for pos in (link0.rfind(value), link0.find(value)):
+            if pos < 0:
+                continue
+            template = link0[:pos] + "{" + key + "}" + link0[pos + len(value):]
+            if all(render_link(template, it) == n.link for it, n in pairs):
+                return template
+    return None
+
+
+def _infer_equal_key(pairs, field, normalize=_norm, min_ratio=0.8):
+    scores = Counter()
+    for item, notice in pairs:
+        expected = getattr(notice, field)
+        if not expected:
+            continue
+        for key in _scalar_keys(item):
+            if normalize(str(item[key])) == expected:
+                scores[key] += 1
+    if not scores:
+        return None
+    key, hits = scores.most_common(1)[0]
+    return key if hits >= len(pairs) * min_ratio else None
+
+
+def _infer_pinned_key(pairs):
+    pinned = [bool(n.is_pinned) for _, n in pairs]
+    if not any(pinned) or all(pinned):
+        return None
+    for key in pairs[0][0]:
+        if all(_truthy(item.get(key)) == p for (item, _), p in zip(pairs, pinned)):
+            return key
+    return None
+
+
+def _truthy(v):
+    if isinstance(v, str):
+        return v.strip().lower() in ("y", "yes", "true", "1", "on")
+    return bool(v)
+
+
+def build_spec(data, notices, min_ratio=0.5, normalize_views=None):
+    """
+    JSON(data)과 DOM에서 파싱한 공지(notices)를 비교해 spec을 만든다. 못 찾으면 None.
+    spec: {"path": [...], "fields": {...}, "link_template": str}
+    """
+    titles = {_norm(n.title): n for n in notices if n.title}
+    if not titles:
+        return None
+
+    best = None
+    for path, items in iter_record_lists(data):
+        scores = Counter()
+        for item in items:
+            for k, v in item.items():
+                if isinstance(v, str) and _norm(v) in titles:
+                    scores[k] += 1
+        if not scores:
+            continue
+        title_key, hits = scores.most_common(1)[0]
+        if hits < max(1, len(titles) * min_ratio):
+            continue
+        if best is None or hits > best[2]:
+            best = (path, items, hits, title_key)
+    if not best:
+        return None
+
+    path, items, hits, title_key = best
+    pairs = [
+        (item, titles[_norm(item[title_key])])
+        for item in items
+        if isinstance(item.get(title_key), str) and _norm(item[title_key]) in titles
+    ]
+    link_template = _infer_link_template(pairs)
+    if link_template is None:
+        return None    # 링크가 해시에 들어가므로 재현 못 하면 쓸 수 없다
+
+    fields = {"title": title_key}
+    for field in ("date", "category"):
+        key = _infer_equal_key(pairs, field)
+        if key:
+            fields[field] = key
+    views_key = _infer_equal_key(pairs, "views", normalize=normalize_views or _norm)
+    if views_key:
+        fields["views"] = views_key
+    pinned_key = _infer_pinned_key(pairs)
+    if pinned_key:
+        fields["is_pinned"] = pinned_key
+
+    return {"path": list(path), "fields": fields, "link_template": link_template, "matched": len(pairs)}
+
+
+def extract_records(data, spec):
+    """spec대로 JSON에서 공지 필드(dict) 목록을 뽑는다. 구조가 바뀌었으면 KeyError/TypeError."""
+    items = resolve_path(data, spec["path"])
+    if not isinstance(items, list):
+        raise TypeError("endpoint path does not point to a list")
+    fields = spec["fields"]
+    records = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        title = item.get(fields["title"])
+        if not isinstance(title, str) or not title.strip():
+            continue
+        records.append({
+            "title": title.strip(),
+            "link": render_link(spec["link_template"], item),
+            "date": _norm(item.get(fields["date"], "")) if "date" in fields else "",
+            "views": _norm(item.get(fields["views"], "")) if "views" in fields else "",
+            "category": _norm(item.get(fields["category"], "")) if "category" in fields else "",
+            "is_pinned": _truthy(item.get(fields["is_pinned"])) if "is_pinned" in fields else False,
+        })
+    return records
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+parse_notices용 lxml 백엔드 (사이트 설정 "parser": "lxml").
+사이트별 CSS 선택자를 설정 로드 시점에 XPath로 한 번만 컴파일하고,
+BeautifulSoup 트리 없이 libxml2 트리에서 행마다 필드를 한 번에 뽑는다.
+텍스트 추출은 BeautifulSoup의 get_text(strip=True)와 같은 결과를 내도록 맞춘다.
+"""
+
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator, SelectorError  # noqa: F401 (호출부에서 SelectorError 처리)
+
+_translator = HTMLTranslator()
+
+# BeautifulSoup get_text()가 건너뛰는 요소 (주석은 tag가 문자열이 아니라서 따로 걸러진다)
+_SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+def compile_css(css, prefix="descendant::"):
+    """CSS 선택자 → 컴파일된 XPath. prefix 기본값은 자기 자신을 빼는 soupsieve select와 같다."""
+    return etree.XPath(_translator.css_to_xpath(css, prefix=prefix))
+
+
+# parse_notices의 고정 선택자
+_TOP_NOTICE = compile_css("td.top-notice")
+_CATE_SPANS = compile_css("span.cate")
+_TDS = compile_css("td")
+_VIEWS_FALLBACKS = [compile_css(s) for s in ('.views', '.hit', '.count', '[data-views]')]
+_DATE_FALLBACKS = [compile_css(s) for s in ('.date', '.time', '.created', '[data-date]')]
+
+
+def _text_parts(el, out):
+    if not isinstance(el.tag, str) or el.tag in _SKIP_TEXT_TAGS:
+        return
+    if el.text:
+        out.append(el.text)
+    for child in el:
+        _text_parts(child, out)
+        if child.tail:
+            out.append(child.tail)
+
+
+def get_text(el, strip=True):
+    parts = []
+    _text_parts(el, parts)
+    if strip:
+        return "".join(p.strip() for p in parts if p.strip())
+    return "".join(parts)
+
+
+def _first(xpath, el):
+    found = xpath(el)
+    return found[0] if found else None
+
+
+class CompiledSite:
+    """사이트 1개의 선택자 묶음 (행 선택자 + 행 안의 제목/링크/카테고리)"""
+
+    def __init__(self, website_config):
+        self.rows = compile_css(website_config['selector'], prefix="descendant-or-self::")
+        self.title = compile_css(website_config.get('title_selector', 'a'))
+        self.link = compile_css(website_config.get('link_selector', 'a'))
+        cate_sel = website_config.get('category_selector')
+        self.category = compile_css(cate_sel) if cate_sel else None
+
+
+def parse_document(html):
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # XML 인코딩 선언이 있는 str은 lxml이 거부하므로 바이트로 넘긴다
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+
+def extract_rows(html, compiled, take_n):
+    """
+    (matched, rows) 반환. rows 항목은 parse_notices가 쓰는 원시 필드 dict:
+    is_pinned, category, title, href(없으면 None), date(폴백 요소도 없으면 None), views
+    take_n은 일반 공지 수만 센다 (고정 공지는 개수와 무관하게 포함, None이면 전부)
+    """
+    doc = parse_document(html)
+    elems = compiled.rows(doc)
+    rows = []
+    regular = 0
+    for el in elems:
+        pinned_by_td = _first(_TOP_NOTICE, el) is not None
+        has_cate00 = any('cate00' in (sp.get('class') or '').split() for sp in _CATE_SPANS(el))
+        if not (pinned_by_td or has_cate00):
+            if take_n is not None and regular >= take_n:
+                break
+            regular += 1
+
+        category = ""
+        if compiled.category is not None:
+            ce = _first(compiled.category, el)
+            if ce is not None:
+                category = get_text(ce)
+
+        title_elem = _first(compiled.title, el)
+        title = get_text(title_elem) if title_elem is not None else "제목 없음"
+
+        link_elem = _first(compiled.link, el)
+        href = link_elem.get('href') if link_elem is not None else None
+
+        date, views = "", ""
+        tds = _TDS(el)
+        if len(tds) >= 5:
+            date = get_text(tds[4])
+            views = get_text(tds[3])
+
+        if not date:
+            date = None
+            for xp in _DATE_FALLBACKS:
+                de = _first(xp, el)
+                if de is not None:
+                    date = get_text(de)
+                    break
+        if not views:
+            for xp in _VIEWS_FALLBACKS:
+                ve = _first(xp, el)
+                if ve is not None:
+                    views = get_text(ve) if get_text(ve, strip=False) else ve.get('data-views', '')
+                    break
+
+        rows.append({
+            'is_pinned': pinned_by_td or has_cate00,
+            'category': category,
+            'title': title,
+            'href': href,
+            'date': date,
+            'views': views,
+        })
+    return len(elems), rows
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus 텍스트 형식 메트릭 (외부 의존성 없음).
+metrics_port를 설정하면 http://127.0.0.1:<port>/metrics 로 노출한다.
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("website_monitor.metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CYCLE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 필요 (받은 값 {tuple(labels)})")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_labels(self.labelnames, key)} {_fmt(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                sample = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            sample[0][bisect.bisect_left(self.buckets, value)] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_sample(self, key, value):
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _fmt(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(self.prefix + name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(Gauge(self.prefix + name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(self.prefix + name, help_text, labelnames, buckets))
+
+    def add_collector(self, fn):
+        """노출 직전에 호출할 함수 (풀 상태처럼 따로 갱신되지 않는 값을 게이지에 옮겨 담을 때)"""
+        self._collectors.append(fn)
+
+    def render(self):
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception as e:
+                logger.warning(f"메트릭 수집 실패: {e}")
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MonitorMetrics(Registry):
+    """website_monitor가 쓰는 메트릭 모음 (site 라벨 = 설정의 name)"""
+
+    def __init__(self):
+        super().__init__(prefix="website_monitor_")
+        self.fetch_seconds = self.histogram("fetch_seconds", "fetch_page wall time (HTTP, endpoint or browser)", ["site"])
+        self.render_seconds = self.histogram("render_seconds", "Selenium render time (driver.get + wait)", ["site"])
+        self.parse_seconds = self.histogram("parse_seconds", "parse_notices time", ["site"])
+        self.diff_seconds = self.histogram("diff_seconds", "Seen-index diff and state update time", ["site"])
+        self.slack_post_seconds = self.histogram("slack_post_seconds", "Slack post time per outbox message", ["site"])
+        self.cycle_seconds = self.histogram("cycle_seconds", "run_once duration", buckets=CYCLE_BUCKETS)
+
+        self.bytes_downloaded = self.counter("bytes_downloaded_total", "Response bytes received", ["site"])
+        self.new_notices = self.counter("new_notices_total", "New notices detected", ["site"])
+        self.pages_skipped = self.counter("pages_skipped_total", "Checks that skipped parsing", ["site", "reason"])
+        self.detail_pages = self.counter("detail_pages_total", "Detail page summaries by source (fetch, cache, error)", ["site", "source"])
+        self.extra_pages = self.counter("extra_pages_total", "Follow-up list pages fetched by pagination", ["site"])
+        self.near_duplicates = self.counter("near_duplicates_total", "New notices matched to an earlier title (action: update, suppress)", ["site", "action"])
+        self.fetch_errors = self.counter("fetch_errors_total", "Fetches that returned nothing", ["site"])
+        self.slack_errors = self.counter("slack_errors_total", "Failed Slack post attempts", ["kind"])
+        self.cycle_overruns = self.counter("cycle_overruns_total", "Cycles that took longer than check_interval")
+        self.drivers_started = self.counter("drivers_started_total", "Chrome drivers started")
+        self.drivers_retired = self.counter("drivers_retired_total", "Chrome drivers shut down (recycled or broken)")
+        self.chrome_cleaned = self.counter("chrome_processes_cleaned_total", "Chrome processes killed or reaped by the watchdog", ["kind"])
+
+        self.notices_matched = self.gauge("notices_matched", "Notices parsed on the last check", ["site"])
+        self.last_cycle_seconds = self.gauge("last_cycle_seconds", "Duration of the last run_once")
+        self.check_interval = self.gauge("check_interval_seconds", "Configured check_interval")
+        self.drivers_live = self.gauge("drivers_live", "Chrome drivers currently running")
+        self.chrome_rss = self.gauge("chrome_rss_bytes", "Combined RSS of chromedriver/Chrome process trees (last measured)")
+        self.shard_workers = self.gauge("shard_workers", "Live workers in the shard ring (shard_mode)")
+        self.shard_sites = self.gauge("shard_sites_owned", "Sites owned by this worker (shard_mode)")
+        self.slack_pending = self.gauge("slack_outbox_pending", "Messages waiting in the Slack outbox")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(registry, port, host="127.0.0.1"):
+    """백그라운드 스레드로 /metrics 서버를 띄운다"""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"메트릭 엔드포인트: http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+제목만 고쳐 다시 보이는 공지(근사 중복) 찾기.
+- title_signature: 제목에서 수정 표시("(수정)", "[마감]" 등)와 말머리("[대학원행정팀]")를 떼고
+  글자 3-gram SimHash(64비트) + 제목 속 숫자의 지문을 만든다 ("7월"/"8월"처럼 숫자만 다른 정기 공지는 다른 공지)
+- NearDupIndex: 사이트별 서명을 LSH 밴드(dict)로 색인한다. 조회는 밴드 수만큼의 dict 조회 + 같은 버킷 후보 비교라
+  기록이 몇 달 치로 늘어도 비용이 거의 그대로다.
+
+max_distance가 k면 64비트를 k+1개 밴드로 나눈다. 해밍 거리 k 이하인 두 서명은 적어도 한 밴드가 같으므로 놓치는 후보가 없다.
+"""
+
+import hashlib
+import re
+import time
+from array import array
+from collections import defaultdict
+
+from seen_index import array_from_b64, b64_array
+
+_EDIT_WORDS = r"수정|재공지|재게시|재안내|정정|변경|추가|연장|마감|종료|완료|취소|updated?|closed"
+# 괄호 안에 수정 표시가 있으면 괄호째로: "(수정)", "[마감]", "(~7/23 마감)", "(기간연장)"
+_EDIT_GROUP_RE = re.compile(rf"[(\[【<〈][^)\]】>〉]*(?:{_EDIT_WORDS})[^)\]】>〉]*[)\]】>〉]", re.IGNORECASE)
+# 괄호 없이 붙는 수정 표시는 뜻이 분명한 것만
+_EDIT_WORD_RE = re.compile(r"수정|재공지|정정|마감|종료")
+_TAG_RE = re.compile(r"\[[^\]]{1,20}\]|【[^】]{1,20}】")
+_DIGITS_RE = re.compile(r"\d+")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+def simhash(features):
+    counts = [0] * 64
+    for f in features:
+        h = _hash64(f)
+        for i in range(64):
+            counts[i] += 1 if h >> i & 1 else -1
+    sig = 0
+    for i, c in enumerate(counts):
+        if c > 0:
+            sig |= 1 << i
+    return sig
+
+
+def title_signature(title):
+    """(SimHash, 숫자 지문) 반환. 숫자 지문이 다르면 비슷해도 다른 공지로 본다."""
+    text = _TAG_RE.sub(" ", _EDIT_GROUP_RE.sub(" ", title or ""))
+    nums = int.from_bytes(hashlib.blake2b("|".join(_DIGITS_RE.findall(text)).encode(), digest_size=4).digest(), "little")
+    text = _NON_WORD_RE.sub("", _EDIT_WORD_RE.sub(" ", text).lower())
+    grams = [text[i:i + 3] for i in range(len(text) - 2)] or [text]
+    return simhash(grams), nums
+
+
+class NearDupIndex:
+    """
+    entries: 공지 지문 → [SimHash, 숫자 지문, 마지막으로 본 날(epoch 일)]
+    bands[b]: b번째 밴드 값 → 그 밴드가 같은 공지 지문들
+    max_items / max_age_days: 넘거나 오래된 서명은 마지막으로 본 날이 오래된 것부터 버린다
+    """
+
+    def __init__(self, max_distance=3, max_items=5000, max_age_days=180):
+        self.max_distance = max(0, min(15, int(max_distance)))
+        self.max_items = int(max_items)
+        self.max_age_days = int(max_age_days)
+        self.n_bands = self.max_distance + 1
+        self.band_bits = 64 // self.n_bands
+        self.entries = {}
+        self.bands = [defaultdict(set) for _ in range(self.n_bands)]
+        self._aged_day = None       # 나이 기준 정리는 하루에 한 번만 (전체를 훑으므로)
+        self.dirty = False          # to_state() 뒤로 바뀌었는지 (안 바뀌었으면 다시 직렬화하지 않는다)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _band_keys(self, sig):
+        mask = (1 << self.band_bits) - 1
+        return [(sig >> (b * self.band_bits)) & mask for b in range(self.n_bands)]
+
+    def matches(self, signature):
+        """해밍 거리 max_distance 이하이고 숫자 지문이 같은 [(공지 지문, 거리)] (가까운 순)"""
+        sig, nums = signature
+        found = {}
+        for table, key in zip(self.bands, self._band_keys(sig)):
+            for fp in table.get(key, ()):
+                if fp in found:
+                    continue
+                other, other_nums, _ = self.entries[fp]
+                dist = (other ^ sig).bit_count()
+                found[fp] = dist if other_nums == nums else None
+        return sorted(((fp, d) for fp, d in found.items() if d is not None and d <= self.max_distance),
+                      key=lambda x: x[1])
+
+    def add(self, fp, signature, day):
+        sig, nums = signature
+        self.entries[fp] = [sig, nums, day]
+        self.dirty = True
+        for table, key in zip(self.bands, self._band_keys(sig)):
+            table[key].add(fp)
+
+    def touch(self, notices, day=None, signatures=None):
+        """현재 페이지 공지를 기록 (처음 보는 공지만 서명을 계산한다)"""
+        day = int(day if day is not None else time.time() // 86400)
+        signatures = signatures or {}
+        for n in notices:
+            entry = self.entries.get(n.fp)
+            if entry is not None:
+                if entry[2] != day:
+                    entry[2] = day
+                    self.dirty = True
+            else:
+                self.add(n.fp, signatures.get(n.fp) or title_signature(n.title), day)
+
+    def _remove(self, fp):
+        sig = self.entries.pop(fp)[0]
+        self.dirty = True
+        for table, key in zip(self.bands, self._band_keys(sig)):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(fp)
+                if not bucket:
+                    del table[key]
+
+    def evict(self, day=None):
+        day = int(day if day is not None else time.time() // 86400)
+        stale = []
+        if self.max_age_days > 0 and day != self._aged_day:
+            self._aged_day = day
+            stale = [fp for fp, e in self.entries.items() if day - e[2] > self.max_age_days]
+        over = len(self.entries) - len(stale) - self.max_items
+        if over > 0:
+            stale_set = set(stale)
+            rest = sorted((e[2], fp) for fp, e in self.entries.items() if fp not in stale_set)
+            stale += [fp for _, fp in rest[:over]]
+        for fp in stale:
+            self._remove(fp)
+        return len(stale)
+
+    # ---------- 직렬화 ----------
+    def to_state(self):
+        self.dirty = False
+        fps = list(self.entries)
+        return {
+            "fp": b64_array(array("Q", fps)),
+            "sig": b64_array(array("Q", (self.entries[fp][0] for fp in fps))),
+            "nums": b64_array(array("I", (self.entries[fp][1] for fp in fps))),
+            "day": b64_array(array("H", (self.entries[fp][2] for fp in fps))),
+        }
+
+    @classmethod
+    def from_state(cls, state, **kwargs):
+        """state가 없으면 빈 인덱스. 밴드는 저장하지 않고 max_distance에 맞춰 다시 만든다."""
+        index = cls(**kwargs)
+        if state:
+            rows = zip(array_from_b64("Q", state["fp"]), array_from_b64("Q", state["sig"]),
+                       array_from_b64("I", state["nums"]), array_from_b64("H", state["day"]))
+            for fp, sig, nums, day in rows:
+                index.add(fp, (sig, nums), day)
+        index.dirty = False
+        return index
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공지 1건 레코드.
+- Notice: parse_notices / 엔드포인트 결과가 만드는 공지 (__slots__라 dict보다 작고, 파싱 워커에서 pickle로 넘어온다)
+- fingerprint: 정규화한 제목+링크의 64비트 blake2b 정수 — SeenIndex 키
+- legacy_hash: 예전 상태에 저장된 md5 hex (옛 기록을 읽는 호환용)
+"""
+
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_title(t):
+    return _SPACE_RE.sub(' ', (t or '')).strip()
+
+
+def normalize_url(u):
+    if not u:
+        return u
+    s = urlsplit(u)
+    q = urlencode(sorted(parse_qsl(s.query, keep_blank_values=True)))
+    path = re.sub(r'/+$', '', s.path or '')
+    return urlunsplit((s.scheme, s.netloc, path, q, ''))
+
+
+def notice_key(title, link):
+    """중복 판단 기준 문자열 (정규화한 제목 + 링크)"""
+    return f"{normalize_title(title)}{normalize_url(link)}"
+
+
+def fingerprint(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def legacy_hash(key):
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+class Notice:
+    __slots__ = ("title", "link", "date", "views", "category", "is_pinned", "fp", "detail", "updated")
+
+    def __init__(self, title, link, date, views, category, is_pinned, fp=None, detail=None, updated=False):
+        self.title = title
+        self.link = link
+        self.date = date
+        self.views = views
+        self.category = category
+        self.is_pinned = is_pinned
+        self.fp = fingerprint(notice_key(title, link)) if fp is None else fp
+        self.detail = detail    # 상세 페이지 요약 (fetch_details 사이트만)
+        self.updated = updated  # 제목만 바뀐 예전 공지 (near_dup 사이트만)
+
+    @property
+    def hash(self):
+        """outbox·메시지 장부에 남기는 16자리 hex"""
+        return f"{self.fp:016x}"
+
+    @property
+    def legacy_hash(self):
+        return legacy_hash(notice_key(self.title, self.link))
+
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in ("title", "link", "date", "views", "category", "is_pinned")}
+        if self.detail is not None:
+            d["detail"] = self.detail
+        if self.updated:
+            d["updated"] = True
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        # 예전 다이제스트 파일의 'hash'(md5)는 버리고 지문을 다시 계산한다
+        return cls(d.get("title"), d.get("link"), d.get("date"), d.get("views"), d.get("category"),
+                   d.get("is_pinned", False), detail=d.get("detail"), updated=d.get("updated", False))
+
+    def __eq__(self, other):
+        if not isinstance(other, Notice):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Notice({self.title!r}, {self.link!r}, fp={self.hash})"
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+봇이 올린 Slack 메시지 장부 (SQLite, <data_dir>/posts.db).
+outbox가 전송에 성공할 때마다 ts·채널·사이트·공지 해시·본문·시각을 남겨,
+delete_tool.py / delete_ts.py가 conversations.history를 넘기지 않고 로컬에서 대상을 고른다.
+웹훅 전송은 ts가 없어(API로 지울 수도 없어) 기록하지 않는다.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    channel   TEXT NOT NULL,
+    ts        TEXT NOT NULL,
+    site      TEXT NOT NULL,
+    text      TEXT NOT NULL,
+    posted    REAL NOT NULL,
+    outbox_id TEXT,
+    deleted   REAL,
+    PRIMARY KEY (channel, ts)
+);
+CREATE INDEX IF NOT EXISTS posts_posted ON posts(posted);
+CREATE INDEX IF NOT EXISTS posts_site ON posts(site, posted);
+CREATE TABLE IF NOT EXISTS post_hashes (
+    channel TEXT NOT NULL,
+    ts      TEXT NOT NULL,
+    hash    TEXT NOT NULL,
+    PRIMARY KEY (channel, ts, hash)
+);
+CREATE INDEX IF NOT EXISTS post_hashes_hash ON post_hashes(hash);
+"""
+
+
+def _regexp(pattern, value):
+    return value is not None and re.search(pattern, value) is not None
+
+
+def blocks_text(blocks):
+    """section/header 블록의 글자만 이어 붙인다 (정규식 검색용)"""
+    lines = []
+    for b in blocks or []:
+        txt = b.get("text") or {}
+        if isinstance(txt, dict) and txt.get("text"):
+            lines.append(txt["text"])
+    return "\n".join(lines)
+
+
+class PostLedger:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+
+    def record(self, channel, ts, site, text, hashes=(), posted=None, outbox_id=None):
+        # Slack ts가 곧 게시 시각이다 (시간 범위 검색이 posted 인덱스를 타도록 같은 값으로 둔다)
+        posted = float(ts) if posted is None else posted
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO posts(channel, ts, site, text, posted, outbox_id, deleted) "
+                    "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                    (channel, ts, site, text, posted, outbox_id),
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO post_hashes(channel, ts, hash) VALUES (?, ?, ?)",
+                    [(channel, ts, h) for h in hashes],
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def select(self, channel=None, since=None, until=None, site=None, contains=None, regex=None,
+               notice_hash=None, ts=None, include_deleted=False, limit=None):
+        """조건에 맞는 메시지 (최신 → 과거). since/until은 Slack ts(epoch 초) 기준, 양 끝 포함."""
+        where, args = [], []
+        if channel:
+            where.append("p.channel = ?"); args.append(channel)
+        if ts:
+            where.append("p.ts = ?"); args.append(ts)
+        if since is not None:
+            where.append("p.posted >= ?"); args.append(float(since))
+        if until is not None:
+            where.append("p.posted <= ?"); args.append(float(until))
+        if site:
+            where.append("p.site = ?"); args.append(site)
+        if contains:
+            where.append("instr(p.text, ?) > 0"); args.append(contains)
+        if regex:
+            re.compile(regex)       # 잘못된 정규식은 여기서 바로 오류
+            where.append("p.text REGEXP ?"); args.append(regex)
+        if notice_hash:
+            where.append("(p.channel, p.ts) IN (SELECT channel, ts FROM post_hashes WHERE hash = ?)")
+            args.append(notice_hash)
+        if not include_deleted:
+            where.append("p.deleted IS NULL")
+        sql = "SELECT p.channel, p.ts, p.site, p.text, p.posted, p.outbox_id, p.deleted FROM posts p"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY p.posted DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        keys = ("channel", "ts", "site", "text", "posted", "outbox_id", "deleted")
+        with self._lock:
+            return [dict(zip(keys, row)) for row in self.conn.execute(sql, args)]
+
+    def hashes(self, channel, ts):
+        with self._lock:
+            rows = self.conn.execute("SELECT hash FROM post_hashes WHERE channel = ? AND ts = ?", (channel, ts))
+            return [r[0] for r in rows]
+
+    def mark_deleted(self, channel, ts, when=None):
+        with self._lock:
+            self.conn.execute("UPDATE posts SET deleted = ? WHERE channel = ? AND ts = ?",
+                              (time.time() if when is None else when, channel, ts))
+
+    def oldest(self, channel=None):
+        """장부에 남은 가장 오래된 메시지 시각 (없으면 None)"""
+        sql, args = "SELECT MIN(posted) FROM posts", ()
+        if channel:
+            sql, args = sql + " WHERE channel = ?", (channel,)
+        with self._lock:
+            return self.conn.execute(sql, args).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
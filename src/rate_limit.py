@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slack API 호출용 토큰 버킷.
+초당 rate개씩 토큰이 차고 capacity개까지 모아 둘 수 있다.
+ratelimited(429)를 받으면 pause(Retry-After)로 버킷 전체를 멈춘다.
+"""
+
+import threading
+import time
+
+
+def retry_after_seconds(headers, default=5.0):
+    """응답 헤더의 Retry-After(초). 없거나 이상하면 default"""
+    for k, v in (headers or {}).items():
+        if k.lower() == "retry-after":
+            try:
+                return max(0.0, float(v))
+            except (TypeError, ValueError):
+                break
+    return default
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens=1.0):
+        """토큰을 쓸 수 있으면 쓰고 0, 아니면 기다려야 할 초를 반환"""
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1.0, stop: threading.Event = None):
+        """토큰을 얻을 때까지 대기. stop이 설정되면 False"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+    def pause(self, seconds):
+        """seconds 동안 토큰을 내주지 않고, 그 뒤 빈 버킷에서 다시 채운다 (Retry-After 준수)"""
+        with self._lock:
+            until = self._clock() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    rate를 스스로 맞춰 가는 토큰 버킷 (AIMD).
+    ratelimited를 받으면 Retry-After만큼 멈추고 rate를 decrease배로 줄이고,
+    성공이 rate초 분량만큼 이어질 때마다 increase만큼 올린다 (min_rate~max_rate).
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=0.1, max_rate=None, increase=0.1, decrease=0.5,
+                 clock=time.monotonic):
+        super().__init__(rate, capacity, clock)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.limited = 0
+        self._streak = 0
+
+    def on_success(self):
+        with self._lock:
+            self._streak += 1
+            if self._streak >= max(1.0, self.rate) and self.rate < self.max_rate:
+                self._refill(self._clock())
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                self._streak = 0
+
+    def on_ratelimited(self, retry_after):
+        with self._lock:
+            now = self._clock()
+            self.limited += 1
+            self._streak = 0
+            # 동시에 나간 요청들이 한꺼번에 걸려도 한 번만 줄인다
+            if now >= self._paused_until:
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.pause(retry_after)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+사이트별 적응형 스케줄러.
+사이트마다 다음 체크 시각을 힙에 두고, 변화가 없으면 간격을 늘리고(backoff)
+새 글이 나오거나 활동 시간대(active_hours)면 간격을 줄인다.
+"""
+
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime
+
+
+def parse_active_hours(ranges):
+    """["08:00-19:00", "22:00-02:00"] → [(분, 분), ...] (자정을 넘는 구간 허용)"""
+    out = []
+    for r in ranges or []:
+        start, end = r.split("-")
+        sh, sm = (int(x) for x in start.strip().split(":"))
+        eh, em = (int(x) for x in end.strip().split(":"))
+        out.append((sh * 60 + sm, eh * 60 + em))
+    return out
+
+
+def in_active_hours(ranges, when=None):
+    if not ranges:
+        return False
+    dt = when or datetime.now()
+    minute = dt.hour * 60 + dt.minute
+    for start, end in ranges:
+        if start <= end:
+            if start <= minute < end:
+                return True
+        elif minute >= start or minute < end:
+            return True
+    return False
+
+
+class SiteSchedule:
+    """사이트 1개의 간격 설정과 현재 간격"""
+
+    def __init__(self, key, base, min_interval, max_interval, backoff, jitter, active_hours, active_interval,
+                 interval=None):
+        self.key = key
+        self.base = base
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.active_hours = active_hours
+        self.active_interval = active_interval
+        self.interval = min(max(interval or base, min_interval), max_interval)
+
+    def effective_interval(self, when=None):
+        if in_active_hours(self.active_hours, when):
+            return min(self.interval, self.active_interval)
+        return self.interval
+
+    def record(self, changed):
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+
+class SiteScheduler:
+    """
+    add()로 사이트를 등록하고, pop_due()로 지금 체크할 사이트를 꺼낸 뒤
+    체크가 끝나면 record()로 결과를 알려 주면 다음 시각이 다시 힙에 들어간다.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self.sites = {}
+
+    def add(self, schedule: SiteSchedule, first_due=None):
+        self.sites[schedule.key] = schedule
+        due = first_due if first_due is not None else self._clock()
+        heapq.heappush(self._heap, (due, next(self._seq), schedule.key))
+
+    def pop_due(self, now=None):
+        now = self._clock() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, key = heapq.heappop(self._heap)
+            if key in self.sites:
+                due.append(key)
+        return due
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def record(self, key, changed, now=None):
+        """체크 결과 반영. changed가 None이면(수집 실패) 간격을 유지한다."""
+        schedule = self.sites[key]
+        if changed is not None:
+            schedule.record(changed)
+        now = self._clock() if now is None else now
+        interval = schedule.effective_interval()
+        if schedule.jitter:
+            interval *= 1 + random.uniform(-schedule.jitter, schedule.jitter)
+        heapq.heappush(self._heap, (now + interval, next(self._seq), key))
+        return interval
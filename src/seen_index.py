@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+사이트별 '이미 본 공지' 인덱스.
+- SeenIndex: 64비트 지문(notice.fingerprint)과 first_seen/last_seen을 고정 폭 배열로 유지, 개수/나이 기준으로 제거
+- BloomFilter: 제거된 오래된 지문까지 고정 메모리로 기억하는 확률적 집합 (거짓 양성만 있음)
+
+조회는 배열 위의 해시 테이블이라 O(1)이고, 상태에는 같은 배열을 그대로 base64로 저장한다 ("fingerprints").
+예전 형식(md5 hex의 "seen" 목록, 더 예전의 "hashes")도 읽는다 — 그 항목은 adopt()가
+현재 공지의 md5와 맞춰 보며 지문으로 옮기고, 맞는 공지가 다시 나오지 않으면 나이/개수 기준으로 사라진다.
+"""
+
+import base64
+import hashlib
+import math
+import sys
+import time
+from array import array
+from collections import OrderedDict
+
+
+class BloomFilter:
+    def __init__(self, m_bits=1 << 16, k=7, bits=None):
+        self.m = int(m_bits)
+        self.k = int(k)
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.m + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, n, fp_rate=0.01):
+        m = max(64, int(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+        k = max(1, round(m / n * math.log(2)))
+        return cls(m, k)
+
+    def _positions(self, key):
+        # 지문(int)과 예전 md5 hex(str)를 모두 받는다
+        data = key.to_bytes(8, "little") if isinstance(key, int) else key.encode()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.m for i in range(self.k)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def to_state(self):
+        return {"m": self.m, "k": self.k, "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["m"], state["k"], base64.b64decode(state["bits"]))
+
+
+def b64_array(arr):
+    """array → 리틀 엔디언 바이트의 base64 (상태 파일용)"""
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+
+def array_from_b64(typecode, text):
+    arr = array(typecode)
+    arr.frombytes(base64.b64decode(text))
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def pack_fingerprints(rows):
+    """[(지문, first_seen, last_seen)] → 상태의 "fingerprints" 값 (리틀 엔디언 배열의 base64, 순서 유지)"""
+    rows = list(rows)
+    return {
+        "fp": b64_array(array("Q", [r[0] for r in rows])),
+        "first": b64_array(array("I", [int(r[1]) for r in rows])),
+        "last": b64_array(array("I", [int(r[2]) for r in rows])),
+    }
+
+
+def unpack_fingerprints(packed):
+    """pack_fingerprints의 역 → (지문, first_seen, last_seen) 배열 세 개"""
+    if not packed:
+        return array("Q"), array("I"), array("I")
+    return array_from_b64("Q", packed["fp"]), array_from_b64("I", packed["first"]), array_from_b64("I", packed["last"])
+
+
+class SeenIndex:
+    """
+    max_items: 정확히 기억할 최대 지문 수 (넘으면 가장 오래전에 본 것부터 제거)
+    max_age: 마지막으로 본 뒤 이 시간(초)이 지나면 제거 (0이면 무제한)
+    bloom: 제거된 지문까지 기억할 BloomFilter (없으면 None)
+    legacy: 아직 지문으로 옮기지 못한 예전 md5 hex → [first_seen, last_seen]
+
+    지문/시각은 칸(slot) 번호로 맞춘 배열 세 개(Q, I, I)에 두고, 지문 → 칸은 열린 주소법 해시 테이블(array('I'),
+    칸 번호 + 1, 0은 빈 칸)로 찾는다. 지문이 이미 blake2b라 하위 비트를 그대로 해시로 쓴다.
+    공지당 메모리는 16바이트 + 테이블 8~16바이트 (dict/list로 두면 정수 객체까지 200바이트 가까이 든다).
+    제거는 배열을 다시 만들고 테이블을 새로 채운다 (evict에서만, 한 번에 O(n)).
+    """
+
+    def __init__(self, max_items=1000, max_age=0, bloom=None):
+        self.max_items = int(max_items)
+        self.max_age = float(max_age)
+        self.bloom = bloom
+        self.legacy_bloom = False       # 블룸 필터가 md5 hex로 채워진 예전 것인지
+        self._fps = array("Q")
+        self._first = array("I")
+        self._last = array("I")
+        self._table = array("I", bytes(4 * 8))
+        self._mask = 7
+        self.legacy = OrderedDict()
+
+    def __contains__(self, fp):
+        return self._find(fp) >= 0 or (self.bloom is not None and fp in self.bloom)
+
+    def __len__(self):
+        return len(self._fps) + len(self.legacy)
+
+    # ---------- 칸/테이블 ----------
+    def _find(self, fp):
+        """fp가 든 칸 번호, 없으면 -1"""
+        table, fps, mask = self._table, self._fps, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if not slot:
+                return -1
+            if fps[slot - 1] == fp:
+                return slot - 1
+            i = (i + 1) & mask
+
+    def _place(self, slot):
+        table, mask = self._table, self._mask
+        i = self._fps[slot] & mask
+        while table[i]:
+            i = (i + 1) & mask
+        table[i] = slot + 1
+
+    def _rebuild(self):
+        # 채움률 1/2 이하로 유지
+        size = 8
+        while size < 2 * len(self._fps) + 2:
+            size *= 2
+        self._table = array("I", bytes(4 * size))
+        self._mask = size - 1
+        for slot in range(len(self._fps)):
+            self._place(slot)
+
+    def _add(self, fp, first, last):
+        self._fps.append(fp)
+        self._first.append(first)
+        self._last.append(last)
+        if 2 * len(self._fps) + 2 > len(self._table):
+            self._rebuild()
+        else:
+            self._place(len(self._fps) - 1)
+        if self.bloom is not None:
+            self.bloom.add(fp)
+
+    def _drop(self, slots):
+        keep = [s for s in range(len(self._fps)) if s not in slots]
+        self._fps = array("Q", (self._fps[s] for s in keep))
+        self._first = array("I", (self._first[s] for s in keep))
+        self._last = array("I", (self._last[s] for s in keep))
+        self._rebuild()
+
+    # ---------- 기록 ----------
+    def touch(self, fps, now=None):
+        """현재 페이지에 있는 지문을 본 것으로 기록 (새 지문은 추가, 기존 지문은 last_seen 갱신)"""
+        now = int(now if now is not None else time.time())
+        for fp in fps:
+            slot = self._find(fp)
+            if slot < 0:
+                self._add(fp, now, now)
+            else:
+                self._last[slot] = now
+
+    def adopt(self, notices):
+        """
+        예전 md5 기록에 있는 공지를 지문으로 옮긴다 (first/last_seen 유지). 예전 기록이 없으면 아무것도 안 한다.
+        diff·touch 전에 불러야 업그레이드 직후 옛 공지를 새 공지로 알리지 않는다.
+        """
+        if not self.legacy and not self.legacy_bloom:
+            return 0
+        moved = 0
+        for n in notices:
+            if self._find(n.fp) >= 0:
+                continue
+            h = n.legacy_hash
+            entry = self.legacy.pop(h, None)
+            if entry is not None:
+                self._add(n.fp, int(entry[0]), int(entry[1]))
+                moved += 1
+            elif self.legacy_bloom and h in self.bloom:
+                self.bloom.add(n.fp)
+                moved += 1
+        return moved
+
+    def evict(self, now=None):
+        now = now if now is not None else time.time()
+        removed = 0
+        # 예전 기록은 지문으로 옮긴 것보다 오래됐으므로 먼저 버린다
+        while self.legacy and len(self) > self.max_items:
+            self.legacy.popitem(last=False)
+            removed += 1
+        drop = set()
+        if self.max_age > 0:
+            cutoff = now - self.max_age
+            while self.legacy and next(iter(self.legacy.values()))[1] < cutoff:
+                self.legacy.popitem(last=False)
+                removed += 1
+            if self._last and min(self._last) < cutoff:
+                drop = {s for s, last in enumerate(self._last) if last < cutoff}
+        over = len(self._fps) - len(drop) - self.max_items
+        if over > 0:
+            # 마지막으로 본 시각이 이른 것부터 (같으면 먼저 들어온 것부터)
+            rest = sorted((last, s) for s, last in enumerate(self._last) if s not in drop)
+            drop.update(s for _, s in rest[:over])
+        if drop:
+            self._drop(drop)
+        return removed + len(drop)
+
+    def first_seen(self, fp):
+        slot = self._find(fp)
+        return self._first[slot] if slot >= 0 else None
+
+    def rows(self):
+        return zip(self._fps, self._first, self._last)
+
+    # ---------- 직렬화 ----------
+    def to_state(self):
+        state = {"fingerprints": {"fp": b64_array(self._fps), "first": b64_array(self._first), "last": b64_array(self._last)}}
+        if self.legacy:
+            state["seen"] = [[h, first, last] for h, (first, last) in self.legacy.items()]
+        if self.bloom is not None:
+            state["bloom"] = self.bloom.to_state()
+            if not self.legacy_bloom:
+                state["bloom"]["keys"] = "fp"
+        return state
+
+    @classmethod
+    def from_state(cls, site_data, max_items=1000, max_age=0, bloom_capacity=0, bloom_fp_rate=0.001, now=None):
+        """
+        site_data의 fingerprints(와 예전 seen/hashes 목록)에서 복원.
+        bloom_capacity가 0이면 블룸 필터를 쓰지 않는다.
+        """
+        bloom = None
+        legacy_bloom = False
+        if bloom_capacity and site_data.get("bloom"):
+            bloom = BloomFilter.from_state(site_data["bloom"])
+            legacy_bloom = site_data["bloom"].get("keys") != "fp"
+        elif bloom_capacity:
+            bloom = BloomFilter.for_capacity(bloom_capacity, bloom_fp_rate)
+        index = cls(max_items=max_items, max_age=max_age, bloom=bloom)
+        index.legacy_bloom = legacy_bloom
+        index._fps, index._first, index._last = unpack_fingerprints(site_data.get("fingerprints"))
+        index._rebuild()
+        if "seen" in site_data:
+            for h, first, last in site_data["seen"]:
+                index.legacy[h] = [first, last]
+        else:
+            # 더 예전 형식: 순서 없는 해시 목록 → 지금 본 것으로 간주
+            stamp = int(now if now is not None else time.time())
+            for h in site_data.get("hashes", []):
+                index.legacy[h] = [stamp, stamp]
+        if bloom is not None and not site_data.get("bloom"):
+            for fp in index._fps:
+                bloom.add(fp)
+            for h in index.legacy:
+                bloom.add(h)
+            index.legacy_bloom = bool(index.legacy)
+        return index
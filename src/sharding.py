@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+샤드 모드: 여러 워커(한 호스트 또는 여러 호스트)가 사이트를 나눠 맡는다.
+- HashRing: site_key(URL md5)를 일관 해시 링에 올려 담당 워커를 정한다 (워커가 늘거나 줄어도 일부 사이트만 옮겨 감)
+- SqliteCoordinator: 공유 SQLite 파일의 heartbeat 테이블 (한 호스트, 또는 잠금이 되는 공유 파일시스템)
+- RedisCoordinator: Redis 호환 서버(Valkey, KeyDB 등)의 sorted set — 서버 시각(TIME)을 써서 호스트 간 시계 차이와 무관
+- ShardManager: 백그라운드로 heartbeat를 보내고, 사이클마다 살아 있는 워커로 링을 다시 만들어 담당 사이트를 계산한다
+- 인계: SQLite 모드는 state.db를 같이 쓰므로 그대로 이어받고, Redis 모드는 체크할 때마다 사이트 상태를
+  <prefix>:state:<site_key>에 올려 두었다가 새로 맡은 워커가 가져간다
+- claim(): 같은 알림(outbox 메시지 id)은 먼저 잡은 워커 하나만 보낸다 (담당이 넘어가는 사이 두 워커가 같은 공지를 봐도 한 번)
+
+heartbeat가 ttl초 넘게 끊긴 워커는 빠지고, 그 사이트는 남은 워커들이 다음 사이클에 나눠 맡는다.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, unquote
+
+logger = logging.getLogger("website_monitor.sharding")
+
+
+def _point(text):
+    return int(hashlib.md5(text.encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """members를 워커마다 vnodes개 점으로 올린 링. owner(site_key)는 시계 방향으로 가장 가까운 점의 워커."""
+
+    def __init__(self, members, vnodes=64):
+        self.members = tuple(sorted(set(members)))
+        points = sorted((_point(f"{m}#{i}"), m) for m in self.members for i in range(vnodes))
+        self._points = [p for p, _ in points]
+        self._owners = [m for _, m in points]
+
+    def owner(self, site_key):
+        if not self._points:
+            return None
+        try:
+            pos = int(site_key[:16], 16)     # site_key는 이미 md5 hex
+        except ValueError:
+            pos = _point(site_key)
+        return self._owners[bisect.bisect(self._points, pos) % len(self._points)]
+
+
+# ---------- 코디네이터 ----------
+class SqliteCoordinator:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS workers (
+        worker_id TEXT PRIMARY KEY,
+        host      TEXT NOT NULL,
+        pid       INTEGER NOT NULL,
+        started   REAL NOT NULL,
+        heartbeat REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS claims (
+        msg_id    TEXT PRIMARY KEY,
+        worker_id TEXT NOT NULL,
+        expires   REAL NOT NULL
+    );
+    """
+    shares_state = True     # 워커들이 같은 state.db를 쓴다
+
+    def __init__(self, path, worker_id, ttl=30):
+        self.worker_id = worker_id
+        self.ttl = float(ttl)
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def heartbeat(self):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO workers(worker_id, host, pid, started, heartbeat) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET host = excluded.host, pid = excluded.pid, "
+                "started = excluded.started, heartbeat = excluded.heartbeat",
+                (self.worker_id, socket.gethostname(), os.getpid(), self._started, now),
+            )
+            # 오래 죽어 있던 워커 행, 만료된 claim 정리
+            self.conn.execute("DELETE FROM workers WHERE heartbeat < ?", (now - self.ttl * 10,))
+            self.conn.execute("DELETE FROM claims WHERE expires < ?", (now,))
+
+    def members(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id", (time.time() - self.ttl,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def claim(self, msg_id, ttl):
+        """msg_id를 이 워커가 보내도 되면 True (처음 잡았거나 이미 이 워커 것)"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO claims(msg_id, worker_id, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(msg_id) DO UPDATE SET worker_id = excluded.worker_id, expires = excluded.expires "
+                "WHERE claims.expires < ?",
+                (msg_id, self.worker_id, now + ttl, now),
+            )
+            row = self.conn.execute("SELECT worker_id FROM claims WHERE msg_id = ?", (msg_id,)).fetchone()
+        return row is not None and row[0] == self.worker_id
+
+    def put_state(self, site_key, site_data):
+        pass
+
+    def get_state(self, site_key):
+        return None
+
+    def leave(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class RespError(Exception):
+    pass
+
+
+class _RespClient:
+    """Redis 직렬화 프로토콜(RESP2)만 구현한 최소 클라이언트 — redis 패키지 없이 몇 개 명령만 쓴다"""
+
+    def __init__(self, url, timeout=5.0):
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", ""):
+            raise ValueError(f"지원하지 않는 주소: {url} (redis://만 지원)")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._buf = b""
+
+    def call(self, *args):
+        """명령 실행. 연결이 끊겨 있으면 한 번 다시 연결한다."""
+        for attempt in (1, 2):
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._roundtrip(args)
+            except OSError:
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock, self._buf = None, b""
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        if self.password:
+            self._roundtrip(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            self._roundtrip(("SELECT", self.db))
+
+    def _roundtrip(self, args):
+        out = [f"*{len(args)}\r\n".encode()]
+        for a in args:
+            data = a if isinstance(a, bytes) else str(a).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(out))
+        return self._read()
+
+    def _line(self):
+        while b"\r\n" not in self._buf:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Redis 연결이 끊겼습니다")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\r\n", 1)
+        return line
+
+    def _exact(self, n):
+        while len(self._buf) < n + 2:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Redis 연결이 끊겼습니다")
+            self._buf += chunk
+        data, self._buf = self._buf[:n], self._buf[n + 2:]
+        return data
+
+    def _read(self):
+        line = self._line()
+        kind, rest = line[:1], line[1:]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            return None if n < 0 else self._exact(n).decode()
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._read() for _ in range(n)]
+        raise RespError(f"알 수 없는 응답: {line[:40]!r}")
+
+
+class RedisCoordinator:
+    """
+    <prefix>:workers         sorted set (score = 서버 시각의 마지막 heartbeat)
+    <prefix>:state:<site>    사이트 상태 JSON (인계용)
+    <prefix>:claim:<msg_id>  알림을 잡은 워커 id (ttl초 뒤 만료)
+    """
+    shares_state = False    # state.db는 호스트마다 따로 → 상태를 Redis로 넘긴다
+
+    def __init__(self, url, worker_id, ttl=30, prefix="website_monitor"):
+        self.worker_id = worker_id
+        self.ttl = float(ttl)
+        self.prefix = prefix
+        self.key = f"{prefix}:workers"
+        self._lock = threading.Lock()
+        self._client = _RespClient(url)
+
+    def _now(self):
+        sec, usec = self._client.call("TIME")
+        return int(sec) + int(usec) / 1e6
+
+    def heartbeat(self):
+        with self._lock:
+            now = self._now()
+            self._client.call("ZADD", self.key, f"{now:.6f}", self.worker_id)
+            self._client.call("ZREMRANGEBYSCORE", self.key, "-inf", f"{now - self.ttl * 10:.6f}")
+
+    def members(self):
+        with self._lock:
+            now = self._now()
+            return sorted(self._client.call("ZRANGEBYSCORE", self.key, f"{now - self.ttl:.6f}", "+inf"))
+
+    def claim(self, msg_id, ttl):
+        key = f"{self.prefix}:claim:{msg_id}"
+        with self._lock:
+            if self._client.call("SET", key, self.worker_id, "NX", "EX", str(int(ttl))) == "OK":
+                return True
+            return self._client.call("GET", key) == self.worker_id
+
+    def put_state(self, site_key, site_data):
+        with self._lock:
+            self._client.call("SET", f"{self.prefix}:state:{site_key}", json.dumps(site_data, ensure_ascii=False))
+
+    def get_state(self, site_key):
+        with self._lock:
+            raw = self._client.call("GET", f"{self.prefix}:state:{site_key}")
+        return json.loads(raw) if raw else None
+
+    def leave(self):
+        with self._lock:
+            self._client.call("ZREM", self.key, self.worker_id)
+
+    def close(self):
+        with self._lock:
+            self._client.close()
+
+
+# ---------- 담당 사이트 계산 ----------
+class ShardManager:
+    """
+    coordinator: SqliteCoordinator / RedisCoordinator
+    heartbeat는 백그라운드 스레드가 ttl/3마다 보내고(사이클이 길어도 빠지지 않게),
+    assign()은 사이클 경계에서만 불러 링을 다시 계산한다.
+    """
+
+    def __init__(self, coordinator, worker_id, vnodes=64):
+        self.coordinator = coordinator
+        self.worker_id = worker_id
+        self.vnodes = int(vnodes)
+        self.ring = None
+        self.owned = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.coordinator.heartbeat()        # 여기서 실패하면 시작하지 않는다
+        self._thread = threading.Thread(target=self._beat, name="shard-heartbeat", daemon=True)
+        self._thread.start()
+
+    def _beat(self):
+        interval = max(1.0, self.coordinator.ttl / 3)
+        while not self._stop.wait(interval):
+            try:
+                self.coordinator.heartbeat()
+            except Exception as e:
+                logger.warning(f"heartbeat 실패: {e}")
+
+    def assign(self, site_keys):
+        """(담당 site_key 집합, 새로 맡은 것, 넘겨준 것). 코디네이터에 닿지 않으면 직전 링을 그대로 쓴다."""
+        try:
+            members = set(self.coordinator.members())
+            members.add(self.worker_id)
+        except Exception as e:
+            if self.ring is None:
+                raise
+            logger.warning(f"워커 목록 조회 실패 → 직전 배정 유지: {e}")
+            members = set(self.ring.members)
+
+        if self.ring is None or set(self.ring.members) != members:
+            before = set(self.ring.members) if self.ring else set()
+            self.ring = HashRing(members, self.vnodes)
+            if before:
+                logger.info(
+                    f"샤드 재조정: 워커 {len(members)}개 "
+                    f"(합류 {sorted(members - before)}, 이탈 {sorted(before - members)})"
+                )
+            else:
+                logger.info(f"샤드 참여: {self.worker_id} (워커 {len(members)}개: {sorted(members)})")
+
+        owned = {k for k in site_keys if self.ring.owner(k) == self.worker_id}
+        gained, lost = owned - self.owned, self.owned - owned
+        if gained or lost:
+            logger.info(f"담당 사이트 {len(owned)}/{len(site_keys)}개 (+{len(gained)}, -{len(lost)})")
+        self.owned = owned
+        return owned, gained, lost
+
+    @property
+    def workers(self):
+        return len(self.ring.members) if self.ring else 0
+
+    def close(self):
+        """heartbeat를 멈추고 목록에서 빠진다 (남은 워커가 ttl을 기다리지 않고 바로 재조정)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            self.coordinator.leave()
+        except Exception as e:
+            logger.warning(f"샤드 탈퇴 실패: {e}")
+        try:
+            self.coordinator.close()
+        except Exception:
+            pass
+
+
+def open_shard_manager(config, data_dir, worker_id):
+    """config의 shard_coordinator(sqlite/redis)에 맞는 ShardManager를 만든다 (시작은 호출한 쪽에서)"""
+    ttl = float(config.get("shard_ttl", 30))
+    backend = config.get("shard_coordinator", "sqlite")
+    if backend == "sqlite":
+        coordinator = SqliteCoordinator(data_dir / config.get("shard_db", "shards.db"), worker_id, ttl)
+    elif backend == "redis":
+        url = config.get("shard_redis_url")
+        if not url:
+            raise ValueError("shard_coordinator: redis에는 shard_redis_url이 필요합니다")
+        coordinator = RedisCoordinator(url, worker_id, ttl, prefix=config.get("shard_redis_prefix", "website_monitor"))
+    else:
+        raise ValueError(f"알 수 없는 shard_coordinator: {backend}")
+    return ShardManager(coordinator, worker_id, vnodes=config.get("shard_vnodes", 64))
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+delete_tool.py용 병렬 삭제 엔진.
+- 스캔(iter_messages) 결과를 큐로 바로 받아, 스캔이 끝나기 전부터 workers개 스레드가 chat.delete를 호출한다
+- 호출 속도는 AdaptiveTokenBucket이 맞춘다 (ratelimited → Retry-After만큼 전체 정지 + 속도 감소, 성공이 이어지면 다시 증가)
+- ratelimited나 일시적 오류를 받은 ts는 건너뛰지 않고 같은 ts를 다시 시도한다
+- checkpoint 파일(JSON Lines)에 처리한 ts를 남겨, 중단 뒤 같은 파일로 다시 실행하면 끝난 ts는 건너뛴다
+"""
+
+import json
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from slack_sdk.errors import SlackApiError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))     # src/ (rate_limit, post_ledger)
+from rate_limit import AdaptiveTokenBucket, retry_after_seconds
+
+# chat.delete는 Tier 3 (분당 50회 이상, 짧은 버스트 허용)
+DEFAULT_RATE = 50 / 60
+DEFAULT_MAX_RATE = 2.0
+
+DONE = ("deleted", "not_found")
+# 이미 지워졌거나 다시 시도해도 소용없는 오류
+GONE_ERRORS = ("message_not_found",)
+PERMANENT_ERRORS = (
+    "cant_delete_message", "compliance_exports_prevent_deletion", "channel_not_found", "not_in_channel",
+    "invalid_auth", "not_authed", "account_inactive", "token_revoked", "missing_scope", "no_permission",
+)
+_STOP = object()
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class Checkpoint:
+    """처리 결과를 ts마다 한 줄씩 붙여 쓴다. done은 다시 실행할 때 건너뛸 ts."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.done = set()
+        self._lock = threading.Lock()
+        self._fp = None
+        if self.path is None:
+            return
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue    # 중단되며 잘린 마지막 줄
+                    if rec.get("result") in DONE:
+                        self.done.add(rec["ts"])
+        self._fp = open(self.path, "a", encoding="utf-8")
+
+    def record(self, ts: str, result: str, error: Optional[str] = None):
+        if self._fp is None:
+            return
+        line = json.dumps({"ts": ts, "result": result, "error": error, "at": round(time.time(), 3)})
+        with self._lock:
+            self._fp.write(line + "\n")
+            self._fp.flush()
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+
+class DeleteEngine:
+    """
+    client: slack_sdk WebClient
+    workers: 동시에 보낼 chat.delete 수
+    rate / max_rate: 시작 속도 / 올라갈 수 있는 최대 속도 (초당 호출)
+    max_attempts: ratelimited가 아닌 일시적 오류(5xx, 네트워크 등)를 같은 ts에 다시 시도할 횟수
+    on_done: 지웠거나 이미 없던 ts마다 on_done(ts, result)를 부른다 (작업 스레드에서)
+    """
+
+    def __init__(self, client, channel: str, workers: int = 4, rate: float = DEFAULT_RATE,
+                 max_rate: float = DEFAULT_MAX_RATE, checkpoint: Optional[str] = None, max_attempts: int = 5,
+                 on_done: Optional[Callable[[str, str], None]] = None, log: Callable[[str], None] = print):
+        self.client = client
+        self.channel = channel
+        self.workers = max(1, int(workers))
+        self.bucket = AdaptiveTokenBucket(rate, capacity=max(1.0, float(workers)), min_rate=0.2, max_rate=max_rate)
+        self.checkpoint = Checkpoint(checkpoint)
+        self.max_attempts = int(max_attempts)
+        self.on_done = on_done
+        self.log = log
+        self.counts = Counter()
+        self.latencies: List[float] = []
+        self.scanned = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._scan_done = None
+        self._started = None
+
+    def stop(self):
+        """진행 중인 호출만 마치고 멈춘다 (남은 ts는 checkpoint로 이어서)"""
+        self._stop.set()
+
+    def run(self, messages: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """messages(스캔 이터레이터)를 읽으면서 삭제하고 report()를 반환"""
+        self._started = time.monotonic()
+        q = queue.Queue(maxsize=self.workers * 50)
+        threads = [threading.Thread(target=self._worker, args=(q,), name=f"delete-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for t in threads:
+            t.start()
+        try:
+            for m in messages:
+                if self._stop.is_set():
+                    break
+                self.scanned += 1
+                ts = m["ts"]
+                if ts in self.checkpoint.done:
+                    self._count("skipped")
+                    continue
+                while not self._stop.is_set():
+                    try:
+                        q.put(ts, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        except KeyboardInterrupt:
+            self.log("Interrupted. Finishing in-flight deletes…")
+            self._stop.set()
+        finally:
+            self._scan_done = time.monotonic()
+            for _ in threads:
+                q.put(_STOP)
+            try:
+                for t in threads:
+                    while t.is_alive():
+                        t.join(0.5)
+            except KeyboardInterrupt:
+                self._stop.set()
+                for t in threads:
+                    t.join()
+            self.checkpoint.close()
+        return self.report()
+
+    def _worker(self, q: "queue.Queue"):
+        while True:
+            ts = q.get()
+            if ts is _STOP:
+                return
+            if self._stop.is_set():
+                continue    # 큐는 비워야 run이 _STOP을 넣을 수 있다
+            self._delete(ts)
+
+    def _delete(self, ts: str):
+        attempt = 0
+        while not self._stop.is_set():
+            if not self.bucket.acquire(stop=self._stop):
+                return
+            started = time.monotonic()
+            try:
+                resp = self.client.chat_delete(channel=self.channel, ts=ts)
+                error = None if resp.get("ok") else resp.get("error", "unknown")
+                headers = {}
+            except SlackApiError as e:
+                error = e.response.get("error") or "unknown"
+                headers = e.response.headers
+            except Exception as e:      # 네트워크 오류 등
+                error, headers = f"{type(e).__name__}: {e}", {}
+            elapsed = time.monotonic() - started
+
+            if error == "ratelimited":
+                # 같은 ts를 다시 보낸다 (버킷이 전체를 Retry-After만큼 멈춤)
+                retry = retry_after_seconds(headers)
+                self.bucket.on_ratelimited(retry)
+                self._count("ratelimited")
+                self.log(f"Rate limited. Pausing {retry:.0f}s (rate → {self.bucket.rate * 60:.0f}/min)")
+                continue
+            with self._lock:
+                self.latencies.append(elapsed)
+            if error is None or error in GONE_ERRORS:
+                self.bucket.on_success()
+                result = "deleted" if error is None else "not_found"
+                self._count(result)
+                self.checkpoint.record(ts, result)
+                if self.on_done is not None:
+                    self.on_done(ts, result)
+                self.log(f"✅ deleted ts={ts}" if error is None else f"· already gone ts={ts}")
+                return
+            attempt += 1
+            if error in PERMANENT_ERRORS or attempt >= self.max_attempts:
+                self._count("failed")
+                self.checkpoint.record(ts, "error", error)
+                self.log(f"❌ error ts={ts} -> {error}")
+                return
+            self._count("retried")
+            self._stop.wait(min(30.0, 2 ** attempt))
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def report(self) -> Dict[str, Any]:
+        ended = time.monotonic()
+        elapsed = ended - (self._started or ended)
+        with self._lock:
+            lat = sorted(self.latencies)
+            counts = dict(self.counts)
+        done = counts.get("deleted", 0) + counts.get("not_found", 0)
+        return {
+            "scanned": self.scanned,
+            "deleted": counts.get("deleted", 0),
+            "already_gone": counts.get("not_found", 0),
+            "skipped_checkpoint": counts.get("skipped", 0),
+            "failed": counts.get("failed", 0),
+            "retried": counts.get("retried", 0),
+            "ratelimited": counts.get("ratelimited", 0),
+            "elapsed_s": round(elapsed, 2),
+            "scan_s": round((self._scan_done or ended) - (self._started or ended), 2),
+            "throughput_per_min": round(done / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "p50": round(_percentile(lat, 0.5) * 1000, 1),
+                "p90": round(_percentile(lat, 0.9) * 1000, 1),
+                "p99": round(_percentile(lat, 0.99) * 1000, 1),
+                "max": round((lat[-1] if lat else 0.0) * 1000, 1),
+            },
+            "final_rate_per_min": round(self.bucket.rate * 60, 1),
+            "stopped": self._stop.is_set(),
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lat = report["latency_ms"]
+    lines = [
+        f"scanned={report['scanned']} deleted={report['deleted']} already_gone={report['already_gone']} "
+        f"skipped(checkpoint)={report['skipped_checkpoint']} failed={report['failed']}",
+        f"elapsed={report['elapsed_s']}s (scan {report['scan_s']}s) throughput={report['throughput_per_min']}/min "
+        f"final_rate={report['final_rate_per_min']}/min",
+        f"latency p50={lat['p50']}ms p90={lat['p90']}ms p99={lat['p99']}ms max={lat['max']}ms "
+        f"ratelimited={report['ratelimited']} retried={report['retried']}",
+    ]
+    if report["stopped"]:
+        lines.append("Stopped early — run again with the same --checkpoint to resume.")
+    return "\n".join(lines)
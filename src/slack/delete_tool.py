@@ -12,10 +12,14 @@ from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from dotenv import load_dotenv
 
+from delete_engine import DeleteEngine, format_report, DEFAULT_RATE, DEFAULT_MAX_RATE
+from post_ledger import PostLedger     # delete_engine이 src/를 sys.path에 넣어 둔다
+
 from pathlib import Path
 ROOT_DIR = Path(__file__).resolve().parents[2]    # src/slack → src → <repo>
 from dotenv import load_dotenv
 load_dotenv(ROOT_DIR / ".env")
+DEFAULT_LEDGER = ROOT_DIR / "data" / "posts.db"
 
 
 def parse_time(v: Optional[str]) -> Optional[float]:
@@ -121,12 +125,27 @@ def main():
     ap.add_argument("--since", help="Oldest time (epoch or 'YYYY-MM-DD[ HH:MM:SS]')")
     ap.add_argument("--until", help="Latest time (epoch or 'YYYY-MM-DD[ HH:MM:SS]')")
     ap.add_argument("--max", type=int, default=1000, help="Max messages to scan (default: 1000)")
+    ap.add_argument("--site", help="Delete only posts for this site name (ledger only)")
+    ap.add_argument("--hash", dest="notice_hash", help="Delete only the post that carried this notice hash (ledger only)")
+
+    # 대상 고르기: 로컬 장부(posts.db) 또는 conversations.history 스캔
+    ap.add_argument("--source", choices=("auto", "ledger", "history"), default="auto",
+                    help="Where to select messages from (default: auto = ledger if it exists)")
+    ap.add_argument("--ledger", default=str(DEFAULT_LEDGER), help=f"Post ledger path (default: {DEFAULT_LEDGER})")
 
     # 안전 기본값: 내 봇이 보낸 메시지만 삭제. (사람/타봇은 --include-others 로 허용)
     ap.add_argument("--include-others", action="store_true",
                     help="Also allow deleting non-bot messages (danger)")
     ap.add_argument("--yes", action="store_true",
                     help="Actually delete (without this, DRY-RUN)")
+    # 삭제 엔진 (--yes일 때): 스캔과 동시에 병렬 삭제
+    ap.add_argument("--workers", type=int, default=4, help="Concurrent chat.delete calls (default: 4)")
+    ap.add_argument("--rate", type=float, default=DEFAULT_RATE * 60,
+                    help="Starting delete rate per minute (default: 50, Slack Tier 3)")
+    ap.add_argument("--max-rate", type=float, default=DEFAULT_MAX_RATE * 60,
+                    help="Upper bound the adaptive rate may climb to, per minute (default: 120)")
+    ap.add_argument("--checkpoint",
+                    help="JSON Lines file of processed ts; rerun with the same file to resume")
     args = ap.parse_args()
 
     token = args.token
@@ -135,10 +154,6 @@ def main():
 
     client = WebClient(token=token)
 
-    # 토큰 검증 & 봇 정보
-    auth = client.auth_test()
-    print(f"[auth] ok={auth['ok']} bot_user_id={auth.get('user_id')} app_id={auth.get('app_id')}")
-
     oldest = parse_time(args.since)
     latest = parse_time(args.until)
 
@@ -147,17 +162,63 @@ def main():
 
     bot_only = not args.include_others
 
-    candidates: List[Dict[str, Any]] = []
-    for m in iter_messages(client, args.channel, oldest, latest, max_fetch=args.max):
-        text = m.get("text", "") or ""
-        if substr and substr not in text:
-            continue
-        if rx and not rx.search(text):
-            continue
-        if bot_only and not from_this_bot(m, auth):
-            continue
-        candidates.append(m)
+    source = args.source
+    if source == "auto":
+        source = "ledger" if Path(args.ledger).exists() else "history"
+    if source == "history" and (args.site or args.notice_hash):
+        ap.error("--site/--hash need the post ledger (--source ledger)")
+
+    ledger = None
+    if source == "ledger":
+        # 장부에는 이 봇이 올린 메시지만 있으므로 auth_test/history 없이 로컬에서 고른다
+        if not Path(args.ledger).exists():
+            ap.error(f"Post ledger not found: {args.ledger}")
+        ledger = PostLedger(args.ledger)
+        started = time.perf_counter()
+        rows = ledger.select(channel=args.channel, since=oldest, until=latest, site=args.site,
+                             contains=substr, regex=args.regex, notice_hash=args.notice_hash, limit=args.max)
+        first = ledger.oldest(args.channel)
+        print(f"[ledger] {len(rows)} match(es) in {(time.perf_counter() - started) * 1000:.1f}ms ({args.ledger})")
+        if first is None or (oldest is not None and oldest < first):
+            since_txt = datetime.fromtimestamp(first, timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if first else "-"
+            print(f"⚠️ Ledger starts at {since_txt} UTC; older posts are not in it (use --source history).")
+    else:
+        # 토큰 검증 & 봇 정보
+        auth = client.auth_test()
+        print(f"[auth] ok={auth['ok']} bot_user_id={auth.get('user_id')} app_id={auth.get('app_id')}")
+
+    def matched() -> Iterable[Dict[str, Any]]:
+        if ledger is not None:
+            yield from rows
+            return
+        for m in iter_messages(client, args.channel, oldest, latest, max_fetch=args.max):
+            text = m.get("text", "") or ""
+            if substr and substr not in text:
+                continue
+            if rx and not rx.search(text):
+                continue
+            if bot_only and not from_this_bot(m, auth):
+                continue
+            yield m
+
+    if args.yes:
+        # 스캔 결과를 바로 삭제 엔진으로 흘려보낸다 (스캔이 끝나기 전에 삭제 시작)
+        engine = DeleteEngine(
+            client, args.channel, workers=args.workers, rate=args.rate / 60,
+            max_rate=max(args.rate, args.max_rate) / 60, checkpoint=args.checkpoint,
+            on_done=(lambda ts, _: ledger.mark_deleted(args.channel, ts)) if ledger is not None else None,
+        )
+        report = engine.run(matched())
+        print("\n" + format_report(report))
+        if not report["scanned"]:
+            print("No messages matched. (Nothing to delete)")
+        elif report["failed"]:
+            print(f"\nDone with {report['failed']} error(s).")
+        elif not report["stopped"]:
+            print("\nDone. All selected messages deleted.")
+        return
 
+    candidates: List[Dict[str, Any]] = list(matched())
     if not candidates:
         print("No messages matched. (Nothing to delete)")
         return
@@ -165,38 +226,11 @@ def main():
     print(f"\nFound {len(candidates)} message(s) to delete (DRY-RUN by default):\n")
     for m in candidates:
         ts = m.get("ts")
-        user = m.get("user") or "-"
+        user = m.get("user") or m.get("site") or "-"
         preview = (m.get("text") or "").replace("\n", " ")[:120]
         print(f"- ts={ts} user={user} text={preview!r}")
 
-    if not args.yes:
-        print("\nDRY-RUN: nothing deleted. Add --yes to actually delete.")
-        return
-
-    errors = 0
-    for m in candidates:
-        ts = m["ts"]
-        try:
-            resp = client.chat_delete(channel=args.channel, ts=ts)
-            if resp.get("ok"):
-                print(f"✅ deleted ts={ts}")
-            else:
-                print(f"❌ failed ts={ts} resp={resp}")
-                errors += 1
-        except SlackApiError as e:
-            if e.response.get("error") == "ratelimited":
-                retry = int(e.response.headers.get("Retry-After", "5"))
-                print(f"Rate limited. Sleeping {retry}s…")
-                time.sleep(retry)
-                # 재시도는 루프 다음 아이템으로 진행(원한다면 같은 ts 재시도 로직 추가 가능)
-                continue
-            print(f"❌ error ts={ts} -> {e.response.get('error')}")
-            errors += 1
-
-    if errors:
-        print(f"\nDone with {errors} error(s).")
-    else:
-        print("\nDone. All selected messages deleted.")
+    print("\nDRY-RUN: nothing deleted. Add --yes to actually delete.")
 
 
 if __name__ == "__main__":
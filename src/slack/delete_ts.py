@@ -3,6 +3,8 @@
 
 import argparse
 import os
+import sys
+import time
 from typing import List
 from dotenv import load_dotenv
 from slack_sdk import WebClient
@@ -12,6 +14,9 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).resolve().parents[2]    # src/slack → src → <repo>
 from dotenv import load_dotenv
 load_dotenv(ROOT_DIR / ".env")
+sys.path.insert(0, str(ROOT_DIR / "src"))
+from post_ledger import PostLedger
+DEFAULT_LEDGER = ROOT_DIR / "data" / "posts.db"
 
 def load_ts_from_file(path: str) -> List[str]:
     items = []
@@ -105,32 +110,36 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--token", default=os.getenv("SLACK_BOT_TOKEN"))
     ap.add_argument("--channel", default=os.getenv("SLACK_CHANNEL_ID"), required=not bool(os.getenv("SLACK_CHANNEL_ID")))
-    ap.add_argument("--ts", required=True, help="e.g. 1756181407.518089")
+    ap.add_argument("--ts", help="e.g. 1756181407.518089")
+    ap.add_argument("--hash", dest="notice_hash", help="notice hash → look up the post in the post ledger")
+    ap.add_argument("--ledger", default=str(DEFAULT_LEDGER), help=f"post ledger path (default: {DEFAULT_LEDGER})")
     ap.add_argument("--yes", action="store_true", help="actually delete")
     args = ap.parse_args()
+    if not args.ts and not args.notice_hash:
+        ap.error("--ts or --hash is required")
 
     client = WebClient(token=args.token)
 
-    # 미리 메시지 존재/소유 확인
-    try:
-        auth = client.auth_test()
-        auth_app = auth.get("app_id")
-        hist = client.conversations_history(channel=args.channel, inclusive=True, latest=args.ts, oldest=args.ts, limit=1)
-        msgs = hist.get("messages", [])
-        if not msgs:
-            print("Target message not found (maybe already deleted?).")
+    # 장부에 있으면 history 조회 없이 확인 (이 봇이 올린 메시지만 기록되어 있다)
+    ledger = PostLedger(args.ledger) if Path(args.ledger).exists() else None
+    entry = None
+    if ledger is not None:
+        rows = ledger.select(channel=args.channel, ts=args.ts, notice_hash=args.notice_hash,
+                             include_deleted=True, limit=1)
+        entry = rows[0] if rows else None
+    if args.notice_hash and entry is None:
+        print("No post with that notice hash in the ledger.")
+        return
+    if entry is not None:
+        args.ts = entry["ts"]
+        print(f"Found in ledger: ts={entry['ts']} site={entry['site']}")
+        print(f"text={entry['text'][:200]!r}")
+        if entry["deleted"]:
+            print("Already deleted (per ledger).")
             return
-        msg = msgs[0]
-        print(f"Found message: ts={msg['ts']}")
-        print(f"app_id={msg.get('app_id')} bot_id={msg.get('bot_id')} user={msg.get('user')}")
-        print(f"text={(msg.get('text') or '')[:200]!r}")
-        print(f"blocks? {bool(msg.get('blocks'))}")
-        if msg.get("app_id") and auth_app and msg["app_id"] != auth_app:
-            print("⚠️ Different app_id → this bot cannot delete that message.")
+    else:
+        if not confirm_via_history(client, args):
             return
-    except SlackApiError as e:
-        print("Read error:", e.response.get("error"), e.response.data)
-        return
 
     if not args.yes:
         print("DRY-RUN (add --yes to delete).")
@@ -152,6 +161,35 @@ def main():
             time.sleep(retry)
             resp = client.chat_delete(channel=args.channel, ts=args.ts)
             print("Retry result:", resp.data)
+        elif e.response.get("error") == "message_not_found" and ledger is not None:
+            ledger.mark_deleted(args.channel, args.ts)
+        return
+    if ledger is not None and resp.get("ok"):
+        ledger.mark_deleted(args.channel, args.ts)
+
+
+def confirm_via_history(client, args):
+    """장부에 없는 ts: history로 존재/소유 확인. 지워도 되면 True"""
+    try:
+        auth = client.auth_test()
+        auth_app = auth.get("app_id")
+        hist = client.conversations_history(channel=args.channel, inclusive=True, latest=args.ts, oldest=args.ts, limit=1)
+        msgs = hist.get("messages", [])
+        if not msgs:
+            print("Target message not found (maybe already deleted?).")
+            return False
+        msg = msgs[0]
+        print(f"Found message: ts={msg['ts']}")
+        print(f"app_id={msg.get('app_id')} bot_id={msg.get('bot_id')} user={msg.get('user')}")
+        print(f"text={(msg.get('text') or '')[:200]!r}")
+        print(f"blocks? {bool(msg.get('blocks'))}")
+        if msg.get("app_id") and auth_app and msg["app_id"] != auth_app:
+            print("⚠️ Different app_id → this bot cannot delete that message.")
+            return False
+    except SlackApiError as e:
+        print("Read error:", e.response.get("error"), e.response.data)
+        return False
+    return True
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slack 알림 outbox.
+알림은 먼저 data/outbox/<id>.json으로 디스크에 쓰고, 백그라운드 스레드가 WebClient 하나로 순서대로 보낸다.
+- 전송 속도는 토큰 버킷으로 제한하고, ratelimited/429면 Retry-After 동안 멈춘 뒤 같은 메시지를 다시 보낸다
+- 일시적 오류는 지수 백오프로 계속 재시도, 영구 오류(토큰/채널/블록 오류)는 다음 경로(웹훅) 또는 dead/로 넘긴다
+- 메시지 id(사이트 + 공지 해시)로 같은 알림을 두 번 쌓지 않고, 전송 중 끊긴 메시지는
+  채널 기록에서 metadata의 outbox_id를 찾아 이미 올라갔으면 다시 보내지 않는다 (봇 토큰 경로만 해당)
+- claim을 넘기면(샤드 모드) 보내기 전에 메시지 id를 잡아, 다른 워커가 먼저 잡은 알림은 보내지 않는다
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from rate_limit import TokenBucket, retry_after_seconds
+
+logger = logging.getLogger("website_monitor.slack_outbox")
+
+METADATA_EVENT = "notice_posted"
+
+# 다시 보내도 소용없는 오류
+_PERMANENT_ERRORS = {
+    "invalid_auth", "not_authed", "account_inactive", "token_revoked", "token_expired",
+    "channel_not_found", "not_in_channel", "is_archived", "missing_scope", "restricted_action",
+    "invalid_blocks", "invalid_blocks_format", "msg_too_long", "no_text", "invalid_metadata_format",
+}
+_SENT_LOG_KEEP = 1000
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"rate limited ({retry_after}s)")
+        self.retry_after = retry_after
+
+
+class PermanentError(Exception):
+    pass
+
+
+def message_id(site, notice_hashes):
+    """같은 사이트의 같은 공지 묶음이면 같은 id"""
+    key = site + "\n" + "\n".join(sorted(notice_hashes))
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+class SlackOutbox:
+    def __init__(self, directory: Path, bot_token=None, channel_id=None, webhook_url=None,
+                 http=None, http_timeout=(5, 20), rate=1.0, burst=3, max_backoff=600, on_posted=None, metrics=None, claim=None):
+        self.dir = Path(directory)
+        self.dead_dir = self.dir / "dead"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.channel_id = channel_id
+        self.webhook_url = webhook_url
+        self.http = http or requests.Session()
+        self.http_timeout = http_timeout
+        # WebClient는 봇 경로로 처음 보낼 때 만든다 (웹훅만 쓰면 slack_sdk를 불러오지 않는다)
+        self._bot_token = bot_token if bot_token and channel_id else None
+        self._client = None
+        self.bucket = TokenBucket(rate, burst)
+        self.max_backoff = float(max_backoff)
+        self.on_posted = on_posted
+        self.metrics = metrics     # MonitorMetrics (없으면 기록 안 함)
+        self.claim = claim         # claim(msg_id) → False면 다른 워커가 보낸 알림 (샤드 모드)
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._busy = False
+        self._sent_path = self.dir / "sent.log"
+        self._sent = self._load_sent()
+        self._pending = self._load_pending()
+        if self._pending:
+            logger.info(f"슬랙 대기열 복구: {len(self._pending)}개")
+
+    @property
+    def has_route(self):
+        return self.has_bot or bool(self.webhook_url)
+
+    @property
+    def has_bot(self):
+        return self._bot_token is not None
+
+    @property
+    def client(self):
+        if self._client is None and self._bot_token:
+            from slack_sdk import WebClient
+            self._client = WebClient(token=self._bot_token, timeout=int(self.http_timeout[1]))
+        return self._client
+
+    # ---------- 적재 ----------
+    def enqueue(self, site, text, blocks, notice_hashes):
+        msg_id = message_id(site, notice_hashes)
+        with self._cond:
+            if msg_id in self._sent or any(m["id"] == msg_id for m in self._pending):
+                logger.info(f"슬랙 알림 중복 적재 생략: {site} ({msg_id})")
+                return msg_id
+            msg = {
+                "id": msg_id, "site": site, "text": text, "blocks": blocks,
+                "hashes": list(notice_hashes), "created": time.time(),
+                "retries": 0, "next_attempt": 0.0, "maybe_posted": False, "route": 0,
+            }
+            self._write(msg)
+            self._pending.append(msg)
+            self._cond.notify_all()
+        return msg_id
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    # ---------- 워커 ----------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slack-outbox", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout=30.0):
+        """대기열이 빌 때까지 기다린다. 시간 안에 못 비우면 False (남은 메시지는 디스크에 남아 다음 실행 때 전송)"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 1.0))
+        return True
+
+    def close(self, timeout=10.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_ready(self):
+        """보낼 차례인 메시지와, 없으면 다음 재시도까지 남은 초"""
+        now = time.time()
+        wait = None
+        for msg in self._pending:
+            if msg["next_attempt"] <= now:
+                return msg, 0
+            left = msg["next_attempt"] - now
+            wait = left if wait is None else min(wait, left)
+        return None, wait
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                msg, wait = self._next_ready()
+                if msg is None:
+                    self._cond.wait(wait)
+                    continue
+                self._busy = True
+            try:
+                if not self.bucket.acquire(stop=self._stop):
+                    break
+                self._process(msg)
+            except Exception as e:     # 워커는 죽지 않는다
+                logger.error(f"슬랙 대기열 처리 오류: {e}")
+                self._schedule_retry(msg)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _observe_error(self, kind):
+        if self.metrics is not None:
+            self.metrics.slack_errors.inc(kind=kind)
+
+    def _process(self, msg):
+        if self.claim is not None and not self.claim(msg["id"]):
+            logger.info(f"다른 워커가 이미 보낸 알림 → 생략: {msg['site']} ({msg['id']})")
+            self._finish(msg)
+            return
+        started = time.perf_counter()
+        try:
+            ts = self._send(msg)
+        except RateLimited as e:
+            self._observe_error("ratelimited")
+            logger.warning(f"슬랙 rate limit → {e.retry_after:.0f}초 대기 후 재시도")
+            self.bucket.pause(e.retry_after)
+            return
+        except PermanentError as e:
+            self._observe_error("permanent")
+            if msg["route"] == 0 and self.has_bot and self.webhook_url:
+                logger.error(f"슬랙 봇 전송 실패: {e} → 웹훅으로 재시도")
+                msg.update(route=1, maybe_posted=False)
+                self._write(msg)
+                return
+            logger.error(f"슬랙 전송 실패(영구): {msg['site']} {e} → dead/{msg['id']}.json")
+            self._finish(msg, dead=True)
+            return
+        except Exception as e:
+            self._observe_error("transient")
+            logger.error(f"슬랙 전송 실패: {msg['site']} {e} → 재시도 예정")
+            self._schedule_retry(msg)
+            return
+        if self.metrics is not None:
+            self.metrics.slack_post_seconds.observe(time.perf_counter() - started, site=msg["site"])
+        via = "봇" if msg["route"] == 0 and self.has_bot else "웹훅"
+        logger.info(f"슬랙({via}) 전송 완료: {msg['site']} {len(msg['hashes'])}개" + (f" (ts={ts})" if ts else ""))
+        self._finish(msg)
+        if self.on_posted:
+            try:
+                self.on_posted(msg, ts)
+            except Exception as e:
+                logger.warning(f"전송 후 처리 실패: {e}")
+
+    def _send(self, msg):
+        if msg["route"] == 0 and self.has_bot:
+            return self._send_bot(msg)
+        if self.webhook_url:
+            return self._send_webhook(msg)
+        raise PermanentError("슬랙 전송 경로가 없습니다(Bot 토큰/채널 또는 Webhook URL 설정 필요)")
+
+    def _send_bot(self, msg):
+        from slack_sdk.errors import SlackApiError
+        if msg["maybe_posted"]:
+            ts = self._find_posted(msg)
+            if ts:
+                logger.info(f"이미 전송된 메시지 확인: {msg['site']} (ts={ts}) → 재전송 생략")
+                return ts
+        self._mark_posting(msg)
+        try:
+            resp = self.client.chat_postMessage(
+                channel=self.channel_id,
+                text=msg["text"],
+                blocks=msg["blocks"],
+                metadata={"event_type": METADATA_EVENT, "event_payload": {"outbox_id": msg["id"], "site": msg["site"]}},
+            )
+        except SlackApiError as e:
+            # Slack이 오류로 응답했다면 올라가지 않은 것
+            msg["maybe_posted"] = False
+            error = e.response.get("error")
+            if error == "ratelimited":
+                raise RateLimited(retry_after_seconds(e.response.headers))
+            if error in _PERMANENT_ERRORS:
+                raise PermanentError(error)
+            raise
+        return resp["ts"]
+
+    def _send_webhook(self, msg):
+        self._mark_posting(msg)
+        r = self.http.post(self.webhook_url, json={"text": msg["text"], "blocks": msg["blocks"]}, timeout=self.http_timeout)
+        msg["maybe_posted"] = False
+        if r.status_code == 429:
+            raise RateLimited(retry_after_seconds(r.headers))
+        if r.status_code in (400, 403, 404, 410):
+            raise PermanentError(f"HTTP {r.status_code} {r.text[:100]}")
+        r.raise_for_status()
+        return None
+
+    def _find_posted(self, msg):
+        """전송 도중 끊긴 메시지가 채널에 올라갔는지 metadata로 확인"""
+        from slack_sdk.errors import SlackApiError
+        try:
+            resp = self.client.conversations_history(
+                channel=self.channel_id,
+                oldest=f"{msg['created'] - 60:.6f}",
+                include_all_metadata=True,
+                limit=200,
+            )
+        except SlackApiError as e:
+            logger.warning(f"전송 여부 확인 실패({e.response.get('error')}) → 다시 전송")
+            return None
+        for m in resp.get("messages", []):
+            payload = (m.get("metadata") or {}).get("event_payload") or {}
+            if payload.get("outbox_id") == msg["id"]:
+                return m["ts"]
+        return None
+
+    # ---------- 디스크 ----------
+    def _path(self, msg_id):
+        return self.dir / f"{msg_id}.json"
+
+    def _write(self, msg):
+        path = self._path(msg["id"])
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(msg, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _mark_posting(self, msg):
+        # 보내는 도중 죽으면 재시작 후 이미 올라갔는지부터 확인하도록 먼저 기록
+        msg["maybe_posted"] = True
+        self._write(msg)
+
+    def _schedule_retry(self, msg):
+        msg["retries"] += 1
+        msg["next_attempt"] = time.time() + min(self.max_backoff, 2.0 ** msg["retries"])
+        self._write(msg)
+
+    def _finish(self, msg, dead=False):
+        path = self._path(msg["id"])
+        if dead:
+            self.dead_dir.mkdir(exist_ok=True)
+            os.replace(path, self.dead_dir / path.name)
+        else:
+            with open(self._sent_path, "a", encoding="utf-8") as f:
+                f.write(msg["id"] + "\n")
+            path.unlink(missing_ok=True)
+        with self._cond:
+            self._pending = [m for m in self._pending if m["id"] != msg["id"]]
+            if not dead:
+                self._sent.add(msg["id"])
+
+    def _load_pending(self):
+        pending = []
+        for path in self.dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    msg = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"대기열 파일을 읽을 수 없음: {path.name} ({e})")
+                continue
+            if msg["id"] in self._sent:
+                path.unlink(missing_ok=True)    # 전송 후 삭제 전에 죽은 경우
+                continue
+            msg["next_attempt"] = 0.0
+            pending.append(msg)
+        pending.sort(key=lambda m: m["created"])
+        return pending
+
+    def _load_sent(self):
+        try:
+            with open(self._sent_path, "r", encoding="utf-8") as f:
+                ids = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return set()
+        if len(ids) > _SENT_LOG_KEEP * 2:
+            ids = ids[-_SENT_LOG_KEEP:]
+            tmp = self._sent_path.with_suffix(".log.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("\n".join(ids) + "\n")
+            os.replace(tmp, self._sent_path)
+        return set(ids)
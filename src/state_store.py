@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+사이트별 상태(site_key → {"fingerprints": {...}, 기타 메타}) 저장소. 본 공지 기록 형식은 seen_index.py 참고.
+- JsonStateStore: data/previous_data.json (기존 방식, 원자적 교체 저장)
+- SqliteStateStore: data/state.db (WAL, 변경된 사이트만 증분 upsert)
+  seen_fp 테이블은 한 행에 지문 하나 (INTEGER, 부호 있는 64비트로 저장). seen 테이블에는 아직 옮기지 못한 예전 md5 hex만 남는다
+두 저장소 모두 get_site()가 캐시된 dict를 돌려주고, put_site()로 변경을 표시한 뒤 flush()에서 한 번에 쓴다.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from seen_index import pack_fingerprints, unpack_fingerprints
+
+logger = logging.getLogger("website_monitor.state_store")
+
+
+class JsonStateStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._dirty = False
+        self.in_transaction = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+        except FileNotFoundError:
+            self._data = {}
+
+    def get_site(self, site_key):
+        with self._lock:
+            return self._data.setdefault(site_key, {})
+
+    def put_site(self, site_key, site_data):
+        with self._lock:
+            self._data[site_key] = site_data
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self.in_transaction = True
+            try:
+                # 임시 파일에 다 쓴 뒤 교체 → 쓰는 도중 죽어도 기존 파일은 온전하다
+                tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump({k: v for k, v in self._data.items() if v}, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self._dirty = False
+            finally:
+                self.in_transaction = False
+
+    def close(self):
+        self.flush()
+
+    def forget(self, site_keys):
+        """캐시를 버리고 다음 get_site 때 다시 읽게 한다 — JSON 저장소는 한 프로세스 전용이라 할 일이 없다"""
+
+
+class SqliteStateStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sites (
+        site_key   TEXT PRIMARY KEY,
+        meta       TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS seen (
+        site_key   TEXT NOT NULL,
+        hash       TEXT NOT NULL,
+        pos        INTEGER NOT NULL,
+        first_seen REAL NOT NULL,
+        last_seen  REAL NOT NULL,
+        PRIMARY KEY (site_key, hash)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS seen_hash ON seen(hash);
+    CREATE TABLE IF NOT EXISTS seen_fp (
+        site_key   TEXT NOT NULL,
+        fp         INTEGER NOT NULL,
+        pos        INTEGER NOT NULL,
+        first_seen INTEGER NOT NULL,
+        last_seen  INTEGER NOT NULL,
+        PRIMARY KEY (site_key, fp)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: Path, migrate_from: Path = None):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._cache = {}            # site_key → dict (get_site가 돌려주는 객체)
+        self._written_meta = {}     # site_key → 마지막으로 쓴 meta JSON
+        self._written_seen = {}     # site_key → {md5 hex: (first_seen, last_seen)} 마지막으로 쓴 값
+        self._written_fp = {}       # site_key → {지문: (first_seen, last_seen)} 마지막으로 쓴 값
+        self._dirty = set()
+        self.in_transaction = False
+        # 쓰기는 항상 이 연결 하나로, 락으로 직렬화한다 (수집 스레드에서 읽기도 함)
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._migrate_hex_fingerprints()
+        if migrate_from is not None:
+            self._migrate_json(Path(migrate_from))
+
+    # ---------- 조회/변경 ----------
+    def get_site(self, site_key):
+        with self._lock:
+            site = self._cache.get(site_key)
+            if site is not None:
+                return site
+            row = self.conn.execute("SELECT meta FROM sites WHERE site_key = ?", (site_key,)).fetchone()
+            site = json.loads(row[0]) if row else {}
+            seen = self.conn.execute(
+                "SELECT hash, first_seen, last_seen FROM seen WHERE site_key = ? ORDER BY last_seen, pos",
+                (site_key,),
+            ).fetchall()
+            fps = self.conn.execute(
+                "SELECT fp, first_seen, last_seen FROM seen_fp WHERE site_key = ? ORDER BY last_seen, pos",
+                (site_key,),
+            ).fetchall()
+            if row or seen or fps:
+                fps = [(_from_sql_int(fp), first, last) for fp, first, last in fps]
+                site["fingerprints"] = pack_fingerprints(fps)
+                if seen:
+                    site["seen"] = [[h, first, last] for h, first, last in seen]
+                self._written_meta[site_key] = row[0] if row else None
+                self._written_seen[site_key] = {h: (first, last) for h, first, last in seen}
+                self._written_fp[site_key] = {fp: (first, last) for fp, first, last in fps}
+            self._cache[site_key] = site
+            return site
+
+    def put_site(self, site_key, site_data):
+        with self._lock:
+            self._cache[site_key] = site_data
+            self._dirty.add(site_key)
+
+    def flush(self):
+        """변경된 사이트만 한 트랜잭션으로 upsert"""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            self.in_transaction = True
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for site_key in self._dirty:
+                        self._write_site(site_key, self._cache.get(site_key, {}), now)
+                    self.conn.execute("COMMIT")
+                except BaseException:
+                    self.conn.execute("ROLLBACK")
+                    self._forget_written()
+                    raise
+                self._dirty.clear()
+            finally:
+                self.in_transaction = False
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.conn.close()
+
+    def forget(self, site_keys):
+        """
+        사이트 캐시를 버린다 (샤드 모드에서 다른 워커가 쓰던 사이트를 맡거나 넘겨줄 때).
+        다음 get_site는 DB에서 다시 읽는다. 쓰지 않은 변경은 먼저 flush()해 두어야 한다.
+        """
+        with self._lock:
+            for site_key in site_keys:
+                if site_key in self._dirty:
+                    continue
+                self._cache.pop(site_key, None)
+                self._written_meta.pop(site_key, None)
+                self._written_seen.pop(site_key, None)
+                self._written_fp.pop(site_key, None)
+
+    # ---------- 내부 ----------
+    def _write_site(self, site_key, site_data, now):
+        meta = json.dumps({k: v for k, v in site_data.items() if k not in ("seen", "hashes", "fingerprints")},
+                          ensure_ascii=False)
+        if meta != self._written_meta.get(site_key):
+            self.conn.execute(
+                "INSERT INTO sites(site_key, meta, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(site_key) DO UPDATE SET meta = excluded.meta, updated_at = excluded.updated_at",
+                (site_key, meta, now),
+            )
+            self._written_meta[site_key] = meta
+
+        entries = site_data.get("seen")
+        if entries is None:
+            # 예전 형식(hashes 목록)은 지금 본 것으로 기록
+            entries = [[h, int(now), int(now)] for h in site_data.get("hashes", [])]
+        self._written_seen[site_key] = self._write_rows(
+            "seen", "hash", site_key, entries, self._written_seen.get(site_key, {}), lambda h: h)
+        self._written_fp[site_key] = self._write_rows(
+            "seen_fp", "fp", site_key, zip(*unpack_fingerprints(site_data.get("fingerprints"))),
+            self._written_fp.get(site_key, {}), _to_sql_int)
+
+    def _write_rows(self, table, key_col, site_key, entries, before, to_sql):
+        """entries와 마지막으로 쓴 값(before)을 비교해 바뀐 행만 upsert/삭제하고 새 기록을 반환"""
+        current, changed = {}, []
+        for pos, (key, first, last) in enumerate(entries):
+            current[key] = (first, last)
+            if before.get(key) != (first, last):
+                changed.append((site_key, to_sql(key), pos, first, last))
+        removed = [(site_key, to_sql(key)) for key in before if key not in current]
+        if removed:
+            self.conn.executemany(f"DELETE FROM {table} WHERE site_key = ? AND {key_col} = ?", removed)
+        if changed:
+            # 순서는 last_seen, pos로 복원하므로 값이 바뀐 행만 쓰면 된다
+            self.conn.executemany(
+                f"INSERT INTO {table}(site_key, {key_col}, pos, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                f"ON CONFLICT(site_key, {key_col}) DO UPDATE SET pos = excluded.pos, "
+                "first_seen = excluded.first_seen, last_seen = excluded.last_seen",
+                changed,
+            )
+        return current
+
+    def _migrate_hex_fingerprints(self):
+        """지문을 seen 테이블에 16자리 hex로 쓰던 버전의 행을 seen_fp로 옮긴다"""
+        rows = self.conn.execute(
+            "SELECT site_key, hash, pos, first_seen, last_seen FROM seen WHERE length(hash) = 16").fetchall()
+        if not rows:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO seen_fp(site_key, fp, pos, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                [(k, _to_sql_int(int(h, 16)), pos, int(first), int(last)) for k, h, pos, first, last in rows],
+            )
+            self.conn.execute("DELETE FROM seen WHERE length(hash) = 16")
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        logger.info(f"지문 {len(rows)}개를 seen_fp 테이블로 이전")
+
+    def _forget_written(self):
+        # 롤백된 내용은 다음 flush 때 다시 비교해서 쓰도록 기록을 지운다
+        for site_key in self._dirty:
+            self._written_meta.pop(site_key, None)
+            self._written_seen.pop(site_key, None)
+            self._written_fp.pop(site_key, None)
+
+    def _migrate_json(self, json_path: Path):
+        """DB가 비어 있고 previous_data.json이 있으면 한 번만 옮긴다"""
+        if not json_path.exists():
+            return
+        if self.conn.execute("SELECT 1 FROM sites LIMIT 1").fetchone():
+            return
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self._lock:
+            for site_key, site_data in data.items():
+                self.put_site(site_key, site_data)
+            self.flush()
+        json_path.rename(json_path.with_suffix(json_path.suffix + ".migrated"))
+        logger.info(f"상태 이전 완료: {json_path.name} → {self.path.name} ({len(data)}개 사이트)")
+
+
+def _to_sql_int(fp):
+    # SQLite INTEGER는 부호 있는 64비트
+    return fp - (1 << 64) if fp >= 1 << 63 else fp
+
+
+def _from_sql_int(v):
+    return v + (1 << 64) if v < 0 else v
+
+
+def open_state_store(config, data_dir: Path):
+    """config의 state_backend(json/sqlite)에 맞는 저장소를 연다"""
+    json_path = data_dir / 'previous_data.json'
+    backend = config.get("state_backend", "json")
+    if backend == "sqlite":
+        return SqliteStateStore(data_dir / config.get("state_db", "state.db"), migrate_from=json_path)
+    if backend != "json":
+        raise ValueError(f"알 수 없는 state_backend: {backend}")
+    return JsonStateStore(json_path)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+실행 중 프로파일링/트레이싱 (외부 의존성 없음).
+- Tracer: 단계별 타이밍 구간(span)을 모아 Chrome trace JSON으로 내보낸다 (chrome://tracing, Perfetto)
+- ProfileSwitch: cProfile(메인 스레드 + call()로 넘긴 체크 작업) 또는 샘플링(모든 스레드) 프로파일러를 켜고 끈다
+
+기본은 꺼져 있고, 꺼져 있을 때 span()은 미리 만들어 둔 빈 컨텍스트를 돌려주기만 한다.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+
+logger = logging.getLogger("website_monitor.tracing")
+
+_NULL_SPAN = nullcontext()
+
+
+def _stamp():
+    return datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "track", "args", "started")
+
+    def __init__(self, tracer, name, track, args):
+        self.tracer = tracer
+        self.name = name
+        self.track = track
+        self.args = args
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self.name, self.track, self.started, ended, self.args)
+        return False
+
+
+class Tracer:
+    """
+    arm()으로 예약하면 다음 begin_cycle()부터 end_cycle()까지의 구간을 기록한다.
+    기록 중인 사이클은 max_events개까지만 담는다 (사이트가 아주 많아도 메모리가 묶이지 않게).
+    """
+
+    def __init__(self, max_events=200000):
+        self.max_events = max_events
+        self._events = None         # None이면 기록하지 않음
+        self._threads = {}
+        self._dropped = 0
+        self._armed = False
+        self._origin = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self._events is not None
+
+    def arm(self):
+        """다음 사이클 하나를 기록하도록 예약 (시그널 핸들러에서 불러도 된다)"""
+        self._armed = True
+
+    def begin_cycle(self):
+        if not self._armed:
+            return False
+        self._armed = False
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._dropped = 0
+            self._origin = time.perf_counter_ns()
+        return True
+
+    def span(self, name, track=None, **args):
+        """
+        with tracer.span("fetch_page", site=name) as span: ... — 꺼져 있으면 아무것도 하지 않는다 (span은 None).
+        한 스레드에서 서로 겹치는 구간(asyncio 코루틴 등)은 track 이름을 주면 비동기 트랙에 따로 그린다.
+        """
+        if self._events is None:
+            return _NULL_SPAN
+        return _Span(self, name, track, args)
+
+    def _record(self, name, track, started, ended, args):
+        thread = threading.current_thread()
+        ts, dur = (started - self._origin) / 1000, (ended - started) / 1000
+        with self._lock:
+            if self._events is None:
+                return
+            if len(self._events) >= self.max_events:
+                self._dropped += 1
+                return
+            self._threads.setdefault(thread.ident, thread.name)
+            if track is None:
+                self._events.append({
+                    "name": name, "cat": "stage", "ph": "X", "ts": ts, "dur": dur,
+                    "pid": os.getpid(), "tid": thread.ident, "args": args,
+                })
+                return
+            span_id = len(self._events)
+            self._events.append({
+                "name": name, "cat": track, "ph": "b", "id": span_id, "ts": ts,
+                "pid": os.getpid(), "tid": thread.ident, "args": args,
+            })
+            self._events.append({
+                "name": name, "cat": track, "ph": "e", "id": span_id, "ts": ts + dur,
+                "pid": os.getpid(), "tid": thread.ident,
+            })
+
+    def end_cycle(self, directory):
+        """기록 중이던 사이클을 directory/trace-<시각>.json으로 쓰고 경로를 반환 (기록 중이 아니면 None)"""
+        with self._lock:
+            events, threads, dropped = self._events, self._threads, self._dropped
+            self._events = None
+        if events is None:
+            return None
+        pid = os.getpid()
+        meta = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "website_monitor"}}]
+        meta += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+            for tid, tname in threads.items()
+        ]
+        path = os.path.join(str(directory), f"trace-{_stamp()}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms",
+                       "otherData": {"dropped_events": dropped}}, f, ensure_ascii=False)
+        return path
+
+
+class _Sampler:
+    """모든 스레드의 스택을 interval초마다 찍어 collapsed stack("a;b;c 횟수")으로 센다"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(tid, str(tid)))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+class ProfileSwitch:
+    """
+    toggle()할 때마다 프로파일러를 켜고 끈다. 끌 때 directory에 결과를 쓰고 경로 목록을 반환한다.
+    - mode="cprofile": 메인 스레드와, call()로 다른 스레드에서 돌린 작업(비동기 엔진의 check 스레드: 파싱·비교·알림 적재)을
+      결정적으로 측정해 합친다 → profile-<시각>.pstats + .txt 요약
+      (cProfile은 켠 스레드만 재므로 작업마다 그 스레드에서 따로 켜고 끈 뒤 합친다)
+    - mode="sampling": 수집 스레드까지 모든 스레드를 interval초 간격으로 샘플링 → profile-<시각>.collapsed
+      (flamegraph.pl / speedscope에서 바로 열린다)
+    """
+
+    def __init__(self, directory, mode="cprofile", interval=0.005, top=40):
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"알 수 없는 프로파일러: {mode}")
+        self.directory = str(directory)
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+        self._profile = None
+        self._sampler = None
+        self._started = None
+        self._lock = threading.Lock()
+        self._thread_profiles = []      # call()로 잰 작업별 cProfile
+
+    @property
+    def running(self):
+        return self._started is not None
+
+    def toggle(self):
+        if self.running:
+            return self.stop()
+        self.start()
+        return []
+
+    def start(self):
+        if self.running:
+            return
+        if self.mode == "cprofile":
+            with self._lock:
+                self._thread_profiles = []
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _Sampler(self.interval)
+            self._sampler.start()
+        self._started = time.monotonic()
+
+    def call(self, fn, *args):
+        """다른 스레드에서 fn(*args)를 실행한다. cProfile이 켜져 있으면 이 호출도 그 스레드에서 재서 결과에 합친다."""
+        if self.mode != "cprofile" or not self.running:
+            return fn(*args)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                if self.running:
+                    self._thread_profiles.append(profile)
+
+    def stop(self):
+        if not self.running:
+            return []
+        elapsed = time.monotonic() - self._started
+        self._started = None
+        base = os.path.join(self.directory, f"profile-{_stamp()}")
+        if self.mode == "cprofile":
+            profile, self._profile = self._profile, None
+            profile.disable()
+            with self._lock:
+                extra, self._thread_profiles = self._thread_profiles, []
+            out = io.StringIO()
+            stats = pstats.Stats(profile, stream=out)
+            for p in extra:
+                stats.add(p)
+            stats.dump_stats(base + ".pstats")
+            out.write(f"# cProfile {elapsed:.1f}초 (메인 스레드 + 체크 작업 {len(extra)}건)\n")
+            stats.sort_stats("cumulative").print_stats(self.top)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(out.getvalue())
+            return [base + ".pstats", base + ".txt"]
+        sampler, self._sampler = self._sampler, None
+        sampler.stop()
+        sampler.dump(base + ".collapsed")
+        logger.info(f"샘플링 {elapsed:.1f}초, {sampler.samples}회")
+        return [base + ".collapsed"]
@@ -2,32 +2,51 @@
 # -*- coding: utf-8 -*-
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import json
 import time
 import hashlib
+import base64
 import os
 import re
 from datetime import datetime
 import logging
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
-from collections import defaultdict
+# Selenium / webdriver_manager / slack_sdk는 쓰는 곳에서 불러온다 (HTTP 사이트만 있는 once 실행의 시작 시간 단축)
+from collections import defaultdict, Counter
 from logging.handlers import TimedRotatingFileHandler
 import signal
+import socket
 import sys
 import fcntl
-from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
-from slack_sdk import WebClient
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from urllib.parse import urlsplit, urljoin
 from pathlib import Path
 
+from browser_pool import BrowserPool
+from chrome_watchdog import ChromeWatchdog
+from driver_cache import DriverCache
+from detail_pages import DetailCache, extract_detail
+from sharding import open_shard_manager
+import endpoint_discovery
+from state_store import open_state_store
+from seen_index import SeenIndex
+from near_dup import NearDupIndex, title_signature
+from notice import Notice, normalize_url
+from scheduler import SiteSchedule, SiteScheduler, parse_active_hours
+from slack_outbox import SlackOutbox
+from post_ledger import PostLedger, blocks_text
+from metrics import MonitorMetrics, start_server as start_metrics_server
+from tracing import Tracer, ProfileSwitch
+try:
+    import lxml_parser
+except ImportError:     # cssselect 미설치 → BeautifulSoup 파서만 사용
+    lxml_parser = None
+
 # ---------- 경로/환경: 루트 기준으로 통일 ----------
 ROOT_DIR   = Path(__file__).resolve().parents[1]   # <repo>/src → <repo>
 SRC_DIR    = ROOT_DIR / "src"
@@ -45,7 +64,49 @@ from dotenv import load_dotenv
 load_dotenv(ROOT_DIR / ".env")
 
 # ---------- 로깅 ----------
-logger = logging.getLogger(__name__)
+# 스크립트로 실행해도 이름을 고정해 하위 모듈 로거(website_monitor.*)가 같은 핸들러를 쓰게 한다
+logger = logging.getLogger("website_monitor")
+
+# ---------- Selenium 리소스 차단 ----------
+# block_resources 항목 → CDP Network.setBlockedURLs 패턴
+BLOCK_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "stylesheet": ["*.css"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.avi"],
+    "tracker": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*connect.facebook.com*", "*wcs.naver.net*", "*hotjar.com*",
+        "*clarity.ms*", "*kakao.com/sdk*",
+    ],
+}
+DEFAULT_BLOCK_RESOURCES = ["image", "font", "media", "tracker"]
+
+# ---------- Slack Block Kit 한도 ----------
+SLACK_MAX_BLOCKS = 50
+SLACK_SECTION_CHARS = 3000
+
+# ---------- 파싱 워커 프로세스 ----------
+_parse_monitor = None
+
+def _init_parse_worker(config):
+    """파싱 워커 초기화: 파싱에 필요한 부분만 가진 WebsiteMonitor (락/드라이버/상태 없음)"""
+    global _parse_monitor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # 종료는 메인 프로세스가 풀을 닫아서 처리
+    # 프로세스 그룹 전체에 보낸 프로파일 신호로 워커가 죽지 않게 (기본 동작이 종료)
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    signal.signal(signal.SIGUSR2, signal.SIG_IGN)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [parse-%(process)d] %(levelname)s %(message)s")
+    monitor = WebsiteMonitor.__new__(WebsiteMonitor)
+    monitor.config = config
+    monitor._compiled_sites = monitor._compile_site_parsers()
+    _parse_monitor = monitor
+
+def _parse_in_worker(html, website_config):
+    """(공지 목록, 파싱 시간) 반환 — 시간은 큐 대기 없이 워커 안에서 잰다"""
+    started = time.perf_counter()
+    notices = _parse_monitor.parse_notices(html, website_config)
+    return notices, time.perf_counter() - started
 
 class WebsiteMonitor:
     def __init__(self, config_file='config.json'):
@@ -70,25 +131,111 @@ class WebsiteMonitor:
         signal.signal(signal.SIGTERM, self._graceful_exit)
         signal.signal(signal.SIGINT, self._graceful_exit)
 
-        # 상태/드라이버
-        self.data_file = DATA_DIR / 'previous_data.json'
-        self.previous_data = self.load_previous_data()
-        self.driver = None
+        # 실행 중 진단: SIGUSR1 = 프로파일러 켜기/끄기, SIGUSR2 = 다음 사이클 트레이스 (결과는 logs/)
+        self.tracer = Tracer()
+        self.profiler = ProfileSwitch(
+            LOG_DIR,
+            mode=self.config.get("profiler", "cprofile"),
+            interval=float(self.config.get("profiler_sample_interval", 0.005)),
+        )
+        signal.signal(signal.SIGUSR1, self._toggle_profiler)
+        signal.signal(signal.SIGUSR2, self._arm_trace)
+
+        # 상태/드라이버 (data_dir: 상태·대기열 위치 오버라이드, 벤치마크 등에서 사용)
+        self.data_dir = Path(self.config.get("data_dir") or DATA_DIR)
+        if not self.data_dir.is_absolute():
+            self.data_dir = ROOT_DIR / self.data_dir
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        # 샤드 모드: 워커마다 락/Slack 대기열을 따로 두고, 상태는 공유 SQLite로 주고받는다
+        self.shards = None
+        self.worker_id = None
+        worker_suffix = ""
+        if self.config.get("shard_mode", False):
+            if self.config.get("state_backend", "json") != "sqlite":
+                logger.error('shard_mode에는 state_backend: "sqlite"가 필요합니다. 종료합니다.')
+                sys.exit(1)
+            self.worker_id = os.getenv("MONITOR_WORKER_ID") or self.config.get("shard_worker_id") or socket.gethostname()
+            worker_suffix = f"-{self.worker_id}"
+
+        self.metrics = MonitorMetrics()
+        self.state = open_state_store(self.config, self.data_dir)
+        self._seen_indexes = {}
+        self._near_dup_indexes = {}
+        self._exit_pending = None
         self._cd_log_file = None
+        self.driver_cache = DriverCache(
+            self.data_dir / "chromedriver.json",
+            offline=self.config.get("chromedriver_offline", False),
+            driver_path=self.config.get("chromedriver_path"),
+        )
+        self.browser_pool = BrowserPool(
+            self.setup_selenium_driver,
+            size=int(self.config.get("selenium_pool_size", 2)),
+            max_pages=int(self.config.get("selenium_recycle_pages", 100)),
+            max_age=float(self.config.get("selenium_max_age", 3600)),
+            watchdog=ChromeWatchdog(
+                max_rss_mb=float(self.config.get("selenium_max_rss_mb", 1024)),
+                kill_grace=float(self.config.get("selenium_kill_grace", 3)),
+                metrics=self.metrics,
+            ),
+            metrics=self.metrics,
+        )
+        self._cycle_stats = Counter()
+        self._page_load_strategy = self.config.get("selenium_page_load_strategy", "normal")
+        self._performance_log = self.config.get("selenium_network_stats", False) or any(
+            w.get('use_selenium', False) and w.get('discover_endpoint', False) for w in self.config.get('websites', [])
+        )
+        self.http = self._build_http_session()
+        self._compiled_sites = self._compile_site_parsers()
+        self._parse_pool = None
 
-        # 단일 인스턴스 락
-        self._instance_lock_fp = open(RUN_DIR / "instance.lock", "w")
+        # 단일 인스턴스 락 (data_dir을 바꾸면 그 디렉터리 단위로 잡는다)
+        lock_dir = RUN_DIR if self.data_dir == DATA_DIR else self.data_dir
+        self._instance_lock_fp = open(lock_dir / f"instance{worker_suffix}.lock", "w")
         try:
             fcntl.lockf(self._instance_lock_fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
         except OSError:
             logger.error("이미 실행 중입니다(파일락 획득 실패). 종료합니다.")
             sys.exit(1)
 
+        if self.worker_id is not None:
+            try:
+                self.shards = open_shard_manager(self.config, self.data_dir, self.worker_id)
+                self.shards.start()
+            except Exception as e:
+                logger.error(f"샤드 코디네이터 연결 실패: {e}. 종료합니다.")
+                sys.exit(1)
+
+        # 보낸 메시지 장부 (삭제 도구가 history를 넘기지 않고 고를 수 있게)
+        self.post_ledger = None
+        if self.config.get("post_ledger", True):
+            self.post_ledger = PostLedger(self.data_dir / self.config.get("post_ledger_db", "posts.db"))
+
+        # Slack 전송 대기열 (락을 잡은 인스턴스만 처리)
+        self.outbox = self._build_outbox(self.data_dir / f"outbox{worker_suffix}")
+        self.outbox.start()
+        self._digest_path = self.data_dir / f"digest_pending{worker_suffix}.json"
+        self.detail_cache = DetailCache(
+            self.data_dir / f"detail_cache{worker_suffix}.json",
+            max_bytes=float(self.config.get("detail_cache_max_mb", 4)) * 1024 * 1024,
+        )
+        self._digest, self._digest_started = self._load_digest()
+
+        # 메트릭 (metrics_port가 있을 때만 노출)
+        self.metrics.add_collector(self._collect_metrics)
+        self.metrics_server = None
+        if self.config.get("metrics_port"):
+            self.metrics_server = start_metrics_server(
+                self.metrics, self.config["metrics_port"], self.config.get("metrics_host", "127.0.0.1")
+            )
+
     # ---------- Selenium ----------
     def setup_selenium_driver(self):
-        """Selenium 드라이버 설정 (자동 설치)"""
-        if self.driver:
-            return self.driver
+        """Selenium 드라이버 생성 (자동 설치). 드라이버 풀이 워커를 띄울 때 호출한다."""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
 
         options = Options()
         options.add_argument('--headless')
@@ -100,32 +247,36 @@ class WebsiteMonitor:
         options.add_argument('--ignore-certificate-errors')
         options.add_argument('--ignore-ssl-errors')
 
+        # normal: load까지 기다림. eager/none은 wait_selector가 있는 사이트만 일찍 끝내고, 없는 사이트는 load(complete)까지 기다린다
+        options.page_load_strategy = self._page_load_strategy
+        # 전역 정책에 image가 있으면 확장자와 무관하게 이미지 자체를 끈다 (사이트별 정책은 CDP로)
+        if "image" in self._block_kinds(self.config.get("selenium_block_resources", DEFAULT_BLOCK_RESOURCES)):
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        # 렌더링별 전송량 집계나 엔드포인트 탐지가 필요할 때만 (로그 수집 자체가 CDP 이벤트를 전부 쌓는다)
+        if self._performance_log:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
         try:
-            logger.info("ChromeDriver 자동 설치 중...")
             cd_log_path = LOG_DIR / "chromedriver.log"
             if self._cd_log_file is None or self._cd_log_file.closed:
                 self._cd_log_file = open(cd_log_path, "a", encoding="utf-8")
 
-            # Chromium 감지 시 ChromeType.CHROMIUM 사용
-            import shutil
-            if shutil.which("chromium") and not shutil.which("google-chrome-stable"):
-                options.binary_location = shutil.which("chromium")
-                driver_path = ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
-            else:
-                driver_path = ChromeDriverManager().install()
+            # 브라우저 버전별로 캐시된 경로 사용 (처음 한 번만 webdriver_manager로 설치)
+            driver_path = self.driver_cache.resolve()
+            if self.driver_cache.chrome_type == "chromium":
+                options.binary_location = self.driver_cache.browser
             service = Service(driver_path, log_output=self._cd_log_file)
-            self.driver = webdriver.Chrome(service=service, options=options)
+            driver = webdriver.Chrome(service=service, options=options)
             logger.info("ChromeDriver 설정 완료!")
-            return self.driver
+            return driver
         except Exception as e:
             logger.error(f"Chrome 드라이버 초기화 실패: {e}")
             logger.info("Chrome 브라우저가 설치되어 있는지 확인해주세요.")
             return None
 
     def close_selenium_driver(self):
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        """풀의 드라이버를 모두 종료 (종료 시/재생성 주기)"""
+        self.browser_pool.close()
         if getattr(self, "_cd_log_file", None):
             try:
                 self._cd_log_file.close()
@@ -163,45 +314,314 @@ class WebsiteMonitor:
             print(f"설정 파일이 생성되었습니다 → {config_path}")
             return default_config
 
-    def load_previous_data(self):
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-
     def save_previous_data(self):
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.previous_data, f, ensure_ascii=False, indent=2)
+        """변경된 사이트 상태를 저장소에 반영 (json: 파일 교체, sqlite: 한 트랜잭션)"""
+        self.state.flush()
+        if self._exit_pending is not None:
+            # 저장 도중 받은 종료 신호는 저장이 끝난 뒤 처리
+            self._graceful_exit(self._exit_pending, None)
+
+    # ---------- HTTP 세션 ----------
+    def _build_http_session(self):
+        """
+        페이지 요청/웹훅 전송이 함께 쓰는 keep-alive 세션.
+        - http_pool_maxsize: 호스트당 커넥션 수 (기본: per_host_concurrency 이상, 최소 4)
+        - http_pool_per_host: {"host": 크기} 호스트별 풀 크기 오버라이드
+        - http_retries / http_backoff: 연결 오류·429·5xx 재시도 횟수와 백오프(초)
+        - http_connect_timeout / http_read_timeout: 연결/읽기 타임아웃(초)
+        """
+        cfg = self.config
+        self._http_timeout = (
+            float(cfg.get("http_connect_timeout", 5)),
+            float(cfg.get("http_read_timeout", 20)),
+        )
+        retries = int(cfg.get("http_retries", 2))
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=float(cfg.get("http_backoff", 0.5)),
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        pool_connections = int(cfg.get("http_pool_connections", 20))
+        default_maxsize = int(cfg.get("http_pool_maxsize", max(4, int(cfg.get("per_host_concurrency", 2)))))
+
+        session = requests.Session()
+        session.headers['User-Agent'] = cfg.get('user_agent', session.headers['User-Agent'])
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=default_maxsize, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        for host, size in (cfg.get("http_pool_per_host") or {}).items():
+            host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=int(size), max_retries=retry)
+            session.mount(f"https://{host}/", host_adapter)
+            session.mount(f"http://{host}/", host_adapter)
+        return session
 
     # ---------- 페이지 로딩 ----------
     def get_page_content(self, url, website_config, headers=None):
+        with self.tracer.span("get_page_content", site=website_config.get('name')):
+            if website_config.get('use_selenium', False):
+                return self.get_page_content_selenium(url, website_config)
+            else:
+                return self.get_page_content_requests(url, headers)
+
+    def fetch_page(self, website_config, site_data=None, use_endpoint=True):
+        """
+        check_website용 수집. {'status', 'html', 'etag', 'last_modified'} dict 반환, 실패 시 None.
+        정적 사이트는 저장된 검증자(ETag/Last-Modified)로 조건부 GET을 보낸다.
+        discover_endpoint 사이트는 탐지된 JSON 엔드포인트가 있으면 브라우저 없이 'notices'를 채워 반환한다.
+        """
+        name = website_config['name']
+        started = time.perf_counter()
+        with self.tracer.span("fetch_page", site=name) as span:
+            page = self._fetch_page(website_config, site_data, use_endpoint)
+            if span is not None and page:
+                span.args.update(status=page['status'], bytes=page.get('bytes', 0))
+        self.metrics.fetch_seconds.observe(time.perf_counter() - started, site=name)
+        if page is None:
+            self.metrics.fetch_errors.inc(site=name)
+        elif page.get('bytes'):
+            self.metrics.bytes_downloaded.inc(page['bytes'], site=name)
+        return page
+
+    def _fetch_page(self, website_config, site_data, use_endpoint):
+        url = website_config['url']
         if website_config.get('use_selenium', False):
-            return self.get_page_content_selenium(url, website_config)
+            capture = None
+            if website_config.get('discover_endpoint', False):
+                if use_endpoint and site_data and site_data.get('endpoint'):
+                    page = self._fetch_endpoint(website_config, site_data)
+                    if page:
+                        return page
+                capture = []
+            html = self.get_page_content_selenium(url, website_config, capture=capture)
+            return {'status': 200, 'html': html, 'captured': capture} if html else None
+        return self.fetch_page_requests(url, site_data)
+
+    def _fetch_endpoint(self, website_config, site_data):
+        """탐지된 엔드포인트를 일반 HTTP로 호출. 실패가 endpoint_max_failures회 쌓이면 엔드포인트를 버린다."""
+        spec = site_data['endpoint']
+        name = website_config['name']
+        try:
+            r = self.http.request(
+                spec['method'], spec['url'],
+                data=spec.get('post_data'),
+                headers={'X-Requested-With': 'XMLHttpRequest', 'Referer': website_config['url'],
+                         **({'Content-Type': spec['content_type']} if spec.get('content_type') else {})},
+                timeout=self._http_timeout,
+            )
+            r.raise_for_status()
+            records = endpoint_discovery.extract_records(r.json(), spec)
+            if not records:
+                raise ValueError("항목 없음")
+        except (requests.RequestException, ValueError, KeyError, TypeError, IndexError) as e:
+            spec['failures'] = spec.get('failures', 0) + 1
+            logger.warning(f"{name}: 엔드포인트 실패({spec['failures']}회) → 브라우저로 대체: {e}")
+            if spec['failures'] >= int(self.config.get("endpoint_max_failures", 3)):
+                site_data.pop('endpoint', None)
+                logger.info(f"{name}: 엔드포인트 폐기, 다음 렌더링 때 다시 탐지")
+            return None
+
+        spec['failures'] = 0
+        notices = [
+            self._make_notice(rec['title'], rec['link'], rec['date'] or datetime.now().strftime('%Y-%m-%d'),
+                              self.normalize_views(rec['views']), rec['category'], rec['is_pinned'])
+            for rec in records[:website_config.get('max_items', 20)]
+        ]
+        logger.info(f"{name}: 엔드포인트에서 {len(notices)}개 수신 (브라우저 생략)")
+        return {'status': 200, 'html': None, 'body': r.text, 'bytes': len(r.content),
+                'notices': self._dedupe_notices(notices)}
+
+    def _discover_endpoint(self, website_config, site_data, captured, notices):
+        """렌더링 중 잡힌 JSON 응답에서 공지 목록 엔드포인트를 찾아 site_data['endpoint']에 저장"""
+        best = None
+        for req, body in captured:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                continue
+            spec = endpoint_discovery.build_spec(data, notices, normalize_views=self.normalize_views)
+            if spec and (best is None or spec['matched'] > best['matched']):
+                spec.update(url=req['url'], method=req['method'], post_data=req.get('post_data'),
+                            content_type=req.get('content_type'))
+                best = spec
+        if best:
+            site_data['endpoint'] = best
+            logger.info(f"{website_config['name']}: 엔드포인트 탐지 {best['method']} {best['url']} (일치 {best['matched']}개)")
+
+    def _paginate(self, website_config, html, notices, seen):
+        """
+        첫 페이지에 이미 본 공지가 하나도 없으면(그 사이 새 글이 max_items개 넘게 올라옴) 다음 페이지를 차례로 받는다.
+        - page_url_template: "{page}" 자리에 page_start+1, page_start+2, ... 를 넣은 URL
+        - next_page_selector: 현재 페이지의 "다음" 링크 (href)
+        새 공지 뒤에 이미 본 공지가 나온 페이지에서 멈추고, 최대 max_pages페이지(첫 페이지 포함)까지만 본다.
+        이때는 첫 페이지를 포함해 모든 페이지를 max_items로 자르지 않고 끝까지 읽는다.
+        """
+        template = website_config.get('page_url_template')
+        selector = website_config.get('next_page_selector')
+        if not (template or selector):
+            return notices
+        name = website_config['name']
+        max_pages = int(website_config.get('max_pages', 5))
+        page_start = int(website_config.get('page_start', 1))
+
+        def overlaps(items):
+            # 고정 공지 표시가 없는 사이트도 있어, 맨 위에 몰린 이미 본 글은 새 글 뒤에 본 글이 나올 때만 겹침으로 친다
+            flags = [n.fp in seen for n in items if not n.is_pinned]
+            if False not in flags:
+                return bool(flags)
+            return True in flags[flags.index(False):]
+
+        if overlaps(notices):
+            return notices
+        if html:
+            # 첫 페이지도 max_items 뒤쪽 공지까지 다시 읽는다 (고정 공지 표시를 못 알아보는 사이트는 그만큼 잘려 있다)
+            with self.metrics.parse_seconds.time(site=name):
+                notices = self.parse_notices(html, website_config, take_all=True) or notices
+            seen.adopt(notices)
+            if overlaps(notices):
+                return notices
+        collected = list(notices)
+        fps = {n.fp for n in collected}
+        visited = {website_config['url']}
+        pages = 1
+        while pages < max_pages:
+            if template:
+                next_url = template.format(page=page_start + pages)
+            else:
+                link = BeautifulSoup(html, 'lxml').select_one(selector) if html else None
+                href = link.get('href') if link is not None else None
+                if not href or href.startswith(('#', 'javascript:')):
+                    break
+                next_url = self._resolve_link(href, website_config)
+            if next_url in visited:
+                break
+            visited.add(next_url)
+
+            with self.tracer.span("fetch_next_page", site=name, page=pages + 1):
+                html = self.get_page_content(next_url, website_config)
+            if not html:
+                logger.warning(f"{name}: {pages + 1}페이지 수집 실패 → 여기까지만 비교")
+                break
+            with self.metrics.parse_seconds.time(site=name):
+                extra = self.parse_notices(html, website_config, take_all=True)
+            pages += 1
+            self._cycle_stats['extra_pages'] += 1
+            self.metrics.extra_pages.inc(site=name)
+            if not extra:
+                break
+            seen.adopt(extra)
+            fresh = [n for n in extra if n.fp not in fps]
+            fps.update(n.fp for n in fresh)
+            collected.extend(fresh)
+            if overlaps(extra):
+                logger.info(f"{name}: {pages}페이지에서 이미 본 공지 확인 → 추가 페이지 {pages - 1}개, 공지 {len(collected)}개")
+                return collected
         else:
-            return self.get_page_content_requests(url, headers)
+            logger.warning(f"{name}: max_pages({max_pages})까지 이미 본 공지가 없음 → 그 뒤의 새 공지는 놓쳤을 수 있습니다")
+        return collected
+
+    def _fetch_details(self, website_config, notices):
+        """
+        새 공지의 상세 페이지를 받아 n.detail에 요약을 넣는다 (fetch_details를 켠 사이트만).
+        - detail_concurrency: 동시에 받을 상세 페이지 수 (정적 사이트는 per_host_concurrency, Selenium은 드라이버 풀 크기 이하)
+        - detail_max_per_check: 한 번에 요약할 최대 공지 수 (나머지는 제목·링크만)
+        이미 요약한 링크는 DetailCache에서 꺼내 쓰고, 받지 못한 공지는 요약 없이 보낸다.
+        """
+        name = website_config['name']
+        pending, cached = [], 0
+        for n in [n for n in notices if n.link][:int(website_config.get('detail_max_per_check', 10))]:
+            key = normalize_url(n.link)
+            detail = self.detail_cache.get(key)
+            if detail is not None:
+                n.detail = detail
+                cached += 1
+                self.metrics.detail_pages.inc(site=name, source="cache")
+            else:
+                pending.append((n, key))
+        if not pending:
+            return
+
+        # 목록용 wait_selector는 상세 페이지에 없으니 detail_wait_selector로 바꿔 쓴다
+        page_config = {**website_config, 'wait_selector': website_config.get('detail_wait_selector')}
+        limit = int(self.config.get("detail_concurrency", 4))
+        if website_config.get('use_selenium', False):
+            limit = min(limit, self.browser_pool.size)
+        else:
+            limit = min(limit, int(self.config.get("per_host_concurrency", 2)))
+
+        def fetch(item):
+            n, _ = item
+            with self.tracer.span("fetch_detail", site=name):
+                return self.get_page_content(n.link, page_config)
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(limit, len(pending))), thread_name_prefix="detail") as pool:
+            for (n, key), html in zip(pending, pool.map(fetch, pending)):
+                if not html:
+                    self.metrics.detail_pages.inc(site=name, source="error")
+                    continue
+                digest = self.detail_cache.digest(html)
+                detail = self.detail_cache.get_by_digest(digest)
+                n.detail = detail if detail is not None else extract_detail(html, website_config)
+                self.detail_cache.put(key, digest, n.detail)
+                self.metrics.detail_pages.inc(site=name, source="fetch")
+                fetched += 1
+        logger.info(f"{name}: 상세 페이지 {fetched}/{len(pending)}개 수집 (캐시 {cached}개)")
 
     def get_page_content_requests(self, url, headers=None):
-        if not headers:
-            headers = {'User-Agent': self.config['user_agent']}
-        for attempt in (1, 2):
-            try:
-                r = requests.get(url, headers=headers, timeout=20)
-                r.raise_for_status()
-                return r.text
-            except requests.RequestException as e:
-                logger.warning(f"페이지 요청 실패 {url} (시도 {attempt}): {e}")
-                time.sleep(1)
-        logger.error(f"페이지 요청 최종 실패: {url}")
-        return None
+        page = self.fetch_page_requests(url, headers=headers)
+        return page['html'] if page else None
+
+    def fetch_page_requests(self, url, site_data=None, headers=None):
+        headers = dict(headers) if headers else {'User-Agent': self.config['user_agent']}
+        # 비교할 해시가 있을 때만 조건부 요청 (304면 파싱 자체를 건너뛰므로)
+        if site_data and self._has_history(site_data):
+            if site_data.get('etag'):
+                headers['If-None-Match'] = site_data['etag']
+            if site_data.get('last_modified'):
+                headers['If-Modified-Since'] = site_data['last_modified']
+        # 재시도/백오프는 세션 어댑터(Retry)가 담당
+        try:
+            r = self.http.get(url, headers=headers, timeout=self._http_timeout)
+            if r.status_code == 304:
+                return {
+                    'status': 304, 'html': None,
+                    'etag': r.headers.get('ETag') or headers.get('If-None-Match'),
+                    'last_modified': r.headers.get('Last-Modified') or headers.get('If-Modified-Since'),
+                }
+            r.raise_for_status()
+            return {
+                'status': r.status_code, 'html': r.text, 'bytes': len(r.content),
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+            }
+        except requests.RequestException as e:
+            logger.error(f"페이지 요청 최종 실패: {url} ({e})")
+            return None
+
+    def get_page_content_selenium(self, url, website_config, capture=None):
+        """
+        풀에서 드라이버를 빌려 렌더링. 여러 스레드에서 동시에 호출해도 된다.
+        capture(list)를 넘기면 렌더링 중 받은 JSON/XHR 응답을 (요청, 본문)으로 담는다.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import WebDriverException
 
-    def get_page_content_selenium(self, url, website_config):
         for attempt in (1, 2):
-            driver = self.setup_selenium_driver()
-            if not driver:
+            worker = self.browser_pool.acquire()
+            if not worker:
                 return None
+            broken = False
             try:
-                logger.info(f"Selenium으로 페이지 로딩: {url} (attempt {attempt})")
+                driver = worker.driver
+                logger.info(f"Selenium으로 페이지 로딩: {url} (attempt {attempt}, 브라우저 #{worker.id})")
+                patterns = self._resource_block_patterns(website_config)
+                self._apply_resource_policy(driver, patterns)
+                started = time.monotonic()
                 driver.get(url)
                 wait_selector = website_config.get('wait_selector')
                 wait_timeout = website_config.get('wait_timeout', 10)
@@ -209,83 +629,154 @@ class WebsiteMonitor:
                     WebDriverWait(driver, wait_timeout).until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
                     )
-                return driver.page_source
+                elif self._page_load_strategy != "normal":
+                    WebDriverWait(driver, wait_timeout).until(
+                        lambda d: d.execute_script("return document.readyState") == "complete"
+                    )
+                html = driver.page_source
+                events = self._drain_performance_log(driver) if self._performance_log else []
+                self._log_render_stats(events, website_config, time.monotonic() - started, len(patterns))
+                if capture is not None:
+                    capture.extend(self._capture_json_bodies(driver, events))
+                return html
             except WebDriverException as e:
                 logger.warning(f"Selenium 로딩 실패(시도 {attempt}): {e}")
-                self.close_selenium_driver()
+                broken = True
                 time.sleep(1)
+            finally:
+                self.browser_pool.release(worker, broken=broken)
         logger.error("Selenium 재시도 실패")
         return None
 
+    def _block_kinds(self, kinds):
+        if kinds is True:
+            return list(DEFAULT_BLOCK_RESOURCES)
+        return list(kinds or [])
+
+    def _resource_block_patterns(self, website_config):
+        """사이트별 block_resources(없으면 selenium_block_resources) + block_urls → 차단 URL 패턴"""
+        kinds = website_config.get(
+            'block_resources', self.config.get("selenium_block_resources", DEFAULT_BLOCK_RESOURCES)
+        )
+        patterns = []
+        for kind in self._block_kinds(kinds):
+            patterns.extend(BLOCK_PATTERNS.get(kind, []))
+        patterns.extend(website_config.get('block_urls', []))
+        return patterns
+
+    def _apply_resource_policy(self, driver, patterns):
+        # 드라이버를 사이트끼리 돌려 쓰므로 매번 덮어쓴다 (빈 목록이면 차단 해제)
+        from selenium.common.exceptions import WebDriverException
+        try:
+            if self._performance_log:
+                self._drain_performance_log(driver)
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except WebDriverException as e:
+            logger.warning(f"리소스 차단 설정 실패: {e}")
+
+    def _drain_performance_log(self, driver):
+        """쌓인 Chrome performance 로그를 비우고 CDP 이벤트(dict) 목록으로 반환"""
+        events = []
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return events
+        for entry in entries:
+            try:
+                events.append(json.loads(entry["message"])["message"])
+            except (KeyError, ValueError):
+                continue
+        return events
+
+    def _capture_json_bodies(self, driver, events):
+        from selenium.common.exceptions import WebDriverException
+        out = []
+        for request_id, req in endpoint_discovery.collect_json_requests(events):
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except WebDriverException:
+                continue
+            text = body.get("body", "")
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8", "replace")
+            out.append((req, text))
+        return out
+
+    def _log_render_stats(self, events, website_config, elapsed, n_patterns):
+        received, loaded, blocked = 0, 0, 0
+        for ev in events:
+            method = ev.get("method")
+            params = ev.get("params", {})
+            if method == "Network.loadingFinished":
+                received += params.get("encodedDataLength", 0)
+                loaded += 1
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                blocked += 1
+        self.metrics.render_seconds.observe(elapsed, site=website_config['name'])
+        if not self._performance_log:
+            logger.info(f"[{website_config['name']}] 렌더링 {elapsed * 1000:.0f}ms (차단 패턴 {n_patterns}개)")
+            return
+        self.metrics.bytes_downloaded.inc(received, site=website_config['name'])
+        logger.info(
+            f"[{website_config['name']}] 렌더링 {elapsed * 1000:.0f}ms, "
+            f"수신 {received / 1024:.1f}KB ({loaded}건), 차단 {blocked}건 (패턴 {n_patterns}개)"
+        )
+
     # ---------- 파싱 ----------
-    def parse_notices(self, html, website_config):
-        soup = BeautifulSoup(html, 'lxml')
+    def _compile_site_parsers(self):
+        """parser가 lxml인 사이트의 선택자를 XPath로 미리 컴파일 (url → CompiledSite)"""
+        compiled = {}
+        default_parser = self.config.get("default_parser", "bs4")
+        for website in self.config.get('websites', []):
+            if website.get('parser', default_parser) != 'lxml':
+                continue
+            if lxml_parser is None:
+                logger.warning(f"[{website['name']}] cssselect가 없어 BeautifulSoup 파서를 사용합니다.")
+                continue
+            try:
+                compiled[website['url']] = lxml_parser.CompiledSite(website)
+            except lxml_parser.SelectorError as e:
+                logger.warning(f"[{website['name']}] 선택자 컴파일 실패 → BeautifulSoup 파서 사용: {e}")
+        return compiled
+
+    def _get_parse_pool(self):
+        """
+        parse_workers > 0이면 파싱 전용 프로세스 풀 (사이클 사이에도 유지).
+        Selenium 스레드와 섞여도 안전하도록 spawn으로 띄운다.
+        """
+        workers = int(self.config.get("parse_workers", 0))
+        if workers <= 0:
+            return None
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_parse_worker,
+                initargs=(self.config,),
+            )
+            logger.info(f"파싱 프로세스 풀 시작 (워커 {workers}개)")
+        return self._parse_pool
+
+    def close_parse_pool(self):
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+            self._parse_pool = None
+
+    def parse_notices(self, html, website_config, take_all=False):
+        """
+        목록 HTML → 공지 목록. max_items는 일반 공지만 세고(고정 공지는 페이지마다 반복되므로 따로),
+        take_all이면 자르지 않는다 (추가 페이지: 페이지 끝쪽 공지를 버리면 그대로 놓친다).
+        """
+        compiled = self._compiled_sites.get(website_config['url'])
+        take_n = None if take_all else website_config.get('max_items', 20)
         notices = []
         try:
-            elems = soup.select(website_config['selector'])
-            take_n = website_config.get('max_items', 20)
-            logger.info(f"[{website_config['name']}] matched={len(elems)} take={take_n} selector='{website_config['selector']}'")
-
-            for el in elems[:take_n]:
-                pinned_by_td = el.select_one('td.top-notice') is not None
-                has_cate00  = any('cate00' in (sp.get('class') or []) for sp in el.select('span.cate'))
-                is_pinned   = pinned_by_td or has_cate00
-
-                category = ""
-                cate_sel = website_config.get('category_selector')
-                if cate_sel:
-                    ce = el.select_one(cate_sel)
-                    if ce:
-                        category = ce.get_text(strip=True)
-
-                title_elem = el.select_one(website_config.get('title_selector', 'a'))
-                title = title_elem.get_text(strip=True) if title_elem else "제목 없음"
-
-                link = ""
-                link_elem = el.select_one(website_config.get('link_selector', 'a'))
-                if link_elem and link_elem.has_attr('href'):
-                    href = link_elem['href']
-                    if href.startswith('/'):
-                        from urllib.parse import urljoin, urlparse
-                        base = f"{urlparse(website_config['url']).scheme}://{urlparse(website_config['url']).netloc}"
-                        link = urljoin(base, href)
-                    elif href.startswith('?') or not href.startswith('http'):
-                        from urllib.parse import urljoin
-                        link = urljoin(website_config['url'], href)
-                    else:
-                        link = href
-
-                date, views = "", ""
-                try:
-                    tds = el.select('td')
-                    if len(tds) >= 5:
-                        date  = tds[4].get_text(strip=True)
-                        views = tds[3].get_text(strip=True)
-                except Exception:
-                    pass
-
-                if not date:
-                    date = self.extract_date(el)
-                if not views:
-                    for sel in ['.views', '.hit', '.count', '[data-views]']:
-                        ve = el.select_one(sel)
-                        if ve:
-                            views = ve.get_text(strip=True) if ve.text else ve.get('data-views', '')
-                            break
-                views = self.normalize_views(views)
-
-                title_norm = self._normalize_title(title)
-                link_norm  = self._normalize_url(link)
-
-                notices.append({
-                    'title': title,
-                    'link': link,
-                    'date': date,
-                    'views': views,
-                    'category': category,
-                    'hash': hashlib.md5(f"{title_norm}{link_norm}".encode()).hexdigest(),
-                    'is_pinned': is_pinned
-                })
+            # 중간에 실패해도 그때까지 모은 공지는 살린다
+            if compiled is not None:
+                self._parse_rows_lxml(html, website_config, compiled, notices, take_n)
+            else:
+                self._parse_rows_bs4(html, website_config, notices, take_n)
         except Exception as e:
             logger.error(f"HTML 파싱 실패: {e}")
 
@@ -296,11 +787,83 @@ class WebsiteMonitor:
             logger.info(f"중복 제거: {before} → {after} (−{before - after})")
         return notices
 
+    def _parse_rows_lxml(self, html, website_config, compiled, notices, take_n):
+        matched, rows = lxml_parser.extract_rows(html, compiled, take_n)
+        logger.info(f"[{website_config['name']}] matched={matched} take={take_n} selector='{website_config['selector']}'")
+        for row in rows:
+            link = self._resolve_link(row['href'], website_config) if row['href'] is not None else ""
+            date = row['date'] if row['date'] is not None else datetime.now().strftime('%Y-%m-%d')
+            notices.append(self._make_notice(
+                row['title'], link, date, self.normalize_views(row['views']), row['category'], row['is_pinned']
+            ))
+
+    def _parse_rows_bs4(self, html, website_config, notices, take_n):
+        soup = BeautifulSoup(html, 'lxml')
+        elems = soup.select(website_config['selector'])
+        logger.info(f"[{website_config['name']}] matched={len(elems)} take={take_n} selector='{website_config['selector']}'")
+
+        regular = 0
+        for el in elems:
+            pinned_by_td = el.select_one('td.top-notice') is not None
+            has_cate00  = any('cate00' in (sp.get('class') or []) for sp in el.select('span.cate'))
+            is_pinned   = pinned_by_td or has_cate00
+            if not is_pinned:
+                if take_n is not None and regular >= take_n:
+                    break
+                regular += 1
+
+            category = ""
+            cate_sel = website_config.get('category_selector')
+            if cate_sel:
+                ce = el.select_one(cate_sel)
+                if ce:
+                    category = ce.get_text(strip=True)
+
+            title_elem = el.select_one(website_config.get('title_selector', 'a'))
+            title = title_elem.get_text(strip=True) if title_elem else "제목 없음"
+
+            link = ""
+            link_elem = el.select_one(website_config.get('link_selector', 'a'))
+            if link_elem and link_elem.has_attr('href'):
+                link = self._resolve_link(link_elem['href'], website_config)
+
+            date, views = "", ""
+            try:
+                tds = el.select('td')
+                if len(tds) >= 5:
+                    date  = tds[4].get_text(strip=True)
+                    views = tds[3].get_text(strip=True)
+            except Exception:
+                pass
+
+            if not date:
+                date = self.extract_date(el)
+            if not views:
+                for sel in ['.views', '.hit', '.count', '[data-views]']:
+                    ve = el.select_one(sel)
+                    if ve:
+                        views = ve.get_text(strip=True) if ve.text else ve.get('data-views', '')
+                        break
+            views = self.normalize_views(views)
+
+            notices.append(self._make_notice(title, link, date, views, category, is_pinned))
+
     # ---------- 유틸 ----------
+    def _resolve_link(self, href, website_config):
+        if href.startswith('/'):
+            parts = urlsplit(website_config['url'])
+            return urljoin(f"{parts.scheme}://{parts.netloc}", href)
+        if href.startswith('?') or not href.startswith('http'):
+            return urljoin(website_config['url'], href)
+        return href
+
+    def _make_notice(self, title, link, date, views, category, is_pinned):
+        return Notice(title, link, date, views, category, is_pinned)
+
     def _group_by_category(self, notices):
         groups = defaultdict(list)
         for n in notices:
-            key = (n.get("category") or "").strip()
+            key = (n.category or "").strip()
             if not key:
                 key = ""
             groups[key].append(n)
@@ -331,28 +894,14 @@ class WebsiteMonitor:
                 return date_elem.get_text(strip=True)
         return datetime.now().strftime('%Y-%m-%d')
 
-    def _normalize_title(self, t: str) -> str:
-        return re.sub(r'\s+', ' ', (t or '')).strip()
-
-    def _normalize_url(self, u: str) -> str:
-        if not u:
-            return u
-        s = urlsplit(u)
-        q = urlencode(sorted(parse_qsl(s.query, keep_blank_values=True)))
-        path = re.sub(r'/+$', '', s.path or '')
-        return urlunsplit((s.scheme, s.netloc, path, q, ''))
-
     def _dedupe_notices(self, items):
-        by_key, order = {}, []
+        # 지문이 정규화한 제목+링크라 그대로 키로 쓴다
+        by_fp = {}
         for n in items:
-            key = (self._normalize_title(n.get('title')), self._normalize_url(n.get('link')))
-            if key not in by_key:
-                by_key[key] = n
-                order.append(key)
-            else:
-                if n.get('is_pinned'):
-                    by_key[key]['is_pinned'] = True
-        return [by_key[k] for k in order]
+            first = by_fp.setdefault(n.fp, n)
+            if first is not n and n.is_pinned:
+                first.is_pinned = True
+        return list(by_fp.values())
     
     def _escape_mrkdwn_text(self, text: str) -> str:
         """Slack mrkdwn에서 깨질 수 있는 특수문자 이스케이프"""
@@ -366,134 +915,740 @@ class WebsiteMonitor:
 
     # ---------- Slack ----------
     def send_slack_notification(self, website_name, new_notices):
-        bot_token  = os.getenv("SLACK_BOT_TOKEN")
-        channel_id = os.getenv("SLACK_CHANNEL_ID")
-        webhook_url = self.config.get("slack_webhook_url")
+        with self.tracer.span("send_slack_notification", site=website_name, notices=len(new_notices)):
+            self._send_slack_notification(website_name, new_notices)
+
+    def _send_slack_notification(self, website_name, new_notices):
+        if not self.outbox.has_route:
+            logger.warning("슬랙 전송 경로가 없습니다(Bot 토큰/채널 또는 Webhook URL 설정 필요).")
+            return
+        if self.config.get("slack_digest", False):
+            self._stage_digest(website_name, new_notices)
+            return
+
+        messages = self._pack_blocks(
+            f"📢 {website_name} 새 공지사항",
+            [(None, self._build_notice_blocks(new_notices))],
+        )
+        for i, msg in enumerate(messages, 1):
+            part = f" ({i}/{len(messages)})" if len(messages) > 1 else ""
+            # 디스크에 쓰고 바로 돌아온다 (전송은 outbox 워커가 담당)
+            self.outbox.enqueue(website_name, f"🔔 *{website_name}*에 새로운 공지사항!{part}", msg["blocks"], msg["hashes"])
+        logger.info(
+            f"슬랙 전송 대기열에 추가: {len(new_notices)}개, 메시지 {len(messages)}개 (대기 {self.outbox.pending_count()}개)"
+        )
 
+    def _build_notice_blocks(self, notices):
+        """카테고리별 공지 블록. [(블록 목록, 공지 해시, 카테고리 또는 None)] — 카테고리 제목은 _pack_blocks가 넣는다."""
         show_date  = bool(self.config.get("slack_show_date", True))
         show_views = bool(self.config.get("slack_show_views", True))
-        keys, groups = self._group_by_category(new_notices)
+        keys, groups = self._group_by_category(notices)
 
-        blocks = [{
-            "type": "header",
-            "text": {"type": "plain_text", "text": f"📢 {website_name} 새 공지사항"}
-        }]
+        units = []
         for cat in keys:
-            if cat:
-                blocks.append({"type": "section","text": {"type": "mrkdwn","text": f"*{cat}*"}})
             for n in groups[cat]:
-                title_disp = f"🌟 {self._escape_mrkdwn_text(n['title'])}" if n.get('is_pinned') else self._escape_mrkdwn_text(n['title'])
-                date_txt  = f"📅 {n['date']}" if (show_date and n.get('date')) else ""
-                views_txt = f"Views {n['views']}" if (show_views and n.get('views')) else ""
-                meta = "   ".join([t for t in [date_txt, views_txt] if t])
-                blocks.append({
+                title_disp = f"🌟 {self._escape_mrkdwn_text(n.title)}" if n.is_pinned else self._escape_mrkdwn_text(n.title)
+                date_txt  = f"📅 {n.date}" if (show_date and n.date) else ""
+                views_txt = f"Views {n.views}" if (show_views and n.views) else ""
+                edit_txt  = "✏️ 수정됨" if n.updated else ""
+                meta = "   ".join([t for t in [date_txt, views_txt, edit_txt] if t])
+                text = f"• <{n.link}|{title_disp}>" + (f"\n   {meta}" if meta else "") + self._detail_text(n.detail)
+                blocks = [{
                     "type": "section",
                     "text": {
                         "type": "mrkdwn",
-                        "text": f"• <{n['link']}|{title_disp}>" + (f"\n   {meta}" if meta else "")
+                        "text": text[:SLACK_SECTION_CHARS]
                     }
-                })
+                }]
+                units.append((blocks, n.hash, cat or None))
+        return units
 
-        if bot_token and channel_id:
-            try:
-                client = WebClient(token=bot_token)
-                resp = client.chat_postMessage(
-                    channel=channel_id,
-                    text=f"🔔 *{website_name}*에 새로운 공지사항!",
-                    blocks=blocks
+    def _detail_text(self, detail):
+        """상세 페이지 요약(마감일, 첨부파일, 본문 앞부분)을 공지 줄 아래에 붙일 mrkdwn"""
+        if not detail:
+            return ""
+        lines = []
+        if detail.get('deadlines'):
+            lines.append(f"   ⏰ 마감 {', '.join(detail['deadlines'])}")
+        files = detail.get('attachments') or []
+        if files:
+            more = f" 외 {len(files) - 3}개" if len(files) > 3 else ""
+            lines.append(f"   📎 {self._escape_mrkdwn_text(', '.join(files[:3]))}{more}")
+        if detail.get('snippet'):
+            lines.append(f">{self._escape_mrkdwn_text(detail['snippet'])}")
+        return "".join("\n" + line for line in lines)
+
+    def _pack_blocks(self, header, groups):
+        """
+        groups: [(그룹 제목 mrkdwn 또는 None, _build_notice_blocks 결과)]를 메시지 여러 개로 나눈다.
+        - slack_max_blocks: 메시지당 블록 수 (Slack 한도 50)
+        - slack_max_chars: 메시지당 텍스트 글자 수
+        그룹 제목과 카테고리 제목은 메시지마다 다시 넣고, 앞 메시지에서 이어지는 것이면 "(계속)"을 붙인다.
+        반환: [{"blocks": [...], "hashes": [...]}]
+        """
+        max_blocks = min(SLACK_MAX_BLOCKS, int(self.config.get("slack_max_blocks", SLACK_MAX_BLOCKS)))
+        max_chars = int(self.config.get("slack_max_chars", 12000))
+
+        def chars(blocks):
+            return sum(len(b.get("text", {}).get("text", "")) for b in blocks)
+
+        def heading(text, continued):
+            return {"type": "section", "text": {"type": "mrkdwn", "text": f"*{text}*" + (" _(계속)_" if continued else "")}}
+
+        messages = []
+        cur = None
+        for gi, (title, units) in enumerate(groups):
+            title_started = False
+            started_cats = set()
+
+            def headings(msg, cat):
+                # msg(None이면 새 메시지)에 이 공지를 넣기 전에 필요한 그룹/카테고리 제목
+                new_group = msg is None or msg["group"] != gi
+                out = []
+                if title and new_group:
+                    out.append(heading(title, title_started))
+                if cat and (new_group or msg["cat"] != cat):
+                    out.append(heading(cat, cat in started_cats))
+                return out
+
+            for blocks, h, cat in units:
+                extra = headings(cur, cat)
+                full = cur is not None and (
+                    len(cur["blocks"]) + len(extra) + len(blocks) > max_blocks
+                    or cur["chars"] + chars(extra) + chars(blocks) > max_chars
                 )
-                self._last_post_ts = resp["ts"]
-                logger.info(f"슬랙(봇) 전송 완료: {len(new_notices)}개 (ts={resp['ts']})")
-                return
-            except Exception as e:
-                logger.error(f"슬랙 봇 전송 실패: {e}")
+                if cur is None or full:
+                    cur = {"blocks": [{"type": "header", "text": {"type": "plain_text", "text": header[:150]}}],
+                           "hashes": [], "chars": len(header), "group": None, "cat": None}
+                    messages.append(cur)
+                    extra = headings(None, cat)
+                cur["blocks"].extend(extra + blocks)
+                cur["chars"] += chars(extra) + chars(blocks)
+                cur["hashes"].append(h)
+                cur["group"], cur["cat"] = gi, cat
+                title_started = True
+                started_cats.add(cat)
+        for msg in messages:
+            del msg["chars"], msg["group"], msg["cat"]
+        return messages
 
-        if webhook_url and webhook_url != "YOUR_SLACK_WEBHOOK_URL_HERE":
-            try:
-                payload = {"text": f"🔔 *{website_name}*에 새로운 공지사항!", "blocks": blocks}
-                r = requests.post(webhook_url, json=payload)
-                r.raise_for_status()
-                logger.info(f"슬랙(웹훅) 전송 완료: {len(new_notices)}개")
-            except requests.RequestException as e:
-                logger.error(f"슬랙 웹훅 전송 실패: {e}")
-        else:
-            logger.warning("슬랙 전송 경로가 없습니다(Bot 토큰/채널 또는 Webhook URL 설정 필요).")
+    # ---------- 다이제스트 ----------
+    def _stage_digest(self, website_name, new_notices):
+        """다이제스트 모드: 새 공지를 모아 두고 _flush_digest에서 한꺼번에 보낸다 (모은 내용은 디스크에 유지)"""
+        if not self._digest:
+            self._digest_started = time.time()
+        self._digest.append({"site": website_name, "notices": [n.to_dict() for n in new_notices]})
+        self._save_digest()
+        logger.info(f"다이제스트에 추가: {website_name} {len(new_notices)}개 (대기 {len(self._digest)}개 사이트)")
+
+    def _flush_digest(self, force=False):
+        """
+        모아 둔 공지를 사이트·카테고리별로 묶어 최소 개수의 메시지로 보낸다.
+        slack_digest_window(초)가 0이면 매 run_once마다, 아니면 첫 공지를 모은 뒤 그 시간이 지나면 보낸다.
+        """
+        if not self._digest:
+            return
+        window = float(self.config.get("slack_digest_window", 0))
+        if not force and window > 0 and time.time() - self._digest_started < window:
+            return
+
+        by_site = defaultdict(list)
+        for entry in self._digest:
+            by_site[entry["site"]].extend(Notice.from_dict(d) for d in entry["notices"])
+        groups = []
+        for site, notices in by_site.items():
+            title = f"📢 {self._escape_mrkdwn_text(site)}"
+            groups.append((title, self._build_notice_blocks(self._dedupe_notices(notices))))
+        total = sum(len(units) for _, units in groups)
+
+        messages = self._pack_blocks(f"📢 새 공지사항 {total}개 ({len(groups)}개 사이트)", groups)
+        for i, msg in enumerate(messages, 1):
+            part = f" ({i}/{len(messages)})" if len(messages) > 1 else ""
+            self.outbox.enqueue("digest", f"🔔 새 공지사항 {total}개 ({len(groups)}개 사이트){part}", msg["blocks"], msg["hashes"])
+        logger.info(f"다이제스트 전송 대기열에 추가: 사이트 {len(groups)}개, 공지 {total}개 → 메시지 {len(messages)}개")
+        self._digest = []
+        self._save_digest()
+
+    def _load_digest(self):
+        try:
+            with open(self._digest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get("entries", []), data.get("started", time.time())
+        except FileNotFoundError:
+            return [], 0.0
+        except (OSError, ValueError) as e:
+            logger.error(f"다이제스트 대기 파일 읽기 실패: {e}")
+            return [], 0.0
+
+    def _save_digest(self):
+        if not self._digest:
+            self._digest_path.unlink(missing_ok=True)
+            return
+        tmp = self._digest_path.with_suffix(".json.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"started": self._digest_started, "entries": self._digest}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._digest_path)
+
+    def _build_outbox(self, directory):
+        """
+        Slack outbox (data/outbox, 샤드 모드는 data/outbox-<worker_id>). 봇 토큰+채널이 있으면 봇으로, 없거나 영구 오류면 웹훅으로 보낸다.
+        - slack_rate_per_sec / slack_burst: 전송 속도 제한 (기본 1건/초, 순간 3건)
+        - slack_max_backoff: 전송 실패 시 재시도 간격 상한(초, 기본 600)
+        """
+        webhook_url = self.config.get("slack_webhook_url")
+        if webhook_url == "YOUR_SLACK_WEBHOOK_URL_HERE":
+            webhook_url = None
+        return SlackOutbox(
+            directory,
+            bot_token=os.getenv("SLACK_BOT_TOKEN"),
+            channel_id=os.getenv("SLACK_CHANNEL_ID"),
+            webhook_url=webhook_url,
+            http=self.http,
+            http_timeout=self._http_timeout,
+            rate=float(self.config.get("slack_rate_per_sec", 1.0)),
+            burst=float(self.config.get("slack_burst", 3)),
+            max_backoff=float(self.config.get("slack_max_backoff", 600)),
+            on_posted=self._on_slack_posted,
+            metrics=self.metrics,
+            claim=self._claim_message if self.shards is not None else None,
+        )
+
+    def _claim_message(self, msg_id):
+        """샤드 모드: 같은 알림은 먼저 잡은 워커만 보낸다 (코디네이터에 닿지 않으면 보낸다)"""
+        try:
+            return self.shards.coordinator.claim(msg_id, float(self.config.get("shard_claim_ttl", 86400)))
+        except Exception as e:
+            logger.warning(f"알림 claim 실패 → 그대로 전송: {e}")
+            return True
+
+    def _collect_metrics(self):
+        pool = self.browser_pool.stats()
+        self.metrics.drivers_live.set(pool["live"])
+        self.metrics.chrome_rss.set(self.browser_pool.watchdog.total_rss())
+        self.metrics.slack_pending.set(self.outbox.pending_count())
+        self.metrics.check_interval.set(self.config['check_interval'])
+        if self.shards is not None:
+            self.metrics.shard_workers.set(self.shards.workers)
+            self.metrics.shard_sites.set(len(self.shards.owned))
+
+    def _on_slack_posted(self, msg, ts):
+        if ts:
+            self._last_post_ts = ts
+        if ts and self.post_ledger is not None:
+            # outbox 워커 스레드에서 불린다 (PostLedger는 자체 락 사용)
+            self.post_ledger.record(
+                self.outbox.channel_id, ts, msg["site"], f"{msg['text']}\n{blocks_text(msg['blocks'])}",
+                msg["hashes"], outbox_id=msg["id"],
+            )
 
     # ---------- 메인 루프 ----------
-    def check_website(self, website_config):
+    def _site_key(self, url):
+        return hashlib.md5(url.encode()).hexdigest()
+
+    def _remember_validators(self, site_data, page):
+        for key in ('etag', 'last_modified'):
+            if page.get(key):
+                site_data[key] = page[key]
+            else:
+                site_data.pop(key, None)
+
+    def _has_history(self, site_data):
+        return bool(site_data.get("fingerprints") or site_data.get("seen") or site_data.get("hashes"))
+
+    @staticmethod
+    def _body_digest(body):
+        return hashlib.md5(body.encode()).hexdigest()
+
+    def _needs_parse(self, site_data, page):
+        """HTML을 파싱해야 하는 페이지인지 (304/엔드포인트 결과/본문 동일이면 False)"""
+        if page['status'] == 304 or page.get('notices') is not None or not page.get('html'):
+            return False
+        return not (self._has_history(site_data) and site_data.get("body_digest") == self._body_digest(page['html']))
+
+    def _seen_index(self, site_key, site_data):
+        """
+        사이트별 SeenIndex (메모리에 캐시, 상태에는 to_state()로 저장).
+        - seen_max_items: 정확히 기억할 해시 수 (기본 1000)
+        - seen_max_age_days: 마지막으로 본 뒤 보관 일수 (기본 365, 0이면 무제한)
+        - seen_bloom_capacity: 0보다 크면 제거된 해시도 블룸 필터로 기억 (기본 0)
+        """
+        index = self._seen_indexes.get(site_key)
+        if index is None:
+            cfg = self.config
+            index = SeenIndex.from_state(
+                site_data,
+                max_items=int(cfg.get("seen_max_items", 1000)),
+                max_age=float(cfg.get("seen_max_age_days", 365)) * 86400,
+                bloom_capacity=int(cfg.get("seen_bloom_capacity", 0)),
+                bloom_fp_rate=float(cfg.get("seen_bloom_fp_rate", 0.001)),
+            )
+            self._seen_indexes[site_key] = index
+        return index
+
+    def _near_duplicates(self, website_config, site_key, site_data, notices, new_notices, match=True):
+        """
+        제목만 고쳐 다시 보이는 공지를 찾는다 (near_dup를 켠 사이트만). 알릴 새 공지 목록을 반환.
+        - near_dup_action: "update"(✏️ 수정됨으로 알림) 또는 "suppress"(알리지 않음)
+        - near_dup_max_distance: 같은 공지로 볼 SimHash 해밍 거리 (기본 3)
+        - near_dup_max_items / near_dup_max_age_days: 사이트별로 기억할 제목 서명 수 / 보관 일수
+        비슷한 예전 공지가 아직 페이지에 있으면 수정이 아니라 나란히 올라온 다른 공지로 보고 그대로 알린다.
+        """
+        name = website_config['name']
+
+        def cfg(key, default):
+            return website_config.get(key, self.config.get(key, default))
+
+        index = self._near_dup_indexes.get(site_key)
+        if index is None:
+            index = NearDupIndex.from_state(
+                site_data.get("near_dup"),
+                max_distance=int(cfg("near_dup_max_distance", 3)),
+                max_items=int(cfg("near_dup_max_items", 5000)),
+                max_age_days=int(cfg("near_dup_max_age_days", 180)),
+            )
+            self._near_dup_indexes[site_key] = index
+
+        signatures = {n.fp: title_signature(n.title) for n in new_notices}
+        kept, matched = [], []
+        if match and len(index):
+            on_page = {n.fp for n in notices}
+            for n in new_notices:
+                hits = [fp for fp, _ in index.matches(signatures[n.fp]) if fp not in signatures]
+                if hits and not any(fp in on_page for fp in hits):
+                    matched.append(n)
+                else:
+                    kept.append(n)
+        else:
+            kept = new_notices
+        if matched:
+            action = cfg("near_dup_action", "update")
+            self.metrics.near_duplicates.inc(len(matched), site=name, action=action)
+            if action == "suppress":
+                logger.info(f"{name}: 제목만 바뀐 공지 {len(matched)}개 → 알림 생략: {[n.title for n in matched[:3]]}")
+            else:
+                for n in matched:
+                    n.updated = True
+                kept = new_notices
+                logger.info(f"{name}: 제목만 바뀐 공지 {len(matched)}개 → 수정 알림: {[n.title for n in matched[:3]]}")
+
+        index.touch(notices, signatures=signatures)
+        index.evict()
+        if index.dirty:
+            site_data["near_dup"] = index.to_state()
+        return kept
+
+    def check_website(self, website_config, page=None):
+        """
+        사이트 1개 체크. page를 넘기면(비동기 수집 결과) 다시 받지 않는다.
+        새 공지 수를 반환 (304/본문 동일이면 0, 수집·파싱 실패면 None).
+        """
         if not website_config.get('enabled', True):
             return
+        with self.tracer.span("check_website", site=website_config['name']):
+            return self._check_website(website_config, page)
 
+    def _check_website(self, website_config, page):
         name, url = website_config['name'], website_config['url']
         logger.info(f"{name} 체크 중...")
 
-        html = self.get_page_content(url, website_config)
-        if not html:
+        site_key = self._site_key(url)
+        site_data = self.state.get_site(site_key)
+        had_history = self._has_history(site_data)
+
+        if page is None:
+            page = self.fetch_page(website_config, site_data)
+        if not page:
             return
 
-        all_notices = self.parse_notices(html, website_config)
+        if page['status'] == 304:
+            self._cycle_stats['not_modified'] += 1
+            self.metrics.pages_skipped.inc(site=name, reason="not_modified")
+            self._remember_validators(site_data, page)
+            self.state.put_site(site_key, site_data)
+            logger.info(f"{name}: 변경 없음 (304) → 파싱 생략")
+            return 0
+
+        seen = self._seen_index(site_key, site_data)
+        if page.get('notices'):
+            seen.adopt(page['notices'])
+        if page.get('notices') and len(seen) and not any(n.fp in seen for n in page['notices']):
+            # 엔드포인트 결과가 기존 기록과 하나도 안 겹치면 매핑이 틀어졌을 수 있다 → 브라우저로 확인
+            logger.warning(f"{name}: 엔드포인트 결과가 기존 기록과 불일치 → 브라우저로 재확인")
+            site_data.pop('endpoint', None)
+            page = self.fetch_page(website_config, site_data, use_endpoint=False)
+            if not page:
+                return
+
+        body = page.get('html') or page.get('body')
+        if not body:
+            return
+
+        body_digest = self._body_digest(body)
+        if self._has_history(site_data) and site_data.get("body_digest") == body_digest:
+            self._cycle_stats['unchanged_body'] += 1
+            self.metrics.pages_skipped.inc(site=name, reason="unchanged_body")
+            self._remember_validators(site_data, page)
+            self.state.put_site(site_key, site_data)
+            logger.info(f"{name}: 본문 동일 → 파싱 생략")
+            return 0
+
+        self._cycle_stats['parsed'] += 1
+        if page.get('notices') is not None:
+            all_notices = page['notices']
+        elif page.get('parsed') is not None:
+            all_notices = page['parsed']    # 파싱 워커 결과
+            self.metrics.parse_seconds.observe(page['parse_seconds'], site=name)
+        else:
+            with self.metrics.parse_seconds.time(site=name), self.tracer.span("parse_notices", site=name):
+                all_notices = self.parse_notices(page['html'], website_config)
+        self.metrics.notices_matched.set(len(all_notices), site=name)
         if not all_notices:
             logger.warning(f"{name}: 공지사항을 찾을 수 없습니다.")
             return
 
-        site_key = hashlib.md5(url.encode()).hexdigest()
-        site_data = self.previous_data.get(site_key, {})
-        prev_hashes = set(site_data.get("hashes", []))
+        if page.get('captured'):
+            self._discover_endpoint(website_config, site_data, page['captured'], all_notices)
+        moved = seen.adopt(all_notices)
+        if moved:
+            logger.info(f"{name}: 예전 md5 기록 {moved}개를 지문으로 변환 (남은 예전 기록 {len(seen.legacy)}개)")
+        if had_history:
+            all_notices = self._paginate(website_config, page.get('html'), all_notices, seen)
 
-        curr_hashes = {n['hash'] for n in all_notices}
-        new_hashes  = curr_hashes - prev_hashes
-        new_notices = [n for n in all_notices if n['hash'] in new_hashes]
+        diff_started = time.perf_counter()
+        new_notices = [n for n in all_notices if n.fp not in seen]
+        diff_elapsed = time.perf_counter() - diff_started
+        if website_config.get('near_dup', self.config.get('near_dup', False)):
+            new_notices = self._near_duplicates(website_config, site_key, site_data, all_notices, new_notices,
+                                                match=had_history)
 
-        if new_notices:
+        if new_notices and self.shards is not None and not had_history:
+            # 공유 상태(state.db 또는 Redis 인계분)에도 기록이 없으면 클러스터가 처음 보는 사이트 → 기준선만 저장
+            logger.warning(f"{name}: 공유 상태에 기록이 없는 사이트 → 공지 {len(new_notices)}개를 기준선으로 저장 (알림 생략)")
+        elif new_notices:
             logger.info(f"{name}: {len(new_notices)}개의 새 공지사항 발견")
+            self.metrics.new_notices.inc(len(new_notices), site=name)
+            if website_config.get('fetch_details', self.config.get('fetch_details', False)):
+                try:
+                    self._fetch_details(website_config, new_notices)
+                except Exception as e:
+                    logger.warning(f"{name}: 상세 페이지 요약 실패 → 제목·링크만 전송: {e}")
             self.send_slack_notification(name, new_notices)
+        else:
+            logger.info(f"{name}: 새 공지사항 없음")
+
+        diff_started = time.perf_counter()
+        now = time.time()
+        seen.touch([n.fp for n in all_notices], now)
+        evicted = seen.evict(now)
+        if evicted:
+            logger.info(f"{name}: 오래된 기록 {evicted}개 정리 (보관 {len(seen)}개)")
+        site_data.pop("hashes", None)
+        site_data.pop("seen", None)     # 예전 md5 기록이 남아 있으면 to_state()가 다시 넣는다
+        site_data.update(seen.to_state())
+        site_data["body_digest"] = body_digest
+        self._remember_validators(site_data, page)
+        self.state.put_site(site_key, site_data)
+        self._share_site_state(site_key, site_data)
+        self.metrics.diff_seconds.observe(diff_elapsed + time.perf_counter() - diff_started, site=name)
+        if new_notices:
+            # 알림을 보낸 해시는 바로 저장 (중간에 죽어도 재알림하지 않도록)
             try:
                 self.save_previous_data()
             except Exception as e:
                 logger.warning(f"임시 저장 실패: {e}")
+        return len(new_notices)
+
+    def run_once(self, websites=None):
+        """
+        websites(기본: 설정의 전체 사이트)를 한 번 체크하고 {site_key: 새 공지 수} 반환.
+        수집/체크에 실패한 사이트는 값이 None이다.
+        """
+        if websites is None:
+            websites = self.config['websites'] if self.shards is None else self._owned_websites()[0]
+        logger.info("웹사이트 모니터링 시작")
+        started = time.monotonic()
+        self._cycle_stats.clear()
+        if self.tracer.begin_cycle():
+            logger.info(f"이번 사이클을 트레이스합니다 (사이트 {len(websites)}개)")
+        try:
+            with self.tracer.span("run_once", sites=len(websites)):
+                results = self._run_cycle(websites)
+        finally:
+            self._export_trace()
+        elapsed = time.monotonic() - started
+        self.metrics.cycle_seconds.observe(elapsed)
+        self.metrics.last_cycle_seconds.set(elapsed)
+        if elapsed > float(self.config['check_interval']):
+            self.metrics.cycle_overruns.inc()
+        stats = self._cycle_stats
+        logger.info(
+            f"모니터링 완료 ({elapsed:.1f}초) "
+            f"파싱={stats['parsed']} 304 생략={stats['not_modified']} 본문동일 생략={stats['unchanged_body']} "
+            f"추가 페이지={stats['extra_pages']}"
+        )
+        return results
+
+    def _run_cycle(self, websites):
+        if self.config.get("async_fetch", True):
+            results = asyncio.run(self.run_once_async(websites))
         else:
-            logger.info(f"{name}: 새 공지사항 없음")
+            results = {}
+            for website in websites:
+                key = self._site_key(website['url'])
+                try:
+                    results[key] = self.check_website(website)
+                    time.sleep(2)
+                except Exception as e:
+                    results[key] = None
+                    logger.error(f"웹사이트 체크 오류 {website['name']}: {e}")
+        with self.tracer.span("save_state"):
+            self._flush_digest()
+            self.save_previous_data()
+            self.detail_cache.save()
+        return results
 
-        site_data["hashes"] = list(curr_hashes)[:200]
-        self.previous_data[site_key] = site_data
+    async def run_once_async(self, websites=None):
+        """
+        정적 사이트는 동시에 수집하고, 도착하는 순서대로 check_website에 넘긴다.
+        - fetch_concurrency: 전체 동시 요청 수 (기본 16)
+        - per_host_concurrency: 같은 호스트에 대한 동시 요청 수 (기본 2)
+        Selenium 사이트는 드라이버 풀 크기(selenium_pool_size)만큼 동시에 렌더링한다.
+        parse_workers > 0이면 받은 HTML은 파싱 프로세스 풀로 보내고 공지 목록만 돌려받는다.
+        - parse_queue_size: 풀에 동시에 넣어 둘 파싱 작업 수 (기본 parse_workers × 2)
+        check_website(메인 파싱, 추가 페이지, 상세 페이지, 상태 저장)는 전용 스레드 하나에서 차례로 돌린다
+        (이벤트 루프는 그동안 다른 사이트 수집을 계속하고, 상태는 지금처럼 한 번에 한 사이트만 고친다).
+        """
+        websites = self.config['websites'] if websites is None else websites
+        websites = [w for w in websites if w.get('enabled', True)]
+        results = {}
+        if not websites:
+            return results
 
-    def run_once(self):
-        logger.info("웹사이트 모니터링 시작")
-        for website in self.config['websites']:
+        fetch_limit = max(1, int(self.config.get("fetch_concurrency", 16)))
+        per_host = max(1, int(self.config.get("per_host_concurrency", 2)))
+        global_sem = asyncio.Semaphore(fetch_limit)
+        host_sems = defaultdict(lambda: asyncio.Semaphore(per_host))
+        selenium_sem = asyncio.Semaphore(self.browser_pool.size)
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=fetch_limit + 1, thread_name_prefix="fetch")
+        loop.set_default_executor(executor)
+        check_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="check")
+
+        parse_pool = self._get_parse_pool()
+        parse_sem = asyncio.Semaphore(
+            max(1, int(self.config.get("parse_queue_size", 2 * int(self.config.get("parse_workers", 0)))))
+        )
+
+        pool_broken = False
+
+        async def parse(website, site_data, page):
+            nonlocal pool_broken
+            if parse_pool is None or not self._needs_parse(site_data, page):
+                return
+            # 큐가 차 있으면 여기서 기다린다 (받아 둔 HTML이 풀에 무한정 쌓이지 않게)
+            async with parse_sem:
+                try:
+                    # 여러 건이 겹치므로 별도 비동기 트랙에 기록 (풀 대기 포함, 실제 파싱 시간은 worker_seconds)
+                    with self.tracer.span("parse_notices", track="parse_pool", site=website['name']) as span:
+                        page['parsed'], page['parse_seconds'] = await loop.run_in_executor(
+                            parse_pool, _parse_in_worker, page['html'], website
+                        )
+                        if span is not None:
+                            span.args['worker_seconds'] = round(page['parse_seconds'], 6)
+                except BrokenProcessPool as e:
+                    pool_broken = True
+                    logger.error(f"파싱 워커 비정상 종료 → 이번 사이클은 메인에서 파싱: {e}")
+                except Exception as e:
+                    logger.error(f"파싱 워커 오류 {website['name']}: {e}")
+
+        async def fetch(website):
+            url = website['url']
+            site_data = self.state.get_site(self._site_key(url))
+            try:
+                if website.get('use_selenium', False):
+                    async with selenium_sem:
+                        page = await asyncio.to_thread(self.fetch_page, website, site_data)
+                else:
+                    # 호스트 슬롯을 먼저 잡아야 전역 슬롯을 놀리지 않는다
+                    async with host_sems[urlsplit(url).netloc]:
+                        async with global_sem:
+                            page = await asyncio.to_thread(self.fetch_page, website, site_data)
+            except Exception as e:
+                logger.error(f"페이지 수집 오류 {website['name']}: {e}")
+                page = None
+            if page:
+                await parse(website, site_data, page)
+            return website, page
+
+        try:
+            for fut in asyncio.as_completed([fetch(w) for w in websites]):
+                website, page = await fut
+                key = self._site_key(website['url'])
+                results[key] = None
+                if not page:
+                    continue
+                try:
+                    results[key] = await loop.run_in_executor(
+                        check_executor, self.profiler.call, self.check_website, website, page
+                    )
+                except Exception as e:
+                    logger.error(f"웹사이트 체크 오류 {website['name']}: {e}")
+        finally:
+            check_executor.shutdown(wait=True)
+        if pool_broken:
+            self.close_parse_pool()     # 다음 사이클에 새로 띄운다
+        return results
+
+    def _owned_websites(self):
+        """
+        샤드 모드: (이 워커가 맡은 사이트 목록, 담당이 바뀌었는지).
+        넘겨주는 사이트 상태는 먼저 저장하고, 새로 맡은 사이트는 캐시를 비워 다른 워커가 쓴 상태를 DB에서 다시 읽는다.
+        """
+        websites = {self._site_key(w['url']): w for w in self.config['websites'] if w.get('enabled', True)}
+        owned, gained, lost = self.shards.assign(websites)
+        if gained or lost:
+            self.save_previous_data()
+            self.state.forget(gained | lost)
+            for key in gained | lost:
+                self._seen_indexes.pop(key, None)
+                self._near_dup_indexes.pop(key, None)
+            self._take_over_states(gained)
+        return [w for key, w in websites.items() if key in owned], bool(gained or lost)
+
+    def _share_site_state(self, site_key, site_data):
+        """Redis 코디네이터면 사이트 상태를 올려 둔다 (이 워커가 죽거나 빠져도 다음 담당이 이어받게)"""
+        if self.shards is None or self.shards.coordinator.shares_state:
+            return
+        try:
+            self.shards.coordinator.put_state(site_key, site_data)
+        except Exception as e:
+            logger.warning(f"사이트 상태 공유 실패 ({site_key}): {e}")
+
+    def _take_over_states(self, site_keys):
+        """
+        새로 맡은 사이트는 Redis에 올라온 상태로 바꾼다. 예전에 맡았던 사이트라도 로컬 기록은 그 뒤 다른 워커가
+        보낸 공지를 모르므로 Redis 쪽(마지막으로 체크한 워커가 올린 것)을 쓴다.
+        """
+        if self.shards.coordinator.shares_state:
+            return
+        taken = 0
+        for key in site_keys:
             try:
-                self.check_website(website)
-                time.sleep(2)
+                site_data = self.shards.coordinator.get_state(key)
             except Exception as e:
-                logger.error(f"웹사이트 체크 오류 {website['name']}: {e}")
-        self.save_previous_data()
-        logger.info("모니터링 완료")
+                logger.warning(f"사이트 상태 인계 실패 ({key}): {e}")
+                continue
+            if site_data:
+                self.state.put_site(key, site_data)
+                taken += 1
+        if taken:
+            logger.info(f"다른 워커의 사이트 상태 {taken}개 인계")
+            self.save_previous_data()
+
+    def _build_scheduler(self, websites=None):
+        """
+        사이트마다 SiteSchedule을 만든다. 사이트 설정이 전역 설정보다 우선한다.
+        - check_interval: 기본 간격 (전역 check_interval)
+        - min_interval / max_interval: 간격 하한/상한 (기본: 기본 간격 / 기본 간격 × 12)
+        - backoff: 새 글이 없을 때 간격에 곱할 값 (기본 1.5)
+        - jitter: 간격을 ±비율만큼 흔든다 (기본 0.1)
+        - active_hours / active_interval: 활동 시간대(["08:00-19:00"])에는 active_interval 이하로 체크
+        이전 실행의 간격(poll_interval)은 상태에서 이어받는다.
+        """
+        scheduler = SiteScheduler()
+        sites = {}
+        now = time.time()
+        for website in self.config['websites'] if websites is None else websites:
+            if not website.get('enabled', True):
+                continue
+
+            def opt(key, default):
+                return website.get(key, self.config.get(key, default))
+
+            key = self._site_key(website['url'])
+            base = float(website.get('check_interval', self.config['check_interval']))
+            min_interval = float(opt('min_interval', base))
+            max_interval = max(min_interval, float(opt('max_interval', base * 12)))
+            site_data = self.state.get_site(key)
+            schedule = SiteSchedule(
+                key, base,
+                min_interval=min_interval,
+                max_interval=max_interval,
+                backoff=max(1.0, float(opt('backoff', 1.5))),
+                jitter=max(0.0, float(opt('jitter', 0.1))),
+                active_hours=parse_active_hours(opt('active_hours', [])),
+                active_interval=float(opt('active_interval', min_interval)),
+                interval=site_data.get('poll_interval'),
+            )
+            scheduler.add(schedule, first_due=now)
+            sites[key] = website
+        return scheduler, sites
+
+    def _run_due_sites(self, scheduler, sites):
+        """지금 차례인 사이트만 체크하고 결과에 따라 다음 시각을 잡는다. 다음 체크까지 남은 초를 반환."""
+        due = scheduler.pop_due()
+        if due:
+            # 처음 보는 사이트는 전부 새 글로 잡히므로 변화로 치지 않는다
+            had_history = {k: self._has_history(self.state.get_site(k)) for k in due}
+            results = self.run_once([sites[k] for k in due])
+            for key in due:
+                count = results.get(key)
+                changed = None if count is None else (count > 0 and had_history[key])
+                interval = scheduler.record(key, changed)
+                site_data = self.state.get_site(key)
+                site_data['poll_interval'] = round(scheduler.sites[key].interval, 1)
+                self.state.put_site(key, site_data)
+                logger.debug(f"{sites[key]['name']}: 다음 체크 {interval:.0f}초 후")
+            self.save_previous_data()
+        next_due = scheduler.next_due()
+        return 60 if next_due is None else max(1.0, next_due - time.time())
 
     def run_continuous(self):
         interval = self.config['check_interval']
-        logger.info(f"지속 모니터링 시작 (간격: {interval}초)")
+        adaptive = self.config.get("adaptive_schedule", False)
+        if adaptive:
+            scheduler, sites = self._build_scheduler(None if self.shards is None else self._owned_websites()[0])
+            logger.info(f"지속 모니터링 시작 (사이트별 적응형 간격, 기본 {interval}초)")
+        else:
+            logger.info(f"지속 모니터링 시작 (간격: {interval}초)")
+        if self.shards is not None:
+            logger.info(f"샤드 모드: 워커 {self.worker_id}")
         try:
-            recycle_every = int(self.config.get("driver_recycle_every", 200))
-            loop_count = 0
             while True:
                 try:
-                    self.run_once()
-                    loop_count += 1
-                    if recycle_every > 0 and loop_count % recycle_every == 0:
-                        logger.info(f"루프 {loop_count}회차 → 드라이버 재생성")
-                        self.close_selenium_driver()
-                    interval = self.config['check_interval']
-                    logger.info(f"{interval}초 후 다시 체크...")
-                    time.sleep(interval)
+                    if adaptive:
+                        if self.shards is not None:
+                            owned, changed = self._owned_websites()
+                            if changed:
+                                scheduler, sites = self._build_scheduler(owned)
+                        wait = self._run_due_sites(scheduler, sites)
+                        if self.shards is not None:
+                            # 멤버 변화를 ttl 안에 반영하도록 오래 자지 않는다
+                            wait = min(wait, self.shards.coordinator.ttl)
+                    else:
+                        self.run_once()
+                        wait = self.config['check_interval']
+                    # 사이트 사이에서만 재시작: 메모리/페이지 수/수명 기준을 넘은 유휴 드라이버 + 고아·좀비 정리
+                    self.browser_pool.sweep()
+                    logger.info(f"브라우저 풀: {self.browser_pool.stats()}")
+                    logger.info(f"{wait:.0f}초 후 다시 체크...")
+                    time.sleep(wait)
                 except KeyboardInterrupt:
                     logger.info("모니터링 중단됨")
                     break
                 except Exception as e:
                     logger.error(f"예상치 못한 오류: {e}")
+                    self.close_selenium_driver()   # 오류 시에만 강제 정리, 평소엔 다음 사이클까지 유지
                     time.sleep(60)
-                finally:
-                    self.close_selenium_driver()   # 강제 정리
         finally:
             self.close_selenium_driver()
+            self.close_parse_pool()
+            self._flush_digest(force=True)
+            self.outbox.close()
+            self._leave_shards()
 
     def _setup_logging(self):
         logger.setLevel(logging.INFO)
@@ -519,23 +1674,77 @@ class WebsiteMonitor:
         logging.getLogger("urllib3").setLevel(logging.WARNING)
         logging.getLogger("WDM").setLevel(logging.WARNING)
 
+    # ---------- 실행 중 진단 ----------
+    def _toggle_profiler(self, signum, frame):
+        try:
+            paths = self.profiler.toggle()
+        except Exception as e:
+            logger.error(f"프로파일러 전환 실패: {e}")
+            return
+        if self.profiler.running:
+            logger.info(f"프로파일러 시작 ({self.profiler.mode}) → 다시 SIGUSR1을 보내면 logs/에 저장")
+        else:
+            logger.info(f"프로파일 저장: {', '.join(paths)}")
+
+    def _arm_trace(self, signum, frame):
+        self.tracer.arm()
+        logger.info("트레이스 예약 → 다음 사이클을 logs/trace-*.json으로 저장")
+
+    def _export_trace(self):
+        try:
+            path = self.tracer.end_cycle(LOG_DIR)
+        except Exception as e:
+            logger.error(f"트레이스 저장 실패: {e}")
+            return
+        if path:
+            logger.info(f"트레이스 저장: {path} (chrome://tracing 또는 ui.perfetto.dev에서 열기)")
+
+    def _leave_shards(self):
+        if self.shards is not None:
+            self.shards.close()
+            self.shards = None
+
     def _graceful_exit(self, signum, frame):
+        if self.state.in_transaction:
+            # 트랜잭션 중간에 빠져나가면 그 배치가 롤백되므로 저장이 끝난 뒤 종료한다
+            logger.info(f"종료 신호 수신({signum}) → 상태 저장이 끝나면 종료")
+            self._exit_pending = signum
+            return
+        self._exit_pending = None
         logger.info(f"종료 신호 수신({signum}) → 상태 저장 및 자원 정리")
         try:
-            self.save_previous_data()
+            self.state.close()
         except Exception as e:
             logger.error(f"상태 저장 실패: {e}")
+        self.detail_cache.save()
         try:
             self.close_selenium_driver()
+            self.close_parse_pool()
         except Exception as e:
             logger.error(f"드라이버 종료 실패: {e}")
+        if self.profiler.running:
+            self._toggle_profiler(signum, None)
+        self._leave_shards()
+        # 보내지 못한 알림은 data/outbox(다이제스트는 digest_pending.json)에 남아 다음 실행 때 전송된다
+        self.outbox.close(timeout=2)
+        if self.post_ledger is not None:
+            self.post_ledger.close()
         sys.exit(0)
 
 # ---------- entry ----------
 def main():
     monitor = WebsiteMonitor()
     if len(sys.argv) > 1 and sys.argv[1] == 'once':
-        monitor.run_once()
+        try:
+            monitor.run_once()
+        finally:
+            monitor.close_selenium_driver()
+            monitor.close_parse_pool()
+            monitor._flush_digest(force=True)
+            if not monitor.outbox.flush(timeout=float(monitor.config.get("slack_flush_timeout", 30))):
+                logger.warning(f"슬랙 대기열 {monitor.outbox.pending_count()}개 미전송 → 다음 실행 때 전송")
+            monitor.outbox.close()
+            monitor._leave_shards()
     else:
         monitor.run_continuous()
 
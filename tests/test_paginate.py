@@ -0,0 +1,77 @@
+"""
+추가 페이지 수집 회귀 테스트: 한 페이지(max_items)보다 많은 새 글이 한꺼번에 올라와도 하나도 빠지지 않아야 한다.
+bench/stand_in.py 대역 서버를 프로세스 안에서 띄워 게시판 3종 × 파서 2종으로 확인한다.
+"""
+
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+import stand_in  # noqa: E402
+import website_monitor  # noqa: E402
+
+BURST = 25      # 페이지당 20개 + 고정 공지 2개 → 두 페이지에 걸친다
+
+
+@pytest.fixture(scope="module")
+def board():
+    server_state = stand_in.StandIn()
+    server = stand_in.serve(server_state)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server_state, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def _numbers(notices):
+    out = set()
+    for n in notices:
+        m = re.search(r"(?:no|wr_id|document_srl)=(\d+)", n.link)
+        if m:
+            out.add(int(m.group(1)))
+    return out
+
+
+@pytest.mark.parametrize("parser", ["bs4", "lxml"])
+@pytest.mark.parametrize("site", [0, 1, 2])
+def test_burst_spanning_pages(board, tmp_path, site, parser):
+    server_state, port = board
+    entry = stand_in.load_corpus()[site]
+    url = f"http://127.0.0.1:{port}/board/{site}"
+    config = {
+        "websites": [{
+            "name": f"board-{site}", "url": url, **entry["site"],
+            "use_selenium": False, "max_items": 20, "parser": parser,
+            "page_url_template": url + "?page={page}", "max_pages": 5,
+        }],
+        "check_interval": 60, "user_agent": "test", "data_dir": str(tmp_path / "data"),
+        "async_fetch": False, "post_ledger": False,
+    }
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+
+    with server_state.lock:
+        server_state.versions[site] = 0
+    monitor = website_monitor.WebsiteMonitor(str(config_path))
+    sent = []
+    monitor.send_slack_notification = lambda name, notices: sent.extend(notices)
+    try:
+        website = config["websites"][0]
+        monitor.check_website(website)          # 첫 체크: 기준 기록
+        sent.clear()
+        with server_state.lock:
+            server_state.versions[site] = BURST
+        assert monitor.check_website(website) == BURST
+        assert _numbers(sent) == set(range(1001, 1001 + BURST))
+    finally:
+        monitor.outbox.close(timeout=1)
+        monitor.state.close()